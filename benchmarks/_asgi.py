@@ -0,0 +1,62 @@
+"""
+Minimal in-process ASGI HTTP client used by the benchmarks.
+"""
+import asyncio
+import json
+
+
+async def asgi_request(application, method, path, token=None, body=None, query_string=''):
+    """
+    Send one HTTP request to an ASGI application.
+    Args:
+        application: ASGI application.
+        method: HTTP method.
+        path: Request path.
+        token: Optional auth token for the Authorization header.
+        body: Optional JSON serializable request body.
+        query_string: Raw query string without the leading '?'.
+    Returns:
+        tuple: (status code, response body bytes)
+    """
+    data = json.dumps(body).encode() if body is not None else b''
+    headers = [
+        (b'host', b'testserver'),
+        (b'content-type', b'application/json'),
+        (b'content-length', str(len(data)).encode()),
+    ]
+    if token:
+        headers.append((b'authorization', f'Token {token}'.encode()))
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query_string.encode(),
+        'headers': headers,
+        'server': ('testserver', 80),
+        'client': ('127.0.0.1', 0),
+    }
+    request_sent = False
+    disconnected = asyncio.Event()
+    response = {'status': None, 'body': []}
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {'type': 'http.request', 'body': data, 'more_body': False}
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            response['status'] = message['status']
+        elif message['type'] == 'http.response.body':
+            response['body'].append(message.get('body', b''))
+
+    await application(scope, receive, send)
+    disconnected.set()
+    return response['status'], b''.join(response['body'])
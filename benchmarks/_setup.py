@@ -0,0 +1,120 @@
+"""
+Shared setup for the benchmark scripts.
+The benchmarks never touch the development database: every run works on
+its own SQLite file (default: benchmarks/bench.sqlite3) that is migrated
+on start and can be reused between runs to skip the seeding step.
+"""
+import argparse
+import datetime
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_DB = BASE_DIR / 'benchmarks' / 'bench.sqlite3'
+
+
+def argument_parser(description):
+    """
+    Create an argument parser with the options every benchmark shares.
+    Args:
+        description: Help text of the benchmark.
+    Returns:
+        ArgumentParser: Parser with --db, --users and --tasks options.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--db', default=str(DEFAULT_DB), help='SQLite file used for the benchmark')
+    parser.add_argument('--users', type=int, default=10, help='number of users to seed')
+    parser.add_argument('--tasks', type=int, default=100_000, help='number of tasks to seed in total')
+    return parser
+
+
+def setup_django(db_path, migrate=True):
+    """
+    Configure Django against the benchmark database and migrate it.
+    Args:
+        db_path: Path of the SQLite file to use.
+        migrate: False to skip the migrations (e.g. in worker processes).
+    """
+    sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'kanban_backend.settings')
+    # Load generators log in far more often than the login throttles allow.
+    os.environ.setdefault('KANBAN_THROTTLE', 'off')
+
+    from django.conf import settings
+    settings.DATABASES['default']['NAME'] = db_path
+    settings.ALLOWED_HOSTS.append('testserver')
+    settings.DEBUG = os.environ.get('BENCH_DEBUG') == '1'
+
+    import django
+    django.setup()
+
+    if migrate:
+        from django.core.management import call_command
+        call_command('migrate', verbosity=0)
+
+
+def seed(users, tasks, batch_size=10_000):
+    """
+    Seed users and tasks unless the database already holds enough of them.
+    Tasks are spread evenly across the users with random status, prio and date.
+    Args:
+        users: Number of users to create.
+        tasks: Total number of tasks to create.
+        batch_size: Rows per bulk_create call.
+    Returns:
+        list: The seeded users.
+    """
+    from django.contrib.auth.models import User
+    from ticketeer.models import TicketeerTask
+
+    accounts = list(User.objects.filter(username__startswith='bench').order_by('id'))
+    for index in range(len(accounts), users):
+        accounts.append(User.objects.create_user(f'bench{index}', f'bench{index}@example.com', 'bench-password'))
+    accounts = accounts[:users]
+
+    existing = TicketeerTask.objects.count()
+    if existing >= tasks:
+        return accounts
+
+    rng = random.Random(42)
+    statuses = [value for value, label in TicketeerTask.STATUS_CHOICES]
+    prios = [value for value, label in TicketeerTask.PRIORITY_CHOICES]
+    start = datetime.date(2020, 1, 1)
+    started = time.perf_counter()
+    for offset in range(existing, tasks, batch_size):
+        TicketeerTask.objects.bulk_create([
+            TicketeerTask(
+                author=accounts[index % users],
+                title=f'Task {index}',
+                subtitle=f'Sub {index % 1000}',
+                content=f'Benchmark task number {index}',
+                date=start + datetime.timedelta(days=rng.randrange(1500)),
+                prio=rng.choice(prios),
+                status=rng.choice(statuses),
+                doTime=rng.randrange(480),
+            )
+            for index in range(offset, min(offset + batch_size, tasks))
+        ])
+    print(f'seeded {tasks - existing} tasks in {time.perf_counter() - started:.1f}s')
+    return accounts
+
+
+def measure(func, repeat):
+    """
+    Run a callable several times and return the median duration.
+    Args:
+        func: Callable to measure.
+        repeat: Number of runs.
+    Returns:
+        float: Median duration in milliseconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2]
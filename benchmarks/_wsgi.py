@@ -0,0 +1,114 @@
+"""
+Minimal in-process WSGI and HTTP clients used by the benchmarks.
+"""
+import http.client
+import io
+import json
+import sys
+import threading
+from urllib.parse import urlsplit
+
+
+def wsgi_request(application, method, path, token=None, body=None, query_string=''):
+    """
+    Send one HTTP request to a WSGI application.
+    Args:
+        application: WSGI application.
+        method: HTTP method.
+        path: Request path.
+        token: Optional auth token for the Authorization header.
+        body: Optional JSON serializable request body.
+        query_string: Raw query string without the leading '?'.
+    Returns:
+        tuple: (status code, response body bytes)
+    """
+    data = json.dumps(body).encode() if body is not None else b''
+    environ = {
+        'REQUEST_METHOD': method,
+        'SCRIPT_NAME': '',
+        'PATH_INFO': path,
+        'QUERY_STRING': query_string,
+        'SERVER_NAME': 'testserver',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'REMOTE_ADDR': '127.0.0.1',
+        'HTTP_HOST': 'testserver',
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(data)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(data),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    if token:
+        environ['HTTP_AUTHORIZATION'] = f'Token {token}'
+    response = {}
+
+    def start_response(status, headers, exc_info=None):
+        response['status'] = int(status.split(' ', 1)[0])
+
+    chunks = application(environ, start_response)
+    try:
+        content = b''.join(chunks)
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+    return response['status'], content
+
+
+class HTTPClient:
+    """
+    Keep-alive HTTP client for a running server, one connection per thread.
+    Attributes:
+        host: Host name of the server.
+        port: Port of the server.
+        prefix: Path prefix of the application (without trailing slash).
+    """
+
+    def __init__(self, url, timeout=30):
+        """
+        Args:
+            url: Base URL of the server, e.g. http://127.0.0.1:8000.
+            timeout: Socket timeout in seconds.
+        """
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip('/')
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def request(self, method, path, token=None, body=None, query_string=''):
+        """
+        Send one HTTP request, reconnecting once if the server closed the connection.
+        Args:
+            method: HTTP method.
+            path: Request path.
+            token: Optional auth token for the Authorization header.
+            body: Optional JSON serializable request body.
+            query_string: Raw query string without the leading '?'.
+        Returns:
+            tuple: (status code, response body bytes)
+        """
+        data = json.dumps(body).encode() if body is not None else None
+        headers = {'Content-Type': 'application/json'}
+        if token:
+            headers['Authorization'] = f'Token {token}'
+        target = self.prefix + path + (f'?{query_string}' if query_string else '')
+        for attempt in range(2):
+            connection = getattr(self.local, 'connection', None)
+            if connection is None:
+                connection = self.local.connection = http.client.HTTPConnection(
+                    self.host, self.port, timeout=self.timeout)
+            try:
+                connection.request(method, target, body=data, headers=headers)
+                response = connection.getresponse()
+                return response.status, response.read()
+            except (http.client.HTTPException, ConnectionError):
+                connection.close()
+                self.local.connection = None
+                if attempt:
+                    raise
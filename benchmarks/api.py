@@ -0,0 +1,286 @@
+"""
+Load test of the REST API: throughput and latency percentiles per endpoint.
+Seeds users and tasks, then drives login, register, list, create, detail,
+update, status and delete with many concurrent clients, either in-process
+through the WSGI or ASGI application or against a running server:
+
+    python -m benchmarks.api --target asgi --requests 1000 --concurrency 50
+    python -m benchmarks.api --target wsgi --concurrency 16
+    KANBAN_DB_NAME=benchmarks/bench.sqlite3 KANBAN_THROTTLE=off python manage.py runserver --noreload
+    python -m benchmarks.api --target http://127.0.0.1:8000
+
+Login and register are bound by password hashing; with
+KANBAN_PASSWORD_HASHERS=fast (for a freshly seeded database) they measure
+the rest of the stack instead.
+Each run is saved as JSON (default: benchmarks/results/<commit>-<target>.json);
+--compare prints the change against an earlier result file.
+"""
+import asyncio
+import datetime
+import json
+import logging
+import math
+import subprocess
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from benchmarks._asgi import asgi_request
+from benchmarks._setup import BASE_DIR, argument_parser, seed, setup_django
+from benchmarks._wsgi import HTTPClient, wsgi_request
+
+RESULTS_DIR = BASE_DIR / 'benchmarks' / 'results'
+ENDPOINTS = ('login', 'register', 'list', 'create', 'detail', 'update', 'status', 'delete')
+# Password hashing makes these orders of magnitude slower than the task endpoints.
+AUTH_ENDPOINTS = {'login', 'register'}
+
+
+def percentile(latencies, q):
+    """
+    Nearest-rank percentile.
+    Args:
+        latencies: Sorted latencies.
+        q: Percentile between 0 and 1.
+    Returns:
+        float: The latency at the percentile.
+    """
+    return latencies[min(len(latencies) - 1, max(math.ceil(q * len(latencies)) - 1, 0))]
+
+
+def summarize(latencies, errors, elapsed):
+    """
+    Returns:
+        dict: Requests per second, latency percentiles in ms and the number of failed requests.
+    """
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'errors': errors,
+    }
+
+
+def drive_threads(send, requests, concurrency, make_request):
+    """
+    Send `requests` requests from `concurrency` client threads.
+    Args:
+        send: Function sending one request and returning (status, body).
+        requests: Number of requests.
+        concurrency: Number of concurrent clients.
+        make_request: Function of the request index returning the arguments of `send`.
+    Returns:
+        dict: See `summarize()`.
+    """
+    latencies, errors = [], 0
+    counter = iter(range(requests))
+    lock = threading.Lock()
+
+    def client():
+        nonlocal errors
+        from django.db import connections
+        while True:
+            with lock:
+                index = next(counter, None)
+            if index is None:
+                break
+            started = time.perf_counter()
+            try:
+                status, body = send(*make_request(index))
+            except OSError:
+                status = 599
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                errors += status >= 400
+        connections.close_all()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        for future in [pool.submit(client) for _ in range(concurrency)]:
+            future.result()
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+async def drive_asgi(application, requests, concurrency, make_request):
+    """
+    Send `requests` requests from `concurrency` concurrent ASGI clients.
+    Args:
+        application: ASGI application.
+        requests: Number of requests.
+        concurrency: Number of concurrent clients.
+        make_request: Function of the request index returning the arguments of `asgi_request()`.
+    Returns:
+        dict: See `summarize()`.
+    """
+    latencies, errors = [], 0
+    counter = iter(range(requests))
+
+    async def client():
+        nonlocal errors
+        for index in counter:
+            started = time.perf_counter()
+            status, body = await asgi_request(application, *make_request(index))
+            latencies.append(time.perf_counter() - started)
+            errors += status >= 400
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+def build_requests(users, tokens, tasks, doomed, run_id):
+    """
+    Build the request factories of the benchmarked endpoints.
+    Request `i` is sent by user `i % len(users)` for one of that user's tasks.
+    Args:
+        users: Seeded users.
+        tokens: Auth token key per user ID.
+        tasks: Task IDs per user ID.
+        doomed: Task IDs per user ID reserved for the delete requests.
+        run_id: Unique suffix for the usernames registered by this run.
+    Returns:
+        dict: Endpoint name -> function of the request index returning
+        (method, path, token, body, query_string).
+    """
+    def user(i):
+        return users[i % len(users)]
+
+    def task(i):
+        ids = tasks[user(i).pk]
+        return ids[i // len(users) % len(ids)]
+
+    statuses = ('todo', 'inProgress', 'done', 'urgent')
+    new_task = {'title': 'Load test', 'subtitle': 'load', 'content': 'Created by the API benchmark'}
+    return {
+        'login': lambda i: ('POST', '/login/', None, {
+            'username': user(i).username, 'password': 'bench-password'}, ''),
+        'register': lambda i: ('POST', '/register/', None, {
+            'username': f'load-{run_id}-{i}', 'password': 'bench-password',
+            'email': f'load-{run_id}-{i}@example.com', 'first_name': 'Load', 'last_name': 'Test'}, ''),
+        'list': lambda i: ('GET', '/tasks/', tokens[user(i).pk], None, 'page_size=50'),
+        'create': lambda i: ('POST', '/tasks/', tokens[user(i).pk], new_task, ''),
+        'detail': lambda i: ('GET', f'/tasks/{task(i)}/', tokens[user(i).pk], None, ''),
+        'update': lambda i: ('PATCH', f'/tasks/{task(i)}/', tokens[user(i).pk], {'doTime': i % 480}, ''),
+        'status': lambda i: ('PATCH', f'/tasks/{task(i)}/status/', tokens[user(i).pk],
+                             {'status': statuses[i % len(statuses)]}, ''),
+        'delete': lambda i: ('DELETE', f'/tasks/{doomed[user(i).pk][i // len(users)]}/', tokens[user(i).pk], None, ''),
+    }
+
+
+def reserve_tasks(users, requests):
+    """
+    Create the tasks removed by the delete requests.
+    Returns:
+        dict: Task IDs per user ID, enough for `requests` delete requests.
+    """
+    from ticketeer.models import TicketeerTask
+    per_user = math.ceil(requests / len(users))
+    created = TicketeerTask.objects.bulk_create([
+        TicketeerTask(author=user, title=f'Doomed {index}', subtitle='load', content='Deleted by the API benchmark')
+        for user in users for index in range(per_user)
+    ])
+    doomed = {}
+    for task in created:
+        doomed.setdefault(task.author_id, []).append(task.pk)
+    return doomed
+
+
+def git_commit():
+    """
+    Returns:
+        str: Short hash of the checked out commit, with '-dirty' for uncommitted changes.
+    """
+    def git(*args):
+        return subprocess.run(['git', *args], cwd=BASE_DIR, capture_output=True, text=True).stdout.strip()
+    commit = git('rev-parse', '--short', 'HEAD') or 'unknown'
+    return commit + ('-dirty' if git('status', '--porcelain', '--untracked-files=no') else '')
+
+
+def print_results(results, baseline=None):
+    """
+    Print one line per endpoint, with the change against a baseline run if given.
+    Args:
+        results: Endpoint name -> summary.
+        baseline: Endpoint name -> summary of an earlier run.
+    """
+    header = f'{"endpoint":<10}{"req/s":>10}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}{"errors":>8}'
+    print(header + (f'{"req/s Δ":>10}{"p95 Δ":>10}' if baseline else ''))
+    for name, result in results.items():
+        line = (f'{name:<10}{result["rps"]:>10.0f}{result["p50_ms"]:>10.2f}{result["p95_ms"]:>10.2f}'
+                f'{result["p99_ms"]:>10.2f}{result["errors"]:>8}')
+        before = (baseline or {}).get(name)
+        if before:
+            line += (f'{(result["rps"] / before["rps"] - 1) * 100:>+9.1f}%'
+                     f'{(result["p95_ms"] / before["p95_ms"] - 1) * 100:>+9.1f}%')
+        print(line)
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.set_defaults(users=10, tasks=10_000)
+    parser.add_argument('--target', default='asgi',
+                        help='"wsgi" or "asgi" (in-process) or the base URL of a running server')
+    parser.add_argument('--requests', type=int, default=1000, help='requests per task endpoint')
+    parser.add_argument('--auth-requests', type=int, default=50, help='requests per login / register endpoint')
+    parser.add_argument('--concurrency', type=int, default=50, help='concurrent clients')
+    parser.add_argument('--endpoints', nargs='+', choices=ENDPOINTS, default=list(ENDPOINTS))
+    parser.add_argument('--save', help='result file (default: benchmarks/results/<commit>-<target>.json)')
+    parser.add_argument('--compare', help='result file of an earlier run to compare with')
+    args = parser.parse_args()
+    setup_django(args.db)
+    # Every login is over the latency budget; the warnings would drown the results.
+    logging.getLogger('ticketeer.metrics').setLevel(logging.ERROR)
+
+    from rest_framework.authtoken.models import Token
+    from ticketeer.models import TicketeerTask
+
+    users = seed(args.users, args.tasks)
+    tokens = {user.pk: Token.objects.get_or_create(user=user)[0].key for user in users}
+    tasks = {user.pk: list(TicketeerTask.objects.filter(author=user).values_list('id', flat=True)[:1000])
+             for user in users}
+    doomed = reserve_tasks(users, args.requests) if 'delete' in args.endpoints else {}
+    requests = build_requests(users, tokens, tasks, doomed, uuid.uuid4().hex[:8])
+
+    if args.target == 'asgi':
+        from django.core.asgi import get_asgi_application
+        application = get_asgi_application()
+        run = lambda count, make: asyncio.run(drive_asgi(application, count, args.concurrency, make))
+    else:
+        if args.target == 'wsgi':
+            from django.core.wsgi import get_wsgi_application
+            application = get_wsgi_application()
+            send = lambda *request: wsgi_request(application, *request)
+        else:
+            send = HTTPClient(args.target).request
+        run = lambda count, make: drive_threads(send, count, args.concurrency, make)
+
+    results = {}
+    for name in args.endpoints:
+        count = args.auth_requests if name in AUTH_ENDPOINTS else args.requests
+        results[name] = run(count, requests[name])
+
+    baseline = json.loads(Path(args.compare).read_text())['results'] if args.compare else None
+    print_results(results, baseline)
+
+    commit = git_commit()
+    target = args.target if args.target in ('wsgi', 'asgi') else 'http'
+    path = Path(args.save) if args.save else RESULTS_DIR / f'{commit}-{target}.json'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({
+        'commit': commit,
+        'date': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'target': args.target,
+        'users': args.users,
+        'tasks': args.tasks,
+        'concurrency': args.concurrency,
+        'results': results,
+    }, indent=2) + '\n')
+    print(f'saved {path}')
+
+
+if __name__ == '__main__':
+    main()
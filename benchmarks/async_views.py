@@ -0,0 +1,102 @@
+"""
+Compare the DRF task views with the ASGI-native views in ticketeer.async_views.
+Both variants are mounted side by side (/sync/... and /async/...) and driven
+in-process through the ASGI application with many concurrent clients, the
+way an ASGI server such as uvicorn would call them.
+
+    python -m benchmarks.async_views --requests 2000 --concurrency 50
+"""
+import asyncio
+import statistics
+import time
+from django.urls import path
+from benchmarks._asgi import asgi_request
+from benchmarks._setup import argument_parser, seed, setup_django
+
+urlpatterns = []
+
+
+def build_urlpatterns():
+    from ticketeer import async_views, views
+    urlpatterns[:] = [
+        path('sync/tasks/', views.TaskListCreateAPIView.as_view()),
+        path('sync/tasks/<int:pk>/', views.TaskRetrieveUpdateDestroyAPIView.as_view()),
+        path('sync/tasks/<int:pk>/status/', views.TaskStatusUpdateAPIView.as_view()),
+        path('async/tasks/', async_views.AsyncTaskListCreateView.as_view()),
+        path('async/tasks/<int:pk>/', async_views.AsyncTaskDetailView.as_view()),
+        path('async/tasks/<int:pk>/status/', async_views.AsyncTaskStatusView.as_view()),
+    ]
+
+
+async def drive(application, requests, concurrency, make_request):
+    """
+    Send `requests` requests with `concurrency` concurrent clients.
+    Returns:
+        dict: Throughput, latency percentiles and the number of failed requests.
+    """
+    latencies = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def client():
+        nonlocal errors
+        for index in counter:
+            started = time.perf_counter()
+            status, body = await make_request(index)
+            latencies.append(time.perf_counter() - started)
+            errors += status >= 400
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'rps': requests / elapsed,
+        'errors': errors,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p99_ms': latencies[max(int(len(latencies) * 0.99) - 1, 0)] * 1000,
+    }
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.set_defaults(users=1, tasks=200)
+    parser.add_argument('--requests', type=int, default=2000, help='requests per endpoint and variant')
+    parser.add_argument('--concurrency', type=int, default=50, help='concurrent clients')
+    args = parser.parse_args()
+    setup_django(args.db)
+
+    from django.conf import settings
+    from django.core.asgi import get_asgi_application
+    from rest_framework.authtoken.models import Token
+    from ticketeer.models import TicketeerTask
+
+    build_urlpatterns()
+    settings.ROOT_URLCONF = __name__
+    application = get_asgi_application()
+
+    user = seed(args.users, args.tasks)[0]
+    token, created = Token.objects.get_or_create(user=user)
+    task_ids = list(TicketeerTask.objects.filter(author=user).values_list('id', flat=True))
+    statuses = [value for value, label in TicketeerTask.STATUS_CHOICES]
+
+    endpoints = {
+        'list (cached)': lambda prefix, i: asgi_request(application, 'GET', f'/{prefix}/tasks/', token.key),
+        'detail': lambda prefix, i: asgi_request(
+            application, 'GET', f'/{prefix}/tasks/{task_ids[i % len(task_ids)]}/', token.key),
+        'status patch': lambda prefix, i: asgi_request(
+            application, 'PATCH', f'/{prefix}/tasks/{task_ids[i % len(task_ids)]}/status/', token.key,
+            {'status': statuses[i % len(statuses)]}),
+    }
+
+    print(f'{"endpoint":<16}{"variant":<8}{"req/s":>10}{"p50 ms":>10}{"p99 ms":>10}{"errors":>8}')
+    for name, request in endpoints.items():
+        for prefix in ('sync', 'async'):
+            result = asyncio.run(drive(
+                application, args.requests, args.concurrency, lambda i: request(prefix, i)))
+            print(f'{name:<16}{prefix:<8}{result["rps"]:>10.0f}{result["p50_ms"]:>10.2f}'
+                  f'{result["p99_ms"]:>10.2f}{result["errors"]:>8}')
+
+
+if __name__ == '__main__':
+    main()
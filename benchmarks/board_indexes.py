@@ -0,0 +1,61 @@
+"""
+Benchmark the composite TicketeerTask indexes.
+Seeds a large board (1M tasks by default), times the hot queries with the
+indexes in place, drops them, times the same queries again and restores them.
+
+    python -m benchmarks.board_indexes --tasks 1000000 --users 100
+"""
+from benchmarks._setup import argument_parser, measure, seed, setup_django
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.set_defaults(tasks=1_000_000, users=100)
+    parser.add_argument('--repeat', type=int, default=20, help='runs per query')
+    args = parser.parse_args()
+    setup_django(args.db)
+
+    from django.db import connection
+    from ticketeer.models import TicketeerTask
+    from ticketeer.views import TaskBoardAPIView
+
+    users = seed(args.users, args.tasks)
+    author = users[len(users) // 2]
+    tasks = TicketeerTask.objects.filter(author=author)
+
+    # Only ids are fetched so the timings show database work, not model
+    # instantiation in Python.
+    queries = {
+        'board (status, date, id)': tasks.order_by(*TaskBoardAPIView.ordering),
+        'status column by date': tasks.filter(status='todo').order_by('date'),
+        'prio filter': tasks.filter(prio='urgent'),
+        'cursor page (date, id)': tasks.order_by('date', 'id')[:100],
+    }
+
+    def run():
+        return {
+            name: measure(lambda: list(query.values_list('id', flat=True)), args.repeat)
+            for name, query in queries.items()
+        }
+
+    indexes = TicketeerTask._meta.indexes
+    with_indexes = run()
+    with connection.schema_editor() as editor:
+        for index in indexes:
+            editor.remove_index(TicketeerTask, index)
+    try:
+        without_indexes = run()
+    finally:
+        with connection.schema_editor() as editor:
+            for index in indexes:
+                editor.add_index(TicketeerTask, index)
+
+    print(f'{TicketeerTask.objects.count()} tasks, {tasks.count()} on the measured board')
+    print(f'{"query":<28}{"no index ms":>14}{"index ms":>12}{"speedup":>10}')
+    for name in queries:
+        before, after = without_indexes[name], with_indexes[name]
+        print(f'{name:<28}{before:>14.2f}{after:>12.2f}{before / after:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
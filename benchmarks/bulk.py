@@ -0,0 +1,66 @@
+"""
+Benchmark POST /tasks/bulk/ with large requests.
+Each round sends one request creating `--items` tasks, one updating all of
+them (half change the status, half the title and prio) and one deleting
+them, through the WSGI application. Reports the median latency and the
+database queries of each request.
+
+    python -m benchmarks.bulk --items 10000 --rounds 3
+"""
+import logging
+import time
+from benchmarks._setup import argument_parser, seed, setup_django
+from benchmarks._wsgi import wsgi_request
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.set_defaults(users=1, tasks=10_000)
+    parser.add_argument('--items', type=int, nargs='+', default=[1000, 10_000], help='operations per request')
+    parser.add_argument('--rounds', type=int, default=3, help='requests per operation and size')
+    args = parser.parse_args()
+    setup_django(args.db)
+    logging.getLogger('ticketeer.metrics').setLevel(logging.ERROR)
+
+    import json
+    from django.core.wsgi import get_wsgi_application
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from rest_framework.authtoken.models import Token
+
+    user = seed(args.users, args.tasks)[0]
+    token = Token.objects.get_or_create(user=user)[0].key
+    application = get_wsgi_application()
+
+    def post(body):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            status, content = wsgi_request(application, 'POST', '/tasks/bulk/', token, body)
+            elapsed = time.perf_counter() - started
+        assert status == 200, (status, content[:200])
+        return elapsed, len(queries), json.loads(content)['results']
+
+    print(f'{"items":>8}{"operation":>12}{"median ms":>12}{"queries":>10}')
+    for items in args.items:
+        timings = {'create': [], 'update': [], 'delete': []}
+        queries = {}
+        for _ in range(args.rounds):
+            elapsed, queries['create'], results = post([
+                {'op': 'create', 'title': f'Bulk {index}', 'subtitle': 'bench', 'content': 'Created in bulk'}
+                for index in range(items)])
+            timings['create'].append(elapsed)
+            ids = [result['id'] for result in results]
+            elapsed, queries['update'], _ = post([
+                {'op': 'update', 'id': pk, 'status': 'done'} if index % 2 else
+                {'op': 'update', 'id': pk, 'title': f'Renamed {index}', 'prio': 'urgent'}
+                for index, pk in enumerate(ids)])
+            timings['update'].append(elapsed)
+            elapsed, queries['delete'], _ = post([{'op': 'delete', 'id': pk} for pk in ids])
+            timings['delete'].append(elapsed)
+        for operation, values in timings.items():
+            values.sort()
+            print(f'{items:>8}{operation:>12}{values[len(values) // 2] * 1000:>12.1f}{queries[operation]:>10}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark single-flight coalescing of concurrent identical board reads.
+Simulates one user with many open tabs: after every write, `--concurrency`
+identical /tasks/ requests arrive at once on a cold cache. Runs the bursts
+through the WSGI application with coalescing enabled and disabled and
+reports board computations, database queries and latency per burst.
+
+    python -m benchmarks.coalescing --tasks 20000 --users 2 --concurrency 16
+"""
+import logging
+import threading
+import time
+from benchmarks._setup import argument_parser, seed, setup_django
+from benchmarks._wsgi import wsgi_request
+
+
+def burst(application, token, concurrency):
+    """
+    Send `concurrency` identical list requests at the same moment.
+    Returns:
+        list: Latency of each request in seconds.
+    """
+    barrier = threading.Barrier(concurrency)
+    latencies = []
+
+    def client():
+        from django.db import connections
+        barrier.wait()
+        started = time.perf_counter()
+        status, body = wsgi_request(application, 'GET', '/tasks/', token, None, 'page_size=500')
+        latencies.append(time.perf_counter() - started)
+        assert status == 200, status
+        connections.close_all()
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.set_defaults(users=2, tasks=20_000)
+    parser.add_argument('--concurrency', type=int, default=16, help='identical requests per burst')
+    parser.add_argument('--bursts', type=int, default=10, help='bursts per mode')
+    args = parser.parse_args()
+    setup_django(args.db)
+    logging.getLogger('ticketeer.metrics').setLevel(logging.ERROR)
+
+    from django.conf import settings
+    from django.core.wsgi import get_wsgi_application
+    from django.db.backends.signals import connection_created
+    from rest_framework.authtoken.models import Token
+    from ticketeer.cache import board_cache
+    from ticketeer.views import TaskListCreateAPIView
+
+    user = seed(args.users, args.tasks)[0]
+    token = Token.objects.get_or_create(user=user)[0].key
+    application = get_wsgi_application()
+
+    computations = queries = 0
+    lock = threading.Lock()
+    get_list_data = TaskListCreateAPIView.get_list_data
+
+    def counting_list_data(self, *a, **kw):
+        nonlocal computations
+        with lock:
+            computations += 1
+        return get_list_data(self, *a, **kw)
+
+    def count_queries(execute, sql, params, many, context):
+        nonlocal queries
+        with lock:
+            queries += 1
+        return execute(sql, params, many, context)
+
+    def install(sender, connection, **kwargs):
+        connection.execute_wrappers.append(count_queries)
+
+    TaskListCreateAPIView.get_list_data = counting_list_data
+    connection_created.connect(install)
+
+    print(f'{args.concurrency} concurrent identical requests per burst, {args.bursts} bursts')
+    print(f'{"mode":<14}{"computations":>14}{"queries":>10}{"p50 ms":>10}{"max ms":>10}')
+    for mode, window in (('coalesced', 1.0), ('uncoalesced', 0)):
+        settings.TICKETEER_COALESCE_WINDOW = window
+        computations = queries = 0
+        latencies = []
+        for _ in range(args.bursts):
+            board_cache.invalidate(user.pk)
+            latencies += burst(application, token, args.concurrency)
+        latencies.sort()
+        print(f'{mode:<14}{computations / args.bursts:>14.1f}{queries / args.bursts:>10.1f}'
+              f'{latencies[len(latencies) // 2] * 1000:>10.1f}{latencies[-1] * 1000:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+Stress the database with concurrent task writes under both database profiles.
+Every worker process is one server worker with its own user: it sends
+status moves (PATCH /tasks/<pk>/status/); every fifth request instead
+moves 20 tasks, alternating between PATCH /tasks/status/ and a bulk update
+(POST /tasks/bulk/, one transaction that reads before it writes). All
+workers start at once; the run is repeated with
+KANBAN_DB_PROFILE=development and KANBAN_DB_PROFILE=production.
+
+    python -m benchmarks.db_profile --workers 8 --requests 500
+"""
+import multiprocessing
+import os
+import statistics
+import time
+from benchmarks._setup import argument_parser, seed, setup_django
+
+PROFILES = ('development', 'production')
+
+
+def worker(db_path, profile, index, requests, barrier, results):
+    """
+    Send the write requests of one worker and report its results.
+    Args:
+        db_path: SQLite file of the benchmark.
+        profile: Database profile to run with.
+        index: Number of the worker (selects its user).
+        requests: Number of requests to send.
+        barrier: Barrier releasing all workers at once.
+        results: Queue receiving (successes, errors, latencies).
+    """
+    os.environ['KANBAN_DB_PROFILE'] = profile
+    setup_django(db_path, migrate=False)
+
+    from django.contrib.auth.models import User
+    from rest_framework.authtoken.models import Token
+    from rest_framework.test import APIClient
+    from ticketeer.models import TicketeerTask
+
+    user = User.objects.get(username=f'bench{index}')
+    token, created = Token.objects.get_or_create(user=user)
+    task_ids = list(TicketeerTask.objects.filter(author=user).values_list('id', flat=True))
+    statuses = [value for value, label in TicketeerTask.STATUS_CHOICES]
+    client = APIClient(raise_request_exception=False)
+    client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+    successes, errors, latencies = 0, 0, []
+    barrier.wait()
+    for number in range(requests):
+        status = statuses[number % len(statuses)]
+        started = time.perf_counter()
+        first = number % (len(task_ids) - 20)
+        if number % 10 == 4:
+            response = client.patch('/tasks/status/', {'ids': task_ids[first:first + 20], 'status': status},
+                                    format='json')
+        elif number % 10 == 9:
+            operations = [{'op': 'update', 'id': pk, 'status': status} for pk in task_ids[first:first + 20]]
+            response = client.post('/tasks/bulk/', operations, format='json')
+        else:
+            response = client.patch(f'/tasks/{task_ids[number % len(task_ids)]}/status/', {'status': status},
+                                    format='json')
+        latencies.append(time.perf_counter() - started)
+        if response.status_code == 200:
+            successes += 1
+        else:
+            errors += 1
+    results.put((successes, errors, latencies))
+
+
+def run(db_path, profile, workers, requests):
+    """
+    Run all workers with one profile.
+    Returns:
+        dict: Successful writes per second, error count and latency percentiles.
+    """
+    context = multiprocessing.get_context('spawn')
+    barrier = context.Barrier(workers + 1)
+    results = context.Queue()
+    processes = [
+        context.Process(target=worker, args=(db_path, profile, index, requests, barrier, results))
+        for index in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    barrier.wait()
+    started = time.perf_counter()
+    outcomes = [results.get() for _ in processes]
+    elapsed = time.perf_counter() - started
+    for process in processes:
+        process.join()
+
+    latencies = sorted(latency for outcome in outcomes for latency in outcome[2])
+    return {
+        'writes/s': sum(outcome[0] for outcome in outcomes) / elapsed,
+        'errors': sum(outcome[1] for outcome in outcomes),
+        'p50 ms': statistics.median(latencies) * 1000,
+        'p99 ms': latencies[max(int(len(latencies) * 0.99) - 1, 0)] * 1000,
+    }
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.set_defaults(users=8, tasks=8 * 200)
+    parser.add_argument('--workers', type=int, default=8, help='concurrent worker processes')
+    parser.add_argument('--requests', type=int, default=500, help='requests per worker')
+    args = parser.parse_args()
+    os.environ['KANBAN_DB_PROFILE'] = 'development'
+    setup_django(args.db)
+    seed(max(args.users, args.workers), max(args.tasks, args.workers * 200))
+
+    from django.db import connection
+    # Start from the rollback journal; the production run switches the file to WAL.
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA journal_mode = DELETE')
+    connection.close()
+
+    print(f'{args.workers} workers x {args.requests} requests')
+    print(f'{"profile":<14}{"writes/s":>10}{"errors":>8}{"p50 ms":>9}{"p99 ms":>9}')
+    for profile in PROFILES:
+        result = run(args.db, profile, args.workers, args.requests)
+        print(f'{profile:<14}{result["writes/s"]:>10.1f}{result["errors"]:>8}'
+              f'{result["p50 ms"]:>9.2f}{result["p99 ms"]:>9.2f}')
+
+
+if __name__ == '__main__':
+    main()
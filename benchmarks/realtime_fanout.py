@@ -0,0 +1,103 @@
+"""
+Load test for the real-time task events (WebSocket /ws/tasks/).
+Opens many in-memory WebSocket connections against the ASGI application of
+one worker, publishes events from a worker thread (like the sync views do)
+and measures how long the fan-out to every connection takes.
+
+    python -m benchmarks.realtime_fanout --subscribers 100 1000 5000 10000
+"""
+import asyncio
+import json
+import statistics
+import threading
+import time
+from benchmarks._setup import argument_parser, setup_django
+
+
+class FakeSocket:
+    """
+    In-memory ASGI WebSocket connection recording delivery latencies.
+    """
+
+    def __init__(self, latencies):
+        self.inbox = asyncio.Queue()
+        self.latencies = latencies
+        self.accepted = asyncio.Event()
+
+    async def receive(self):
+        return await self.inbox.get()
+
+    async def send(self, message):
+        if message['type'] == 'websocket.accept':
+            self.accepted.set()
+        elif message['type'] == 'websocket.send':
+            sent = json.loads(message['text'])['sent']
+            self.latencies.append(time.perf_counter() - sent)
+
+
+async def run_round(application, token, author_id, subscribers, events, interval):
+    from ticketeer.events import task_channel
+    from ticketeer.pubsub import get_broker
+
+    latencies = []
+    sockets = [FakeSocket(latencies) for _ in range(subscribers)]
+    scope = {'type': 'websocket', 'path': '/ws/tasks/', 'query_string': f'token={token}'.encode()}
+    connections = [asyncio.create_task(application(scope, socket.receive, socket.send)) for socket in sockets]
+    for socket in sockets:
+        socket.inbox.put_nowait({'type': 'websocket.connect'})
+    await asyncio.gather(*(socket.accepted.wait() for socket in sockets))
+
+    broker = get_broker()
+
+    def publish():
+        for _ in range(events):
+            broker.publish(task_channel(author_id), json.dumps({'event': 'moved', 'sent': time.perf_counter()}))
+            time.sleep(interval)
+
+    started = time.perf_counter()
+    publisher = threading.Thread(target=publish)
+    publisher.start()
+    expected = subscribers * events
+    while len(latencies) < expected and time.perf_counter() - started < 60:
+        await asyncio.sleep(0.005)
+    elapsed = time.perf_counter() - started
+    publisher.join()
+
+    for socket in sockets:
+        socket.inbox.put_nowait({'type': 'websocket.disconnect'})
+    await asyncio.gather(*connections)
+
+    latencies.sort()
+    return {
+        'delivered': len(latencies),
+        'expected': expected,
+        'deliveries_per_s': len(latencies) / elapsed,
+        'p50_ms': statistics.median(latencies) * 1000 if latencies else None,
+        'p99_ms': latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else None,
+    }
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--subscribers', type=int, nargs='+', default=[100, 1000, 5000, 10000])
+    parser.add_argument('--events', type=int, default=50, help='events published per round')
+    parser.add_argument('--interval', type=float, default=0.01, help='seconds between two events')
+    args = parser.parse_args()
+    setup_django(args.db)
+
+    from kanban_backend.asgi import application
+    from rest_framework.authtoken.models import Token
+    from benchmarks._setup import seed
+
+    user = seed(1, 0)[0]
+    token, created = Token.objects.get_or_create(user=user)
+
+    print(f'{"subscribers":>12}{"delivered":>12}{"deliveries/s":>15}{"p50 ms":>10}{"p99 ms":>10}')
+    for subscribers in args.subscribers:
+        result = asyncio.run(run_round(application, token.key, user.pk, subscribers, args.events, args.interval))
+        print(f'{subscribers:>12}{result["delivered"]:>12}{result["deliveries_per_s"]:>15.0f}'
+              f'{result["p50_ms"]:>10.2f}{result["p99_ms"]:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
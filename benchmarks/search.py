@@ -0,0 +1,48 @@
+"""
+Benchmark the task search backends.
+Seeds a large board (1M tasks by default) and times the first result page
+of a few searches with the SQLite FTS5 index and with icontains filters.
+
+    python -m benchmarks.search --tasks 1000000 --users 100
+"""
+from benchmarks._setup import argument_parser, measure, seed, setup_django
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.set_defaults(tasks=1_000_000, users=100)
+    parser.add_argument('--repeat', type=int, default=20, help='runs per search')
+    parser.add_argument('--page-size', type=int, default=20, help='results per page')
+    args = parser.parse_args()
+    setup_django(args.db)
+
+    from ticketeer.models import TicketeerTask
+    from ticketeer.search import IContainsSearchBackend, SQLiteFTSSearchBackend
+
+    users = seed(args.users, args.tasks)
+    author = users[len(users) // 2]
+    tasks = TicketeerTask.objects.filter(author=author)
+    sample = tasks.order_by('id')[tasks.count() // 2]
+
+    searches = {
+        'one task (rare word)': sample.title.split()[-1],
+        'subtitle (some tasks)': sample.subtitle,
+        'every task (common word)': 'benchmark',
+        'no match': 'nonexistent',
+    }
+    backends = {'icontains': IContainsSearchBackend(), 'fts5': SQLiteFTSSearchBackend()}
+    timings = {
+        (name, backend_name): measure(lambda: backend.search(author.pk, query, 0, args.page_size + 1), args.repeat)
+        for name, query in searches.items()
+        for backend_name, backend in backends.items()
+    }
+
+    print(f'{TicketeerTask.objects.count()} tasks, {tasks.count()} on the searched board')
+    print(f'{"search":<28}{"icontains ms":>14}{"fts5 ms":>10}{"speedup":>10}')
+    for name in searches:
+        before, after = timings[name, 'icontains'], timings[name, 'fts5']
+        print(f'{name:<28}{before:>14.2f}{after:>10.2f}{before / after:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
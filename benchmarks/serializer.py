@@ -0,0 +1,53 @@
+"""
+Compare TaskSerializer + JSONRenderer with the TaskRowEncoder fast path.
+Reports time and peak Python memory (tracemalloc) for rendering a board of
+each requested size and checks that both produce identical bytes.
+
+    python -m benchmarks.serializer --rows 10000 100000
+"""
+import time
+import tracemalloc
+from benchmarks._setup import argument_parser, seed, setup_django
+
+
+def profile(func):
+    """
+    Run a callable once under tracemalloc.
+    Returns:
+        tuple: (result, seconds, peak MiB)
+    """
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argument_parser(__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000])
+    args = parser.parse_args()
+    setup_django(args.db)
+
+    from rest_framework.renderers import JSONRenderer
+    from ticketeer.models import TicketeerTask
+    from ticketeer.serializers import TaskRowEncoder, TaskSerializer
+
+    seed(1, max(args.rows))
+    tasks = TicketeerTask.objects.order_by('id')
+
+    print(f'{"rows":>8}{"path":>14}{"seconds":>10}{"peak MiB":>10}')
+    for rows in args.rows:
+        queryset = tasks[:rows]
+        slow, slow_time, slow_peak = profile(
+            lambda: JSONRenderer().render(TaskSerializer(queryset, many=True).data))
+        fast, fast_time, fast_peak = profile(lambda: TaskRowEncoder().render(queryset))
+        assert slow == fast, 'fast path output differs from TaskSerializer'
+        print(f'{rows:>8}{"serializer":>14}{slow_time:>10.3f}{slow_peak:>10.1f}')
+        print(f'{rows:>8}{"row encoder":>14}{fast_time:>10.3f}{fast_peak:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -5,6 +5,9 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.0/howto/deployment/asgi/
+
+WebSocket connections are routed to the ticketeer real-time consumers,
+everything else is handled by Django.
 """
 
 import os
@@ -13,4 +16,11 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'kanban_backend.settings')
 
-application = get_asgi_application()
\ No newline at end of file
+django_application = get_asgi_application()
+
+# Imported after the Django setup done by get_asgi_application().
+from ticketeer.realtime import TaskEventsConsumer, WebSocketRouter  # noqa: E402
+
+application = WebSocketRouter(django_application, {
+    '/ws/tasks/': TaskEventsConsumer(),
+})
@@ -0,0 +1,122 @@
+"""
+Database profiles selected with environment variables.
+
+    KANBAN_DB_PROFILE       development (default) or production
+    KANBAN_DB_ENGINE        sqlite (default), postgresql or mysql
+    KANBAN_DB_NAME          SQLite file or database name
+    KANBAN_DB_USER / KANBAN_DB_PASSWORD / KANBAN_DB_HOST / KANBAN_DB_PORT
+    KANBAN_DB_CONN_MAX_AGE  Seconds a connection is reused, "none" for no limit
+                            (default: 0 for development, 600 for production)
+    KANBAN_DB_POOLER        1 if server connections go through a transaction
+                            pooler such as PgBouncer
+    KANBAN_SQLITE_BUSY_TIMEOUT  Milliseconds to wait for a locked database (5000)
+    KANBAN_SQLITE_MMAP_SIZE     Bytes of the database file to memory-map (256 MiB)
+    KANBAN_DB_REPLICAS      Comma separated read replicas: SQLite files (or
+                            `file:` URIs) or hosts of server databases
+
+The development profile is the plain Django default. The production profile
+keeps connections open between requests (with health checks) and, on
+SQLite, switches to WAL with synchronous=NORMAL, memory-mapped reads,
+a busy timeout and immediate transactions.
+"""
+import os
+
+ENGINES = {
+    'sqlite': 'django.db.backends.sqlite3',
+    'postgresql': 'django.db.backends.postgresql',
+    'mysql': 'django.db.backends.mysql',
+}
+PROFILES = ('development', 'production')
+
+
+def database_settings(base_dir, environ=os.environ):
+    """
+    Build the default DATABASES entry from the environment.
+    Args:
+        base_dir: Project directory, holding the default SQLite file.
+        environ: Mapping of environment variables.
+    Returns:
+        dict: Settings of the default database.
+    Raises:
+        ValueError: If the profile or engine is unknown.
+    """
+    profile = environ.get('KANBAN_DB_PROFILE', 'development')
+    engine = environ.get('KANBAN_DB_ENGINE', 'sqlite')
+    if profile not in PROFILES:
+        raise ValueError(f'Unknown KANBAN_DB_PROFILE "{profile}", expected one of: {", ".join(PROFILES)}.')
+    if engine not in ENGINES:
+        raise ValueError(f'Unknown KANBAN_DB_ENGINE "{engine}", expected one of: {", ".join(ENGINES)}.')
+    production = profile == 'production'
+
+    database = {
+        'ENGINE': ENGINES[engine],
+        'NAME': environ.get('KANBAN_DB_NAME') or (base_dir / 'db.sqlite3' if engine == 'sqlite' else 'kanban'),
+        'CONN_MAX_AGE': conn_max_age(environ.get('KANBAN_DB_CONN_MAX_AGE'), 600 if production else 0),
+        'CONN_HEALTH_CHECKS': production,
+    }
+    if engine == 'sqlite':
+        if production:
+            database['ENGINE'] = 'kanban_backend.db.sqlite3'
+            database['OPTIONS'] = {
+                'transaction_mode': 'IMMEDIATE',
+                'pragmas': {
+                    'journal_mode': 'WAL',
+                    'synchronous': 'NORMAL',
+                    'busy_timeout': int(environ.get('KANBAN_SQLITE_BUSY_TIMEOUT', 5000)),
+                    'mmap_size': int(environ.get('KANBAN_SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+                    'temp_store': 'MEMORY',
+                },
+            }
+        return database
+
+    database.update({
+        'USER': environ.get('KANBAN_DB_USER', ''),
+        'PASSWORD': environ.get('KANBAN_DB_PASSWORD', ''),
+        'HOST': environ.get('KANBAN_DB_HOST', ''),
+        'PORT': environ.get('KANBAN_DB_PORT', ''),
+    })
+    if environ.get('KANBAN_DB_POOLER') == '1':
+        # Transaction pooling hands each transaction to any server connection,
+        # named cursors would not survive that.
+        database['DISABLE_SERVER_SIDE_CURSORS'] = True
+    return database
+
+
+def replica_settings(primary, environ=os.environ):
+    """
+    Build the DATABASES entries of the read replicas listed in KANBAN_DB_REPLICAS.
+    Replicas share the primary's settings apart from the file (SQLite) or the
+    host. In tests they mirror the primary test database.
+    Args:
+        primary: Settings of the default database.
+        environ: Mapping of environment variables.
+    Returns:
+        dict: Replica aliases (replica1, replica2, ...) mapped to their settings.
+    """
+    replicas = {}
+    entries = [entry.strip() for entry in environ.get('KANBAN_DB_REPLICAS', '').split(',') if entry.strip()]
+    for number, entry in enumerate(entries, 1):
+        database = {**primary, 'TEST': {'MIRROR': 'default'}}
+        if primary['ENGINE'].endswith('sqlite3'):
+            database['NAME'] = entry
+        else:
+            host, _, port = entry.partition(':')
+            database.update(HOST=host, PORT=port or primary['PORT'])
+        replicas[f'replica{number}'] = database
+    return replicas
+
+
+def conn_max_age(value, default):
+    """
+    Parse KANBAN_DB_CONN_MAX_AGE.
+    Args:
+        value: Raw environment value (None if unset).
+        default: Value for an unset variable.
+    Returns:
+        int | None: Seconds, or None for connections that are never closed for age.
+    """
+    if value is None or value == '':
+        return default
+    if value.lower() == 'none':
+        return None
+    return int(value)
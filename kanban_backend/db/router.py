@@ -0,0 +1,214 @@
+"""
+Read replica routing.
+
+Reads of the ticketeer models go to one of the DATABASE_REPLICAS aliases,
+everything else (writes, auth, sessions, tokens) to the primary `default`
+database. To read their own writes despite replication lag, users stick
+to the primary for DATABASE_REPLICA_STICKY_SECONDS after a request of
+theirs wrote something; ReplicaStickinessMiddleware keeps track of that.
+Stickiness is per user rather than per client, so a second device of the
+user never reads (and puts into the board cache) pre-write data.
+"""
+import contextvars
+import dataclasses
+import random
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+@dataclasses.dataclass
+class ReplicaState:
+    """
+    Routing state of the current request.
+    Mutated in place, so changes made in sync_to_async threads are seen by the request.
+    Attributes:
+        request: The current request (None outside of requests).
+        pinned: Whether the user is pinned to the primary, None until known.
+        wrote: Something was written during the request.
+    """
+    request: object = None
+    pinned: bool = None
+    wrote: bool = False
+
+    def is_pinned(self):
+        """
+        Check whether the requesting user wrote something recently.
+        The user is only known once the view authenticated the request,
+        until then reads are not pinned.
+        Returns:
+            bool: True if reads have to go to the primary.
+        """
+        if self.pinned is None:
+            user = getattr(self.request, 'user', None)
+            if user is None or not user.is_authenticated:
+                return False
+            self.pinned = sticky_cache().get(sticky_key(user.pk)) is not None
+        return self.pinned
+
+
+def sticky_cache():
+    """
+    Returns:
+        BaseCache: Cache holding the stickiness marks, shared by all server processes.
+    """
+    return caches[getattr(settings, 'DATABASE_REPLICA_STICKY_CACHE', 'default')]
+
+
+def sticky_key(user_id):
+    """
+    Build the cache key of a user's stickiness mark.
+    Args:
+        user_id: Primary key of the user.
+    Returns:
+        str: Cache key.
+    """
+    return f'kanban:replica:sticky:{user_id}'
+
+
+replica_state = contextvars.ContextVar('replica_state', default=None)
+
+
+class ReplicaRouter:
+    """
+    Database router sending ticketeer reads to the replicas.
+    Reads go to the primary instead while the request is pinned to it
+    (recent write by the same user), after the request wrote something
+    itself and inside transactions on the primary.
+    Attributes:
+        app_labels: Apps whose reads may be served by replicas.
+    """
+
+    app_labels = {'ticketeer'}
+
+    @property
+    def replicas(self):
+        """
+        Returns:
+            list: Aliases of the read replicas.
+        """
+        return getattr(settings, 'DATABASE_REPLICAS', [])
+
+    def db_for_read(self, model, **hints):
+        """
+        Pick the database for a read query.
+        Args:
+            model: Model being queried.
+            **hints: Router hints.
+        Returns:
+            str | None: A replica alias, or None for the primary.
+        """
+        if not self.replicas or model._meta.app_label not in self.app_labels:
+            return None
+        state = replica_state.get()
+        if state is not None and (state.wrote or state.is_pinned()):
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(self.replicas)
+
+    def db_for_write(self, model, **hints):
+        """
+        Send every write to the primary and remember that the request wrote.
+        Args:
+            model: Model being written.
+            **hints: Router hints.
+        Returns:
+            str | None: The primary alias, or None without replicas.
+        """
+        if not self.replicas:
+            return None
+        state = replica_state.get()
+        if state is None:
+            state = ReplicaState()
+            replica_state.set(state)
+        state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """
+        Allow relations between objects loaded from the primary and its replicas.
+        Returns:
+            bool | None: True if both objects come from the same replica set.
+        """
+        pool = {DEFAULT_DB_ALIAS, *self.replicas}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        """
+        Never migrate replicas; they receive the schema from the primary.
+        Returns:
+            bool | None: False for replica aliases.
+        """
+        if db in self.replicas:
+            return False
+        return None
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Pin users to the primary database for a short time after they wrote.
+    The marks live in the DATABASE_REPLICA_STICKY_CACHE cache alias, which
+    has to be shared by all server processes.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        """
+        Args:
+            get_response: The next middleware or view.
+        """
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        """
+        Route the request's reads and remember writes.
+        Args:
+            request: Django HTTP request object.
+        Returns:
+            HttpResponse: The response.
+        """
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not getattr(settings, 'DATABASE_REPLICAS', []):
+            return self.get_response(request)
+        state = ReplicaState(request=request)
+        token = replica_state.set(state)
+        try:
+            return self.get_response(request)
+        finally:
+            replica_state.reset(token)
+            self.finish(request, state)
+
+    async def __acall__(self, request):
+        """
+        Async variant of `__call__()`.
+        """
+        if not getattr(settings, 'DATABASE_REPLICAS', []):
+            return await self.get_response(request)
+        state = ReplicaState(request=request)
+        token = replica_state.set(state)
+        try:
+            return await self.get_response(request)
+        finally:
+            replica_state.reset(token)
+            self.finish(request, state)
+
+    def finish(self, request, state):
+        """
+        Pin the user to the primary if the request wrote something.
+        Args:
+            request: Django HTTP request object; views set `request.user` when authenticating.
+            state: Routing state of the finished request.
+        """
+        user = getattr(request, 'user', None)
+        if state.wrote and user is not None and user.is_authenticated:
+            sticky_cache().set(sticky_key(user.pk), True,
+                               timeout=getattr(settings, 'DATABASE_REPLICA_STICKY_SECONDS', 5))
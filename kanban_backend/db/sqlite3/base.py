@@ -0,0 +1,48 @@
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    SQLite backend with per-connection tuning.
+    Understands two OPTIONS on top of the ones passed to sqlite3.connect():
+        pragmas: PRAGMA name -> value, applied to every new connection
+            (e.g. journal_mode=WAL, synchronous=NORMAL, mmap_size, busy_timeout).
+        transaction_mode: How transactions start, e.g. 'IMMEDIATE'. A deferred
+            transaction that reads first and writes later fails at once with
+            "database is locked" if another connection writes in between;
+            an immediate one takes the write lock up front and waits for it
+            (up to busy_timeout) instead.
+    """
+
+    custom_options = ('pragmas', 'transaction_mode')
+
+    def get_connection_params(self):
+        """
+        Strip the options sqlite3.connect() does not understand.
+        Returns:
+            dict: Keyword arguments for sqlite3.connect().
+        """
+        params = super().get_connection_params()
+        for name in self.custom_options:
+            params.pop(name, None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        """
+        Open a connection and apply the configured PRAGMAs.
+        Args:
+            conn_params: Keyword arguments for sqlite3.connect().
+        Returns:
+            sqlite3.Connection: The new connection.
+        """
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.settings_dict['OPTIONS'].get('pragmas', {}).items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        """
+        Start a transaction with the configured transaction mode.
+        """
+        mode = self.settings_dict['OPTIONS'].get('transaction_mode')
+        self.cursor().execute(f'BEGIN {mode}' if mode else 'BEGIN')
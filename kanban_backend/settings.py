@@ -10,7 +10,12 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.0/ref/settings/
 """
 
+import os
 from pathlib import Path
+from django.conf import global_settings
+from django.core.exceptions import ImproperlyConfigured
+
+from kanban_backend.db import database_settings, replica_settings
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -52,12 +57,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'ticketeer.metrics.MetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'kanban_backend.db.router.ReplicaStickinessMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -85,14 +92,148 @@ WSGI_APPLICATION = 'kanban_backend.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/4.0/ref/settings/#databases
+# Engine, connection reuse and SQLite tuning come from KANBAN_DB_* environment
+# variables, see kanban_backend/db/__init__.py. Without them this is the
+# plain SQLite database in db.sqlite3.
 
 DATABASES = {
+    'default': database_settings(BASE_DIR),
+}
+DATABASES.update(replica_settings(DATABASES['default']))
+
+# Reads of task data go to the replicas; a user who wrote something reads
+# from the primary for DATABASE_REPLICA_STICKY_SECONDS afterwards. The marks
+# are kept in the auth cache, shared between workers with KANBAN_REDIS_URL.
+DATABASE_ROUTERS = ['kanban_backend.db.router.ReplicaRouter']
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_REPLICA_STICKY_SECONDS = int(os.environ.get('KANBAN_DB_STICKY_SECONDS', 5))
+DATABASE_REPLICA_STICKY_CACHE = 'ticketeer-auth'
+
+
+# Caches
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# The board cache keeps serialized task lists per user, the auth cache keeps
+# token -> user lookups. Local memory is process-local and evicts the least
+# recently used entries once MAX_ENTRIES is reached; set KANBAN_REDIS_URL to
+# share both between workers via Redis.
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'ticketeer-board': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'ticketeer-board',
+        'OPTIONS': {
+            'MAX_ENTRIES': 1000,
+        },
+    },
+    'ticketeer-auth': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'ticketeer-auth',
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
 }
 
+if os.environ.get('KANBAN_REDIS_URL'):
+    for alias in ('ticketeer-board', 'ticketeer-auth'):
+        CACHES[alias] = {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['KANBAN_REDIS_URL'],
+            'KEY_PREFIX': alias,
+            'TIMEOUT': 300,
+        }
+
+TICKETEER_BOARD_CACHE = 'ticketeer-board'
+TICKETEER_AUTH_CACHE = 'ticketeer-auth'
+# Revoking a token (deleting it, deactivating or changing the password of its
+# user) only clears the cache of the process handling the change. With a
+# process-local auth cache, other workers accept the revoked token until
+# their cached copy expires, so cached tokens live this long there; with
+# KANBAN_REDIS_URL revocation applies at once to all workers.
+TICKETEER_AUTH_CACHE_LOCAL_TIMEOUT = 5  # seconds
+TICKETEER_BOARD_CACHE_TIMEOUT = 300  # seconds
+# Larger board data is recomputed on every request instead of cached, which
+# bounds the board cache to MAX_ENTRIES * TICKETEER_BOARD_CACHE_MAX_BYTES
+# (about 256 MB per process with local memory).
+TICKETEER_BOARD_CACHE_MAX_BYTES = 256 * 1024
+# Concurrent identical board reads within one worker share a single
+# computation on a cache miss; a computation can only be joined this many
+# seconds after it started (0 disables coalescing).
+TICKETEER_COALESCE_WINDOW = 1.0  # seconds
+
+
+# URL names of the task routes served by the ASGI-native views in
+# ticketeer.async_views instead of the DRF views, e.g.
+# {'task-list-create', 'task-detail', 'task-status-update', 'create'}.
+# Only useful when running under an ASGI server.
+
+TICKETEER_ASYNC_ROUTES = set(filter(None, os.environ.get('KANBAN_ASYNC_ROUTES', '').split(',')))
+
+
+# Real-time task events (WebSocket /ws/tasks/)
+# The in-process broker only reaches subscribers of the same ASGI worker.
+
+TICKETEER_PUBSUB_BACKEND = 'ticketeer.pubsub.InProcessBroker'
+TICKETEER_PUBSUB_QUEUE_SIZE = 100  # undelivered events per connection before it is dropped
+
+# Request metrics (/metrics/, Prometheus text format). Requests over one of
+# the budgets are logged as warnings on the ticketeer.metrics logger. Set
+# KANBAN_METRICS_TOKEN to require `Authorization: Bearer <token>` for scrapes.
+# Without a token only direct requests from KANBAN_METRICS_NETWORKS (comma
+# separated, loopback by default) are served, never requests through a proxy.
+
+TICKETEER_QUERY_BUDGET = 20  # database queries per request
+TICKETEER_LATENCY_BUDGET = 0.5  # seconds
+TICKETEER_BUDGET_EXEMPT_ROUTES = {'task-import', 'task-export'}
+TICKETEER_METRICS_TOKEN = os.environ.get('KANBAN_METRICS_TOKEN')
+TICKETEER_METRICS_NETWORKS = os.environ.get('KANBAN_METRICS_NETWORKS', '127.0.0.0/8,::1/128').split(',')
+
+
+# Task search (/tasks/search/). None picks the SQLite FTS5 index on SQLite and
+# plain icontains filters elsewhere; set a dotted path to force a backend.
+
+TICKETEER_SEARCH_BACKEND = None
+
+
+# Optimistic concurrency control of task writes (see ticketeer.concurrency).
+# Updates and deletes naming no version (If-Match header or `version` field,
+# per item in bulk requests) are based on the version just read, so they
+# overwrite changes made before the request (last writer wins); True answers
+# them with 428 instead.
+
+TICKETEER_REQUIRE_PRECONDITION = False
+
+
+# Delta sync (/tasks/sync/). Deleted tasks leave tombstones for this many
+# days; clients that last synced before get the whole board again. Each sync
+# repeats the changes of the overlap window before the previous one, which
+# covers writes that committed while that sync ran.
+
+TICKETEER_SYNC_TOMBSTONE_DAYS = 30
+TICKETEER_SYNC_OVERLAP = 2  # seconds
+
+
+# Background jobs (exports, imports, cleanups; see ticketeer.jobs), run by
+# `python manage.py run_jobs`. Running jobs without a heartbeat for
+# TICKETEER_JOB_TIMEOUT seconds are retried up to TICKETEER_JOB_MAX_ATTEMPTS
+# times; finished jobs and their files are removed after the retention period.
+
+TICKETEER_JOB_FILES_DIR = os.environ.get('KANBAN_JOB_FILES_DIR', BASE_DIR / 'job_files')
+TICKETEER_JOB_PROCESSES = int(os.environ.get('KANBAN_JOB_PROCESSES', 2))
+TICKETEER_JOB_TIMEOUT = 300  # seconds
+TICKETEER_JOB_MAX_ATTEMPTS = 3
+TICKETEER_JOB_RETENTION_DAYS = 7
+
+
+# `python manage.py archive_tasks` moves done tasks that have not changed for
+# this many days from the task table into the archive (TicketeerTaskArchive).
+
+TICKETEER_ARCHIVE_AFTER_DAYS = 90
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
@@ -113,6 +254,17 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing. KANBAN_PASSWORD_HASHERS=fast hashes new passwords with a
+# single MD5 round, which makes creating users and logging in in tests and
+# benchmarks orders of magnitude faster. Existing hashes keep working (and are
+# rehashed on login). Never use it with real accounts.
+
+if os.environ.get('KANBAN_PASSWORD_HASHERS') == 'fast':
+    if os.environ.get('KANBAN_DB_PROFILE') == 'production':
+        raise ImproperlyConfigured('KANBAN_PASSWORD_HASHERS=fast must not be used with the production profile.')
+    PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher', *global_settings.PASSWORD_HASHERS]
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.0/topics/i18n/
 
@@ -141,12 +293,33 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.TokenAuthentication',
+        # TokenAuthentication with a cache of token -> user lookups.
+        'ticketeer.authentication.CachedTokenAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # Token buckets of ticketeer.throttling: bursts of N, refilled at N per period.
+    # KANBAN_THROTTLE=off disables them, e.g. for load tests.
+    'DEFAULT_THROTTLE_RATES': {
+        'login': '20/min',  # per client IP
+        'login_username': '10/min',  # per username
+        'register': '10/hour',  # per client IP
+    } if os.environ.get('KANBAN_THROTTLE', 'on') != 'off' else {
+        'login': None,
+        'login_username': None,
+        'register': None,
+    },
+    # Reverse proxies in front of the app. The throttles key on the client IP:
+    # with 0 that is REMOTE_ADDR and a client-supplied X-Forwarded-For is
+    # ignored; behind N proxies it is taken from X-Forwarded-For.
+    'NUM_PROXIES': int(os.environ.get('KANBAN_NUM_PROXIES', 0)),
 }
 
+# Cache holding the throttle buckets. The local memory default keeps separate
+# buckets per process, so with N workers a client gets up to N times the rate;
+# set KANBAN_REDIS_URL to share them between all server processes.
+TICKETEER_THROTTLE_CACHE = 'ticketeer-auth'
+
 # settings.py
 AUTH_USER_MODEL = 'auth.User'
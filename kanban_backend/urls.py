@@ -1,16 +1,31 @@
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path
 
-from ticketeer import views
+from ticketeer import async_views, views
+from ticketeer.metrics import metrics_view
 from ticketeer.views import LoginView, RegisterView
 
 # URL patterns for the Ticketeer application
 # This configuration routes URLs to views.
 
+
+def task_route(route, sync_view, async_view, name):
+    """
+    Route to the DRF view or, if its name is listed in TICKETEER_ASYNC_ROUTES,
+    to the ASGI-native view from ticketeer.async_views.
+    """
+    view = async_view if name in settings.TICKETEER_ASYNC_ROUTES else sync_view
+    return path(route, view, name=name)
+
+
 urlpatterns = [
     # Admin site URL
     path('admin/', admin.site.urls),
 
+    # Request metrics in Prometheus text format
+    path('metrics/', metrics_view, name='metrics'),
+
     # Login endpoint
     path('login/', views.LoginView.as_view(), name='login'),
 
@@ -18,14 +33,50 @@ urlpatterns = [
     path('register/', views.RegisterView.as_view(), name='register'),
 
     # Endpoint for listing and creating tasks
-    path('tasks/', views.TaskListCreateAPIView.as_view(), name='task-list-create'),
+    task_route('tasks/', views.TaskListCreateAPIView.as_view(),
+               async_views.AsyncTaskListCreateView.as_view(), 'task-list-create'),
+
+    # Endpoint for the kanban board (tasks grouped by status)
+    path('tasks/board/', views.TaskBoardAPIView.as_view(), name='task-board'),
+
+    # Endpoint for the dashboard summary (counts and doTime per status / priority)
+    path('tasks/summary/', views.TaskSummaryAPIView.as_view(), name='task-summary'),
+
+    # Endpoint for ranked full-text search over the user's tasks
+    path('tasks/search/', views.TaskSearchAPIView.as_view(), name='task-search'),
+
+    # Endpoint for the delta sync of offline clients (changes since a sync token)
+    path('tasks/sync/', views.TaskSyncAPIView.as_view(), name='task-sync'),
+
+    # Endpoint for streaming all tasks as JSON or NDJSON
+    path('tasks/export/', views.TaskExportAPIView.as_view(), name='task-export'),
+
+    # Endpoint for importing tasks from a CSV or NDJSON file
+    path('tasks/import/', views.TaskImportAPIView.as_view(), name='task-import'),
+
+    # Endpoint for bulk create / update / delete operations
+    path('tasks/bulk/', views.TaskBulkAPIView.as_view(), name='task-bulk'),
+
+    # Endpoint for moving several tasks to a new status at once
+    path('tasks/status/', views.TaskBatchStatusUpdateAPIView.as_view(), name='task-batch-status-update'),
+
+    # Endpoints for background jobs: queue an export, import or cleanup of
+    # done tasks, list the user's jobs, poll one, download an export
+    path('jobs/', views.JobListAPIView.as_view(), name='job-list'),
+    path('jobs/export/', views.ExportJobAPIView.as_view(), name='job-export'),
+    path('jobs/import/', views.ImportJobAPIView.as_view(), name='job-import'),
+    path('jobs/cleanup/', views.CleanupJobAPIView.as_view(), name='job-cleanup'),
+    path('jobs/<int:pk>/', views.JobDetailAPIView.as_view(), name='job-detail'),
+    path('jobs/<int:pk>/download/', views.JobDownloadAPIView.as_view(), name='job-download'),
 
     # Endpoint for creating a task (alternative method)
-    path('tasks/create/', views.create_task, name='create'),
+    task_route('tasks/create/', views.create_task, async_views.AsyncCreateTaskView.as_view(), 'create'),
 
     # Endpoint for retrieving, updating, and deleting a specific task by ID
-    path('tasks/<int:pk>/', views.TaskRetrieveUpdateDestroyAPIView.as_view(), name='task-detail'),
+    task_route('tasks/<int:pk>/', views.TaskRetrieveUpdateDestroyAPIView.as_view(),
+               async_views.AsyncTaskDetailView.as_view(), 'task-detail'),
 
     # Endpoint for updating the status of a specific task by ID
-    path('tasks/<int:pk>/status/', views.TaskStatusUpdateAPIView.as_view(), name='task-status-update'),
+    task_route('tasks/<int:pk>/status/', views.TaskStatusUpdateAPIView.as_view(),
+               async_views.AsyncTaskStatusView.as_view(), 'task-status-update'),
 ]
\ No newline at end of file
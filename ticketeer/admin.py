@@ -1,5 +1,7 @@
 from django.contrib import admin
-from ticketeer.models import TicketeerTask
+from ticketeer.models import TicketeerJob, TicketeerTask, TicketeerTaskArchive
 
-# Register TicketeerTask model with the Django admin interface
-admin.site.register(TicketeerTask)
\ No newline at end of file
+# Register the Ticketeer models with the Django admin interface
+admin.site.register(TicketeerTask)
+admin.site.register(TicketeerTaskArchive)
+admin.site.register(TicketeerJob)
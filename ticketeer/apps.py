@@ -2,4 +2,8 @@ from django.apps import AppConfig
 
 class TicketeerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'ticketeer'
\ No newline at end of file
+    name = 'ticketeer'
+
+    def ready(self):
+        # Connect the cache invalidation and search index signal handlers.
+        from ticketeer import signals  # noqa: F401
\ No newline at end of file
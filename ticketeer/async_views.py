@@ -0,0 +1,357 @@
+import json
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponse
+from django.utils.decorators import classonlymethod
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from ticketeer.models import TicketeerTask, TicketeerTaskArchive
+from .authentication import AsyncTokenAuthentication
+from .cache import board_cache
+from .conditional import (
+    conditional_response, detail_query, detail_validators, list_aggregates, list_validators, make_etag,
+    set_validators,
+)
+from .concurrency import asave_versioned, expected_version, write_conflict
+from .events import tasks_changed
+from .pagination import TaskCursorPagination
+from .serializers import TaskSerializer
+
+
+class AsyncTaskView(View):
+    """
+    Base class for the ASGI-native task views.
+    Runs entirely on the event loop: token authentication and all queries
+    use the async ORM, so a request never needs the sync-to-async thread hop
+    the DRF generic views pay under ASGI. Responses are rendered with DRF's
+    JSONRenderer and errors use the same `{"detail": ...}` format, and GET
+    requests get the same ETags and 304 handling as the DRF views.
+    Only token authentication is supported.
+    Attributes:
+        authentication: Authenticator used for every request.
+        renderer: Renderer producing the JSON responses.
+    """
+
+    authentication = AsyncTokenAuthentication()
+    renderer = JSONRenderer()
+    not_found = 'No TicketeerTask matches the given query.'
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        """
+        Create the view function; token authenticated views need no CSRF protection.
+        Returns:
+            function: The view function.
+        """
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        """
+        Authenticate the request and run the handler, turning API errors into JSON responses.
+        Args:
+            request: Django HTTP request object.
+            *args: Additional arguments.
+            **kwargs: Additional keyword arguments.
+        Returns:
+            HttpResponse: JSON response.
+        """
+        try:
+            self.user = await self.authentication.aauthenticate(request)
+            if self.user is None:
+                raise exceptions.NotAuthenticated()
+            # Like DRF, expose the user on the Django request (read by the replica router).
+            request.user = self.user
+            # DRF request wrapper for query_params, used by serializers and pagination.
+            self.drf_request = Request(request)
+            return await super().dispatch(request, *args, **kwargs)
+        except Http404 as exc:
+            return self.render({'detail': str(exc)}, status.HTTP_404_NOT_FOUND)
+        except exceptions.APIException as exc:
+            # Same status as the DRF views, which answer authentication errors with 403.
+            code = status.HTTP_403_FORBIDDEN if isinstance(
+                exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)) else exc.status_code
+            detail = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+            return self.render(detail, code)
+
+    def render(self, data, status_code=status.HTTP_200_OK):
+        """
+        Render data as JSON response.
+        Args:
+            data: Response data.
+            status_code: HTTP status code.
+        Returns:
+            HttpResponse: JSON response.
+        """
+        if data is None:
+            return HttpResponse(status=status_code)
+        return HttpResponse(self.renderer.render(data), status=status_code, content_type='application/json')
+
+    def make_etag(self, parts, version=None):
+        """
+        Build the ETag of a JSON representation, equal to the one the DRF views hand out.
+        Args:
+            parts: Version parts of the resource.
+            version: Task version to lead the ETag with, None for lists.
+        Returns:
+            str: Quoted ETag.
+        """
+        return make_etag(parts, self.drf_request.query_params.urlencode(), self.renderer.media_type, version=version)
+
+    async def conditional(self, request, parts, last_modified, respond, version=None):
+        """
+        Answer a GET request with 304 if the client copy is still valid.
+        Args:
+            request: Django HTTP request object.
+            parts: Version parts of the resource.
+            last_modified: Last modification datetime, or None.
+            respond: Coroutine function building the regular response.
+            version: Task version to lead the ETag with, None for lists.
+        Returns:
+            HttpResponse: 304 or the regular response, with ETag and Last-Modified headers.
+        """
+        etag = self.make_etag(parts, version)
+        response = conditional_response(request, etag, last_modified)
+        if response is None:
+            response = await respond()
+        return set_validators(response, etag, last_modified)
+
+    def parse_body(self, request):
+        """
+        Parse the JSON request body.
+        Args:
+            request: Django HTTP request object.
+        Returns:
+            dict: Parsed request data.
+        Raises:
+            ParseError: If the body is not valid JSON.
+        """
+        if not request.body:
+            return {}
+        try:
+            return json.loads(request.body)
+        except ValueError as exc:
+            raise exceptions.ParseError(f'JSON parse error - {exc}')
+
+    def serializer(self, *args, **kwargs):
+        """
+        Create a TaskSerializer bound to the current request.
+        Returns:
+            TaskSerializer: Serializer instance.
+        """
+        return TaskSerializer(*args, context={'request': self.drf_request}, **kwargs)
+
+    def get_queryset(self):
+        """
+        Get the queryset of tasks for the authenticated user.
+        Returns:
+            QuerySet: Filtered queryset of tasks.
+        """
+        return TicketeerTask.objects.filter(author=self.user)
+
+    async def get_object(self, pk):
+        """
+        Fetch one task of the authenticated user.
+        Args:
+            pk: Primary key of the task.
+        Returns:
+            TicketeerTask: The task.
+        Raises:
+            Http404: If the user has no task with this key.
+        """
+        try:
+            return await self.get_queryset().aget(pk=pk)
+        except TicketeerTask.DoesNotExist:
+            raise Http404(self.not_found)
+
+    async def create(self, request):
+        """
+        Validate the request data, create the task and announce it.
+        Args:
+            request: Django HTTP request object.
+        Returns:
+            HttpResponse: JSON representation of the new task (201).
+        """
+        serializer = self.serializer(data=self.parse_body(request))
+        serializer.is_valid(raise_exception=True)
+        instance = TicketeerTask(author=self.user, **serializer.validated_data)
+        await instance.asave()
+        data = self.serializer(instance).data
+        tasks_changed(self.user.pk, 'created', tasks=[data])
+        return self.render(data, status.HTTP_201_CREATED)
+
+    async def update_object(self, request, pk, partial):
+        """
+        Validate the request data and write it to a task with one conditional UPDATE.
+        Args:
+            request: Django HTTP request object.
+            pk: Primary key of the task.
+            partial: True for PATCH semantics.
+        Returns:
+            TicketeerTask: The updated task.
+        """
+        instance = await self.get_object(pk)
+        data = self.parse_body(request)
+        serializer = self.serializer(instance, data=data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        await asave_versioned(request, data, instance, serializer.validated_data)
+        return instance
+
+
+class AsyncTaskListCreateView(AsyncTaskView):
+    """
+    ASGI-native counterpart of TaskListCreateAPIView.
+    Supports the same keyset pagination, `?fields=` projection, `?include_archived=` and board cache.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        """
+        Handle GET requests listing the user's tasks.
+        Returns:
+            HttpResponse: 304, or JSON list of tasks or one page of them.
+        """
+        queryset, aggregates = list_aggregates(self.user.pk)
+        parts, last_modified = list_validators(self.user.pk, await queryset.aaggregate(**aggregates))
+        return await self.conditional(request, parts, last_modified, lambda: self.list(parts))
+
+    async def list(self, stamp):
+        """
+        Build the list response from the board cache.
+        Args:
+            stamp: List validators; cached data is keyed by them (see BoardCache.make_key).
+        Returns:
+            HttpResponse: JSON list of tasks or one page of them.
+        """
+        data = await board_cache.aget_or_set(
+            self.user.pk, 'list', self.drf_request.query_params.urlencode(), self.get_list_data, stamp=stamp)
+        return self.render(data)
+
+    async def get_list_data(self):
+        """
+        Build the uncached list data.
+        Returns:
+            list | dict: Serialized tasks, wrapped with a next link when paginated.
+        """
+        querysets = [self.get_queryset()]
+        if TaskSerializer.includes_archived(self.drf_request):
+            querysets.append(TicketeerTaskArchive.objects.filter(author=self.user))
+        fields = TaskSerializer.requested_fields(self.drf_request)
+        if fields:
+            querysets = [queryset.only(*fields.union(TaskCursorPagination.ordering)) for queryset in querysets]
+
+        paginator = TaskCursorPagination()
+        page = await paginator.apaginate_queryset(querysets, self.drf_request, view=self)
+        if page is not None:
+            return paginator.get_paginated_response(self.serializer(page, many=True).data).data
+        tasks = [task for queryset in querysets async for task in queryset]
+        return self.serializer(tasks, many=True).data
+
+    async def post(self, request, *args, **kwargs):
+        """
+        Handle POST requests creating a task.
+        Returns:
+            HttpResponse: JSON representation of the new task (201).
+        """
+        return await self.create(request)
+
+
+class AsyncTaskDetailView(AsyncTaskView):
+    """
+    ASGI-native counterpart of TaskRetrieveUpdateDestroyAPIView.
+    """
+
+    async def get(self, request, pk):
+        """
+        Handle GET requests for a single task.
+        Returns:
+            HttpResponse: 304 or JSON representation of the task.
+        """
+        parts, last_modified = detail_validators(pk, await detail_query(self.user.pk, pk).afirst())
+        if parts is None:
+            raise Http404(self.not_found)
+        return await self.conditional(request, parts, last_modified, lambda: self.retrieve(pk), version=parts[-1])
+
+    async def retrieve(self, pk):
+        """
+        Build the response for a single task.
+        Args:
+            pk: Primary key of the task.
+        Returns:
+            HttpResponse: JSON representation of the task.
+        """
+        return self.render(self.serializer(await self.get_object(pk)).data)
+
+    async def put(self, request, pk):
+        """
+        Handle PUT requests replacing a task.
+        Returns:
+            HttpResponse: JSON representation of the updated task.
+        """
+        return await self.update(request, pk, partial=False)
+
+    async def patch(self, request, pk):
+        """
+        Handle PATCH requests partially updating a task.
+        Returns:
+            HttpResponse: JSON representation of the updated task.
+        """
+        return await self.update(request, pk, partial=True)
+
+    async def update(self, request, pk, partial):
+        """
+        Update a task and announce the change.
+        Returns:
+            HttpResponse: JSON representation of the updated task, with the ETag of the new version.
+        """
+        instance = await self.update_object(request, pk, partial)
+        data = self.serializer(instance).data
+        tasks_changed(self.user.pk, 'updated', tasks=[data])
+        response = self.render(data)
+        response['ETag'] = self.make_etag(('detail', pk, instance.version), version=instance.version)
+        return response
+
+    async def delete(self, request, pk):
+        """
+        Handle DELETE requests removing a task.
+        Returns:
+            HttpResponse: Empty response (204).
+        """
+        instance = await self.get_object(pk)
+        version = expected_version(request, self.parse_body(request), instance.version)
+        # One transaction with the tombstone; the async ORM has none, so this takes a thread hop.
+        if not await sync_to_async(TicketeerTask.delete_tasks)(self.user.pk, [pk], version=version):
+            raise write_conflict(request)
+        tasks_changed(self.user.pk, 'deleted', ids=[pk])
+        return self.render(None, status.HTTP_204_NO_CONTENT)
+
+
+class AsyncTaskStatusView(AsyncTaskView):
+    """
+    ASGI-native counterpart of TaskStatusUpdateAPIView.
+    """
+
+    async def patch(self, request, pk):
+        """
+        Handle PATCH requests updating the status of a task.
+        Returns:
+            HttpResponse: JSON representation of the updated task.
+        """
+        instance = await self.update_object(request, pk, partial=True)
+        tasks_changed(self.user.pk, 'moved', ids=[instance.pk], status=instance.status)
+        return self.render(self.serializer(instance).data)
+
+
+class AsyncCreateTaskView(AsyncTaskView):
+    """
+    ASGI-native counterpart of the `create_task` endpoint.
+    """
+
+    async def post(self, request, *args, **kwargs):
+        """
+        Handle POST requests creating a task.
+        Returns:
+            HttpResponse: JSON representation of the new task (201).
+        """
+        return await self.create(request)
+
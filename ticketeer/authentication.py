@@ -0,0 +1,87 @@
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+from rest_framework.authtoken.models import Token
+from .cache import token_cache
+
+
+async def aget_token_user(key):
+    """
+    Resolve an authentication token to its active user without leaving the event loop.
+    Args:
+        key: Token key sent by the client.
+    Returns:
+        User | None: The token's user or None if the token is unknown or the user inactive.
+    """
+    if not key:
+        return None
+    token = token_cache.get(key)
+    if token is None:
+        try:
+            token = await Token.objects.select_related('user').aget(key=key)
+        except Token.DoesNotExist:
+            return None
+        token_cache.set(token)
+    return token.user if token.user.is_active else None
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication keeping token -> user lookups in the token cache.
+    Enable it in REST_FRAMEWORK['DEFAULT_AUTHENTICATION_CLASSES'] in place of
+    TokenAuthentication. Only valid tokens are cached.
+    """
+
+    def authenticate_credentials(self, key):
+        """
+        Resolve a token key to its user, from the cache if possible.
+        Args:
+            key: Token key sent by the client.
+        Returns:
+            tuple: (user, token)
+        Raises:
+            AuthenticationFailed: If the token is invalid or the user inactive.
+        """
+        token = token_cache.get(key)
+        if token is None:
+            user, token = super().authenticate_credentials(key)
+            token_cache.set(token)
+            return user, token
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed('User inactive or deleted.')
+        return token.user, token
+
+
+class AsyncTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication for the ASGI-native views.
+    Accepts the same `Authorization: Token <key>` header as TokenAuthentication
+    but looks the token up with the async ORM.
+    """
+
+    async def aauthenticate(self, request):
+        """
+        Authenticate a Django request.
+        Args:
+            request: Django HTTP request object.
+        Returns:
+            User | None: The authenticated user or None if no token header was sent.
+        Raises:
+            AuthenticationFailed: If the header is malformed or the token invalid.
+        """
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) == 1:
+            raise exceptions.AuthenticationFailed('Invalid token header. No credentials provided.')
+        if len(auth) > 2:
+            raise exceptions.AuthenticationFailed('Invalid token header. Token string should not contain spaces.')
+        try:
+            key = auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed(
+                'Invalid token header. Token string should not contain invalid characters.')
+
+        user = await aget_token_user(key)
+        if user is None:
+            raise exceptions.AuthenticationFailed('Invalid token.')
+        return user
@@ -0,0 +1,364 @@
+import asyncio
+import hashlib
+import pickle
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.locmem import LocMemCache
+
+
+class Flight:
+    """
+    One in-flight computation that concurrent callers wait for.
+    Attributes:
+        started: monotonic() time the computation started.
+        done: Event set when the computation finished.
+        value: Result of the computation.
+        failed: True if the computation raised; waiters then compute themselves.
+    """
+
+    __slots__ = ('started', 'done', 'value', 'failed')
+
+    def __init__(self, done):
+        self.started = time.monotonic()
+        self.done = done
+        self.value = None
+        self.failed = False
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical computations within one worker process.
+    The first caller of a key computes the value; callers arriving while
+    that computation runs wait for it and share its result instead of
+    computing it again. A flight is only joined during the first `window`
+    seconds, so a slow computation never hands out results older than that.
+    Once it finishes, the key is free again: later callers compute anew
+    (or find the result in the cache it was stored in).
+    Thread-based; `AsyncSingleFlight` is the asyncio variant.
+    Attributes:
+        window: Seconds after its start in which a flight can be joined,
+            None for the TICKETEER_COALESCE_WINDOW setting (0 disables coalescing).
+        timeout: Seconds a caller waits for a flight before computing itself.
+    """
+
+    def __init__(self, window=None, timeout=10.0):
+        """
+        Args:
+            window: Seconds after its start in which a flight can be joined.
+            timeout: Seconds a caller waits for a flight before computing itself.
+        """
+        self.window = window
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.flights = {}
+
+    def joinable(self, flight):
+        """
+        Args:
+            flight: The running Flight of a key, or None.
+        Returns:
+            bool: True if a new caller may wait for the flight.
+        """
+        window = self.window
+        if window is None:
+            window = getattr(settings, 'TICKETEER_COALESCE_WINDOW', 1.0)
+        return flight is not None and time.monotonic() - flight.started < window
+
+    def do(self, key, compute):
+        """
+        Compute a value, or wait for the identical computation already running.
+        Args:
+            key: Identity of the computation; must cover everything the result depends on.
+            compute: Callable producing the value.
+        Returns:
+            object: The computed or shared value.
+        """
+        with self.lock:
+            flight = self.flights.get(key)
+            if self.joinable(flight):
+                leader = False
+            else:
+                leader = True
+                flight = self.flights[key] = Flight(threading.Event())
+        if not leader:
+            if flight.done.wait(self.timeout) and not flight.failed:
+                return flight.value
+            return compute()
+        try:
+            flight.value = compute()
+        except BaseException:
+            flight.failed = True
+            raise
+        finally:
+            with self.lock:
+                if self.flights.get(key) is flight:
+                    del self.flights[key]
+            flight.done.set()
+        return flight.value
+
+
+class AsyncSingleFlight(SingleFlight):
+    """
+    asyncio variant of SingleFlight for coroutines on one event loop.
+    """
+
+    async def do(self, key, compute):
+        """
+        Await a coroutine function, or the identical computation already running.
+        Args:
+            key: Identity of the computation; must cover everything the result depends on.
+            compute: Coroutine function producing the value.
+        Returns:
+            object: The computed or shared value.
+        """
+        # Events belong to one event loop; tests and sync_to_async run several.
+        key = (id(asyncio.get_running_loop()), key)
+        flight = self.flights.get(key)
+        if self.joinable(flight):
+            try:
+                await asyncio.wait_for(asyncio.shield(flight.done.wait()), self.timeout)
+            except asyncio.TimeoutError:
+                return await compute()
+            return await compute() if flight.failed else flight.value
+
+        flight = self.flights[key] = Flight(asyncio.Event())
+        try:
+            flight.value = await compute()
+        except BaseException:
+            flight.failed = True
+            raise
+        finally:
+            if self.flights.get(key) is flight:
+                del self.flights[key]
+            flight.done.set()
+        return flight.value
+
+
+class BoardCache:
+    """
+    Per-author cache for serialized board data.
+    Every entry key contains the author's current board version. Task writes
+    bump that version, which makes all older entries unreachable at once;
+    they are never read again and age out of the cache on their own.
+    The cache alias is taken from the TICKETEER_BOARD_CACHE setting, so any
+    Django cache backend (locmem, Redis, ...) can hold the data.
+    On a miss, concurrent identical requests in the same worker (several
+    tabs or devices of one user) share one computation; the keys contain
+    the board version, so no request arriving after a write joins a
+    computation of the data before it.
+    Values larger than TICKETEER_BOARD_CACHE_MAX_BYTES (pickled) are not
+    stored, so the cache holds at most MAX_ENTRIES times that many bytes of
+    board data; requests differing only in the order of their query
+    parameters share an entry.
+    Attributes:
+        version_key: Key template of the per-author version counter.
+        entry_key: Key template of a cached board entry.
+    """
+
+    version_key = 'ticketeer:board:version:{author_id}'
+    entry_key = 'ticketeer:board:{author_id}:{version}:{variant}:{digest}'
+
+    def __init__(self):
+        self.flight = SingleFlight()
+        self.async_flight = AsyncSingleFlight()
+
+    @property
+    def cache(self):
+        """
+        Returns:
+            BaseCache: The configured Django cache backend.
+        """
+        return caches[getattr(settings, 'TICKETEER_BOARD_CACHE', 'default')]
+
+    def version(self, author_id):
+        """
+        Get the current board version of an author.
+        A missing counter (never written or evicted) is seeded with the
+        current time so it can never fall back to a value that was used before.
+        Args:
+            author_id: Primary key of the task author.
+        Returns:
+            int: Current board version.
+        """
+        key = self.version_key.format(author_id=author_id)
+        version = self.cache.get(key)
+        if version is None:
+            self.cache.add(key, time.time_ns(), timeout=None)
+            version = self.cache.get(key)
+        return version
+
+    def invalidate(self, author_id):
+        """
+        Bump the board version of an author after one of their tasks changed.
+        Args:
+            author_id: Primary key of the task author.
+        """
+        key = self.version_key.format(author_id=author_id)
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            self.cache.add(key, time.time_ns(), timeout=None)
+
+    def make_key(self, author_id, variant, params, stamp=None):
+        """
+        Build the cache key of a board request for the author's current version.
+        Args:
+            author_id: Primary key of the task author.
+            variant: Name of the cached view (e.g. 'list' or 'board').
+            params: Query string of the request; different parameters are cached separately.
+            stamp: Optional state of the data read from the database (e.g. the
+                list validators). Writes of other processes cannot bump this
+                process's version; with a stamp they still miss the cache.
+        Returns:
+            str: Cache key.
+        """
+        params = urlencode(sorted(parse_qsl(params, keep_blank_values=True)))
+        if stamp is not None:
+            params = f'{params}|{stamp!r}'
+        return self.entry_key.format(
+            author_id=author_id,
+            version=self.version(author_id),
+            variant=variant,
+            digest=hashlib.md5(params.encode()).hexdigest(),
+        )
+
+    def get_or_set(self, author_id, variant, params, compute, stamp=None):
+        """
+        Return the cached value for a board request or compute and store it.
+        Args:
+            author_id: Primary key of the task author.
+            variant: Name of the cached view (e.g. 'list' or 'board').
+            params: Query string of the request; different parameters are cached separately.
+            compute: Callable producing the value on a cache miss.
+            stamp: Optional database state the value belongs to (see `make_key()`).
+        Returns:
+            object: Cached or freshly computed value.
+        """
+        key = self.make_key(author_id, variant, params, stamp)
+        value = self.cache.get(key)
+        if value is None:
+            value = self.flight.do(key, lambda: self.compute_and_set(key, compute()))
+        return value
+
+    def compute_and_set(self, key, value):
+        """
+        Store a freshly computed value, unless it is too large to keep.
+        Args:
+            key: Cache key.
+            value: The value.
+        Returns:
+            object: The value.
+        """
+        size = len(value) if isinstance(value, bytes) else len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+        if size <= getattr(settings, 'TICKETEER_BOARD_CACHE_MAX_BYTES', 256 * 1024):
+            self.cache.set(key, value, timeout=getattr(settings, 'TICKETEER_BOARD_CACHE_TIMEOUT', 300))
+        return value
+
+    async def aget_or_set(self, author_id, variant, params, compute, stamp=None):
+        """
+        Async variant of `get_or_set()` taking a coroutine function.
+        The cache itself is accessed synchronously: with the default local
+        memory backend a lookup never blocks, while the async cache API would
+        add a thread hop per call.
+        Args:
+            author_id: Primary key of the task author.
+            variant: Name of the cached view.
+            params: Query string of the request.
+            compute: Coroutine function producing the value on a cache miss.
+            stamp: Optional database state the value belongs to (see `make_key()`).
+        Returns:
+            object: Cached or freshly computed value.
+        """
+        key = self.make_key(author_id, variant, params, stamp)
+        value = self.cache.get(key)
+        if value is None:
+            value = await self.async_flight.do(key, lambda: self.acompute_and_set(key, compute))
+        return value
+
+    async def acompute_and_set(self, key, compute):
+        """
+        Async variant of `compute_and_set()` taking a coroutine function.
+        """
+        return self.compute_and_set(key, await compute())
+
+
+board_cache = BoardCache()
+
+
+class TokenCache:
+    """
+    Cache of authentication tokens together with their user.
+    Saves the authtoken_token / auth_user lookup on every authenticated
+    request. Entries expire after the timeout of the TICKETEER_AUTH_CACHE
+    alias and are dropped as soon as the token or its user changes (see
+    `ticketeer.signals`). Cache keys are hashes of the token, never the token itself.
+    Those invalidations only reach the cache of the process handling the
+    change: with a process-local (local memory) cache, other workers keep
+    accepting a revoked token until its entry expires, so entries there
+    live for TICKETEER_AUTH_CACHE_LOCAL_TIMEOUT seconds only.
+    Attributes:
+        token_key: Key template of a cached token.
+    """
+
+    token_key = 'ticketeer:token:{digest}'
+
+    @property
+    def cache(self):
+        """
+        Returns:
+            BaseCache: The configured Django cache backend.
+        """
+        return caches[getattr(settings, 'TICKETEER_AUTH_CACHE', 'default')]
+
+    @property
+    def timeout(self):
+        """
+        Returns:
+            int | object: Lifetime of cached tokens; the alias' own timeout if the cache is shared.
+        """
+        if isinstance(self.cache, LocMemCache):
+            return getattr(settings, 'TICKETEER_AUTH_CACHE_LOCAL_TIMEOUT', 5)
+        return DEFAULT_TIMEOUT
+
+    def make_key(self, key):
+        """
+        Build the cache key of a token.
+        Args:
+            key: Token key.
+        Returns:
+            str: Cache key.
+        """
+        return self.token_key.format(digest=hashlib.sha256(key.encode()).hexdigest())
+
+    def get(self, key):
+        """
+        Look up a cached token.
+        Args:
+            key: Token key.
+        Returns:
+            Token | None: The token with its user loaded, or None on a cache miss.
+        """
+        return self.cache.get(self.make_key(key))
+
+    def set(self, token):
+        """
+        Cache a token; its user must already be loaded.
+        Args:
+            token: Token instance.
+        """
+        self.cache.set(self.make_key(token.key), token, self.timeout)
+
+    def invalidate(self, *keys):
+        """
+        Drop cached tokens.
+        Args:
+            *keys: Token keys.
+        """
+        self.cache.delete_many([self.make_key(key) for key in keys])
+
+
+token_cache = TokenCache()
@@ -0,0 +1,140 @@
+"""
+Optimistic concurrency control for task writes.
+
+Every task carries a `version` that each write increments. Clients name the
+version their change is based on, either with an If-Match header (the ETag
+of a task detail response, or just the version number) or with a `version`
+field in the request body. The write is a single conditional UPDATE (see
+`TicketeerTask.save_changes()`); if someone else changed the task in the
+meantime nothing is written and the client gets 412 (If-Match) or 409
+(`version` field) and has to reload the task.
+"""
+from django.conf import settings
+from django.utils.http import parse_etags
+from rest_framework import serializers, status
+from rest_framework.exceptions import APIException
+
+
+class VersionConflict(APIException):
+    """
+    The task was changed since the version named in the request body.
+    """
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'The task was changed by someone else. Reload it and try again.'
+    default_code = 'conflict'
+
+
+class PreconditionFailed(APIException):
+    """
+    The task no longer matches the If-Match header.
+    """
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'The task was changed by someone else. Reload it and try again.'
+    default_code = 'precondition_failed'
+
+
+class PreconditionRequired(APIException):
+    """
+    The write names no version while TICKETEER_REQUIRE_PRECONDITION is set.
+    """
+    status_code = status.HTTP_428_PRECONDITION_REQUIRED
+    default_detail = 'Send the version the change is based on (If-Match header or "version" field).'
+    default_code = 'precondition_required'
+
+
+def if_match_versions(header):
+    """
+    Parse the task versions named by an If-Match header.
+    Accepts detail ETags ("<version>.<digest>") and bare versions ("<version>");
+    weak tags never match, as If-Match uses the strong comparison.
+    Args:
+        header: Value of the If-Match header.
+    Returns:
+        set | None: The named versions, or None for "*" (any version).
+    """
+    versions = set()
+    for tag in parse_etags(header):
+        if tag == '*':
+            return None
+        if tag.startswith('"'):
+            version = tag.strip('"').split('.', 1)[0]
+            if version.isdigit():
+                versions.add(int(version))
+    return versions
+
+
+def expected_version(request, data, current):
+    """
+    Determine the version a write is based on.
+    Without If-Match header or `version` field, the write is based on the
+    version that was just loaded (`current`): it overwrites changes made
+    before the request (last writer wins), but not a change made between
+    that read and the write. Bulk items follow the same rule.
+    Args:
+        request: HTTP request object.
+        data: Request data, possibly holding a `version` field.
+        current: Version of the task as loaded by the view.
+    Returns:
+        int: The version to write against.
+    Raises:
+        PreconditionFailed: If-Match does not name the current version.
+        VersionConflict: The `version` field is not the current version.
+        PreconditionRequired: No version given while TICKETEER_REQUIRE_PRECONDITION is set.
+        ValidationError: The `version` field is not a positive integer.
+    """
+    header = request.META.get('HTTP_IF_MATCH')
+    version = data.get('version') if hasattr(data, 'get') else None
+    if header is not None:
+        versions = if_match_versions(header)
+        if versions is not None and current not in versions:
+            raise PreconditionFailed()
+    elif version is not None:
+        try:
+            version = serializers.IntegerField(min_value=1).run_validation(version)
+        except serializers.ValidationError as exc:
+            raise serializers.ValidationError({'version': exc.detail})
+        if version != current:
+            raise VersionConflict()
+    elif getattr(settings, 'TICKETEER_REQUIRE_PRECONDITION', False):
+        raise PreconditionRequired()
+    return current
+
+
+def write_conflict(request):
+    """
+    Build the error for a conditional write that lost the race against another write.
+    Args:
+        request: HTTP request object.
+    Returns:
+        APIException: PreconditionFailed for If-Match requests, VersionConflict otherwise.
+    """
+    return PreconditionFailed() if 'HTTP_IF_MATCH' in request.META else VersionConflict()
+
+
+def save_versioned(request, data, instance, changes):
+    """
+    Apply validated changes to a task with a conditional write.
+    Args:
+        request: HTTP request object.
+        data: Request data, possibly holding a `version` field.
+        instance: The task as loaded by the view.
+        changes: Validated field values.
+    Raises:
+        APIException: See `expected_version()` and `write_conflict()`.
+    """
+    version = expected_version(request, data, instance.version)
+    for attr, value in changes.items():
+        setattr(instance, attr, value)
+    if not instance.save_changes(changes, version):
+        raise write_conflict(request)
+
+
+async def asave_versioned(request, data, instance, changes):
+    """
+    Async variant of `save_versioned()`.
+    """
+    version = expected_version(request, data, instance.version)
+    for attr, value in changes.items():
+        setattr(instance, attr, value)
+    if not await instance.asave_changes(changes, version):
+        raise write_conflict(request)
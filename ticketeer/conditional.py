@@ -0,0 +1,123 @@
+"""
+HTTP validators (ETag / Last-Modified) of the task list and task detail.
+
+Shared by the DRF views (ConditionalGetMixin) and the ASGI-native views, so
+both answer conditional GETs the same way and hand out the same ETags. The
+validators come from queries much cheaper than building the response; a
+matching If-None-Match / If-Modified-Since is answered with 304 before any
+task is serialized.
+"""
+import hashlib
+from django.db.models import Count, Max, Subquery
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from .cache import board_cache
+from .models import TicketeerTask, TicketeerTaskTombstone
+
+
+def list_aggregates(author_id):
+    """
+    Build the aggregate query the list validators are derived from.
+    Deleting a task changes no `updated_at`, so the list was last modified
+    by the latest task change or the latest deletion (tombstone); both come
+    from one query, the tombstone through a scalar subquery.
+    Args:
+        author_id: Primary key of the task author.
+    Returns:
+        tuple: (queryset, aggregate expressions) for `aggregate()` / `aaggregate()`.
+    """
+    return TicketeerTask.objects.filter(author_id=author_id), {
+        'last_updated': Max('updated_at'),
+        'count': Count('id'),
+        'last_deleted': Max(Subquery(
+            TicketeerTaskTombstone.objects.filter(author_id=author_id)
+            .order_by('-deleted_at').values('deleted_at')[:1])),
+    }
+
+
+def list_validators(author_id, stats):
+    """
+    Derive the list validators from the aggregates and the board version.
+    Args:
+        author_id: Primary key of the task author.
+        stats: Result of the `list_aggregates()` query.
+    Returns:
+        tuple: (version parts, last modified datetime).
+    """
+    last_modified = max(filter(None, (stats['last_updated'], stats['last_deleted'])), default=None)
+    parts = ('list', author_id, stats['count'], last_modified, board_cache.version(author_id))
+    return parts, last_modified
+
+
+def detail_query(author_id, pk):
+    """
+    Build the query the detail validators are derived from.
+    Args:
+        author_id: Primary key of the task author.
+        pk: Primary key of the task.
+    Returns:
+        QuerySet: (version, updated_at) of the task, empty for unknown tasks.
+    """
+    return TicketeerTask.objects.filter(author_id=author_id, pk=pk).values_list('version', 'updated_at')
+
+
+def detail_validators(pk, row):
+    """
+    Derive the detail validators from the task's `version` and `updated_at`.
+    Args:
+        pk: Primary key of the task.
+        row: Result of the `detail_query()` query, None for unknown tasks.
+    Returns:
+        tuple: (version parts, last modified datetime) or (None, None) for unknown tasks.
+    """
+    if row is None:
+        return None, None
+    version, updated_at = row
+    return ('detail', pk, version), updated_at
+
+
+def make_etag(parts, query_string, media_type, version=None):
+    """
+    Build the strong ETag of a representation.
+    Args:
+        parts: Version parts of the resource.
+        query_string: Encoded query string; the representation depends on it.
+        media_type: Media type of the rendered response.
+        version: Task version to lead the ETag with ("<version>.<digest>"),
+            so If-Match headers on writes name the version they are based on.
+    Returns:
+        str: Quoted ETag.
+    """
+    digest = hashlib.md5(repr((*parts, query_string, media_type)).encode()).hexdigest()
+    return quote_etag(digest if version is None else f'{version}.{digest}')
+
+
+def conditional_response(request, etag, last_modified):
+    """
+    Answer a request whose client copy is still valid.
+    Args:
+        request: HTTP request object.
+        etag: ETag of the current representation.
+        last_modified: Last modification datetime, or None.
+    Returns:
+        HttpResponse | None: 304 (or 412) response, None if the regular response is needed.
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+
+def set_validators(response, etag, last_modified):
+    """
+    Add the validator headers to a successful or 304 response.
+    Args:
+        response: The response.
+        etag: ETag of the representation.
+        last_modified: Last modification datetime, or None.
+    Returns:
+        HttpResponse: The response.
+    """
+    if response.status_code in (200, 304):
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(int(last_modified.timestamp()))
+    return response
@@ -0,0 +1,36 @@
+import json
+from rest_framework.utils.encoders import JSONEncoder
+from .cache import board_cache
+from .pubsub import get_broker
+
+
+def task_channel(author_id):
+    """
+    Name of the pub/sub channel carrying the task events of one author.
+    Args:
+        author_id: Primary key of the task author.
+    Returns:
+        str: Channel name.
+    """
+    return f'ticketeer.tasks.{author_id}'
+
+
+def tasks_changed(author_id, event, **payload):
+    """
+    Announce a change of an author's tasks.
+    Invalidates the author's cached board data and pushes the diff to all
+    open real-time sessions of the author. Events and their payload:
+        created / updated: `tasks` (serialized tasks)
+        moved: `ids` and the new `status`
+        deleted: `ids`
+        imported: `count` (number of new tasks; clients reload the board)
+        cleaned: `count` (number of deleted done tasks; clients reload the board)
+        archived: `ids` (moved to the archive; only listed with ?include_archived=1)
+    Args:
+        author_id: Primary key of the task author.
+        event: Name of the event.
+        **payload: Event data.
+    """
+    board_cache.invalidate(author_id)
+    message = json.dumps({'event': event, **payload}, cls=JSONEncoder)
+    get_broker().publish(task_channel(author_id), message)
@@ -0,0 +1,213 @@
+"""
+Background jobs for heavy task operations.
+
+Exports, imports and cleanups of large boards take seconds to minutes;
+instead of blocking a web worker, the views store a TicketeerJob in the
+database queue and answer 202 with the job's URL. `python manage.py run_jobs`
+claims queued jobs and runs them in a pool of worker processes; the handler
+of the job's kind reports its progress, which clients poll at /jobs/<id>/.
+No broker is needed: the queue is the `ticketeer_ticketeerjob` table.
+"""
+import json
+import logging
+import os
+import tempfile
+import time
+from django.core.files import File
+from rest_framework import serializers
+from .events import tasks_changed
+from .models import TicketeerJob, TicketeerTask
+from .serializers import TaskImportSerializer, TaskRowEncoder
+
+logger = logging.getLogger('ticketeer.jobs')
+
+handlers = {}
+
+
+def job_handler(kind):
+    """
+    Register the function running jobs of a kind.
+    The function is called with the job and a `Progress` reporter and
+    returns the job's result report.
+    Args:
+        kind: Job kind, one of TicketeerJob.KIND_CHOICES.
+    Returns:
+        callable: Decorator registering the function.
+    """
+    def register(function):
+        handlers[kind] = function
+        return function
+    return register
+
+
+class Progress:
+    """
+    Progress reporter passed to the job handlers.
+    Writes at most one update per `interval` seconds; each write also
+    serves as the job's heartbeat.
+    Attributes:
+        interval: Minimum seconds between two writes.
+        done: Last reported progress, written when the job finishes.
+    """
+
+    interval = 0.5
+
+    def __init__(self, job):
+        """
+        Args:
+            job: The running job.
+        """
+        self.job = job
+        self.done = 0
+        self.written = 0.0
+
+    def __call__(self, progress, total=None):
+        """
+        Report the progress.
+        Args:
+            progress: Items processed so far.
+            total: Number of items to process, if known.
+        """
+        self.done = progress
+        now = time.monotonic()
+        if total is not None or now - self.written >= self.interval:
+            self.job.report_progress(progress, total)
+            self.written = now
+
+
+def enqueue(author, kind, params, input=None):
+    """
+    Add a job to the queue.
+    Args:
+        author: The user starting the job.
+        kind: Job kind.
+        params: JSON serializable job parameters.
+        input: Optional uploaded file for the job.
+    Returns:
+        TicketeerJob: The queued job.
+    """
+    job = TicketeerJob(author=author, kind=kind, params=params)
+    if input is not None:
+        job.input.save(os.path.basename(input.name), input, save=False)
+    job.save()
+    return job
+
+
+def announce(job):
+    """
+    Announce the task changes of a finished job (cache invalidation and real-time events).
+    Args:
+        job: The finished job.
+    """
+    count = (job.result or {}).get('created' if job.kind == 'import' else 'deleted')
+    if job.kind in ('import', 'cleanup') and count:
+        tasks_changed(job.author_id, 'imported' if job.kind == 'import' else 'cleaned', count=count)
+
+
+def run_job(job_id):
+    """
+    Run a claimed job and record its outcome.
+    Entry point of the worker processes; never raises for failing jobs.
+    Args:
+        job_id: Primary key of the job.
+    Returns:
+        str: Final status of the job.
+    """
+    job = TicketeerJob.objects.select_related('author').get(pk=job_id)
+    progress = Progress(job)
+    try:
+        result = handlers[job.kind](job, progress)
+    except serializers.ValidationError as exc:
+        job.fail(json.dumps(exc.detail))
+    except Exception as exc:
+        logger.exception('Job %s (%s) failed', job.pk, job.kind)
+        job.fail(f'{type(exc).__name__}: {exc}')
+    else:
+        job.finish(result, progress.done)
+        # Reaches the web processes through a shared cache and broker; with
+        # process-local ones they announce the job when it is polled.
+        announce(job)
+    return job.status
+
+
+@job_handler('export')
+def export_tasks(job, progress):
+    """
+    Write all tasks of the author to the job's output file (JSON or NDJSON).
+    Params: `output` ('json' or 'ndjson'), `fields` (task fields, default all).
+    Returns:
+        dict: Number of exported tasks and the file size in bytes.
+    """
+    output = job.params.get('output', 'json')
+    fields = job.params.get('fields')
+    encoder = TaskRowEncoder(set(fields) if fields else None)
+    tasks = TicketeerTask.objects.filter(author_id=job.author_id).order_by('id')
+    total = tasks.count()
+    progress(0, total)
+    exported = 0
+
+    def rows():
+        # Keyset batches instead of one long cursor: no read lock or
+        # transaction stays open while the job writes its progress.
+        nonlocal exported
+        last = 0
+        while batch := list(tasks.filter(id__gt=last).values_list('id', *encoder.columns)[:encoder.chunk_size]):
+            for row in batch:
+                yield row[1:]
+            last = batch[-1][0]
+            exported += len(batch)
+            progress(exported)
+
+    content = encoder.iter_ndjson(rows()) if output == 'ndjson' else encoder.iter_json(rows())
+    with tempfile.TemporaryFile() as file:
+        for chunk in content:
+            file.write(chunk)
+        job.output.save(f'tasks-{job.pk}.{output}', File(file), save=False)
+    return {'exported': exported, 'size': job.output.size}
+
+
+@job_handler('import')
+def import_tasks(job, progress):
+    """
+    Import the tasks of the job's input file, like /tasks/import/ does.
+    Every batch is committed together with the job's progress and partial
+    report (in `result`), so pollers see the import advance and the
+    heartbeat stays fresh; a retried job continues after the last committed
+    batch instead of importing its rows twice.
+    Params: `input` ('csv' or 'ndjson').
+    Returns:
+        dict: The import report (created tasks, row errors).
+    """
+    def checkpoint(report):
+        progress.done = report['rows']
+        job.report_progress(report['rows'], result=report)
+
+    with open(job.input.path, 'rb') as file:
+        serializer = TaskImportSerializer(
+            data={'file': File(file, name=os.path.basename(job.input.name)), 'input': job.params['input']},
+            context={'checkpoint': checkpoint, 'resume': job.result or {}},
+        )
+        serializer.is_valid(raise_exception=True)
+        report = serializer.save(author=job.author)
+    progress(report['created'] + report['error_count'])
+    return report
+
+
+@job_handler('cleanup')
+def cleanup_tasks(job, progress):
+    """
+    Delete the author's done tasks in batches, leaving tombstones for the delta sync.
+    Params: `before` (ISO date; only tasks dated before it, default all done tasks).
+    Returns:
+        dict: Number of deleted tasks.
+    """
+    batch_size = 1000
+    tasks = TicketeerTask.objects.filter(author_id=job.author_id, status='done')
+    if job.params.get('before'):
+        tasks = tasks.filter(date__lt=job.params['before'])
+    progress(0, tasks.count())
+    deleted = 0
+    while ids := list(tasks.order_by('id').values_list('id', flat=True)[:batch_size]):
+        deleted += TicketeerTask.delete_tasks(job.author_id, ids, status='done')
+        progress(deleted)
+    return {'deleted': deleted}
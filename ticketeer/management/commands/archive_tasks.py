@@ -0,0 +1,54 @@
+import datetime
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from ticketeer.events import tasks_changed
+from ticketeer.models import TicketeerTask, TicketeerTaskArchive
+
+
+class Command(BaseCommand):
+    """
+    Move old done tasks from the task table into the archive.
+    Walks the task table in primary key order and moves one batch per
+    transaction (see TicketeerTaskArchive.archive), so it never holds a
+    long lock, can be stopped at any time and simply continues where it
+    left off when run again.
+    """
+
+    help = 'Move done tasks not changed for --days days into the archive table, in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.TICKETEER_ARCHIVE_AFTER_DAYS,
+                            help='archive done tasks last changed more than this many days ago')
+        parser.add_argument('--batch-size', type=int, default=1000, help='tasks moved per transaction')
+        parser.add_argument('--limit', type=int, help='stop after moving this many tasks')
+        parser.add_argument('--pause', type=float, default=0.0,
+                            help='seconds to sleep between batches, leaving the database to other writers')
+
+    def handle(self, *args, days, batch_size, limit, pause, **options):
+        if days < 0 or batch_size < 1:
+            raise CommandError('--days must not be negative and --batch-size must be positive.')
+        cutoff = timezone.now() - datetime.timedelta(days=days)
+        candidates = TicketeerTask.objects.filter(status='done', updated_at__lt=cutoff).order_by('id')
+        started = time.perf_counter()
+        moved, last = 0, 0
+
+        while limit is None or moved < limit:
+            size = batch_size if limit is None else min(batch_size, limit - moved)
+            ids = list(candidates.filter(id__gt=last).values_list('id', flat=True)[:size])
+            if not ids:
+                break
+            last = ids[-1]
+            for author_id, archived in TicketeerTaskArchive.archive(ids, cutoff).items():
+                moved += len(archived)
+                tasks_changed(author_id, 'archived', ids=archived)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f'{moved} tasks moved ({moved / elapsed:.0f} rows/s)')
+            if pause:
+                time.sleep(pause)
+
+        elapsed = time.perf_counter() - started
+        rate = moved / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Archived {moved} tasks done before {cutoff:%Y-%m-%d %H:%M} in {elapsed:.1f} s ({rate:.0f} rows/s).'))
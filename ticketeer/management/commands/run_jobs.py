@@ -0,0 +1,119 @@
+import concurrent.futures
+import multiprocessing
+import os
+import socket
+import time
+from concurrent.futures.process import BrokenProcessPool
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from ticketeer.jobs import run_job
+from ticketeer.models import TicketeerJob
+from ticketeer.worker import run_in_process, setup_process
+
+
+class Command(BaseCommand):
+    """
+    Worker running the queued background jobs (see ticketeer.jobs).
+    The main process polls the queue and claims jobs while pool processes
+    are free; each job runs in one of `--processes` spawned processes, so
+    CPU-bound imports and exports neither block each other nor the web
+    server. Any number of workers may share the queue.
+    """
+
+    help = 'Run queued background jobs (exports, imports, cleanups) in a pool of worker processes.'
+    prune_interval = 3600  # seconds
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=settings.TICKETEER_JOB_PROCESSES,
+                            help='pool processes; 0 runs the jobs one by one in this process')
+        parser.add_argument('--poll', type=float, default=1.0, help='seconds between polls of an empty queue')
+        parser.add_argument('--once', action='store_true', help='exit as soon as the queue is empty')
+
+    def handle(self, *args, processes, poll, once, **options):
+        self.worker = f'{socket.gethostname()}:{os.getpid()}'
+        self.pruned = 0.0
+        try:
+            if processes:
+                self.run_pool(processes, poll, once)
+            else:
+                self.run_inline(poll, once)
+        except KeyboardInterrupt:
+            self.stdout.write('Stopped.')
+
+    def maintain(self):
+        """
+        Retry jobs of dead workers and, once in a while, drop old jobs.
+        """
+        stale = TicketeerJob.requeue_stale()
+        if stale:
+            self.stderr.write(f'Requeued {stale} stale job(s).')
+        if time.monotonic() - self.pruned > self.prune_interval:
+            TicketeerJob.prune()
+            self.pruned = time.monotonic()
+
+    def report(self, job_id, status, started):
+        self.stdout.write(f'Job {job_id} {status} in {time.monotonic() - started:.2f} s.')
+
+    def run_inline(self, poll, once):
+        """
+        Run the jobs one by one in this process.
+        """
+        while True:
+            self.maintain()
+            claimed = TicketeerJob.claim(self.worker, 1)
+            if not claimed:
+                if once:
+                    return
+                time.sleep(poll)
+                continue
+            started = time.monotonic()
+            self.report(claimed[0], run_job(claimed[0]), started)
+
+    def run_pool(self, processes, poll, once):
+        """
+        Run the jobs in a pool of spawned processes.
+        A process that dies (e.g. killed for memory) breaks the pool: its jobs
+        go back to the queue (see TicketeerJob.release) and the pool is rebuilt.
+        """
+        # Spawned processes start with fresh connections instead of forked copies.
+        connections.close_all()
+        context = multiprocessing.get_context('spawn')
+        while True:
+            running = {}
+            with concurrent.futures.ProcessPoolExecutor(
+                    processes, mp_context=context, initializer=setup_process) as pool:
+                try:
+                    while True:
+                        self.maintain()
+                        claimed = TicketeerJob.claim(self.worker, processes - len(running)) \
+                            if len(running) < processes else []
+                        for job_id in claimed:
+                            running[pool.submit(run_in_process, job_id)] = (job_id, time.monotonic())
+                        if not running:
+                            if once:
+                                return
+                            time.sleep(poll)
+                            continue
+                        done, _ = concurrent.futures.wait(
+                            running, timeout=poll, return_when=concurrent.futures.FIRST_COMPLETED)
+                        for future in done:
+                            job_id, started = running.pop(future)
+                            try:
+                                status = future.result()
+                            except BrokenProcessPool:
+                                running[future] = (job_id, started)
+                                raise
+                            except Exception as exc:
+                                # run_job() records job failures itself; this is e.g. a lost database.
+                                TicketeerJob.release([job_id], f'{type(exc).__name__}: {exc}')
+                                status = 'released'
+                            self.report(job_id, status, started)
+                except BrokenProcessPool:
+                    ids = [job_id for job_id, started in running.values()]
+                    self.stderr.write(f'A pool process died, releasing job(s) {ids}.')
+                    TicketeerJob.release(ids, 'The worker process running the job died.')
+                except KeyboardInterrupt:
+                    # Ctrl+C reaches the pool processes too; retry their jobs right away.
+                    TicketeerJob.release([job_id for job_id, started in running.values()], 'The worker was stopped.')
+                    raise
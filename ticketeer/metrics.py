@@ -0,0 +1,376 @@
+"""
+Per-endpoint request metrics in Prometheus text format.
+
+MetricsMiddleware measures every request: latency, number and duration of
+database queries (through an execute wrapper on every connection), time spent
+building serializer data and response size. The numbers are aggregated
+per URL name and method in a process-local registry and served by
+`metrics_view` (/metrics/). Requests over the query or latency budget are
+logged as warnings on the `ticketeer.metrics` logger.
+"""
+import bisect
+import contextlib
+import contextvars
+import ipaddress
+import logging
+import threading
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+logger = logging.getLogger('ticketeer.metrics')
+
+request_metrics = contextvars.ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """
+    Measurements of one request.
+    Callable as execute wrapper: each query run through it adds to
+    `queries` and `db_seconds`.
+    Attributes:
+        started: perf_counter() at the start of the request.
+        queries: Number of database queries.
+        db_seconds: Time spent executing database queries.
+        serializer_seconds: Time spent building serializer data.
+    """
+
+    __slots__ = ('started', 'queries', 'db_seconds', 'serializer_seconds')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serializer_seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        """
+        Execute a query and account for it.
+        Args:
+            execute: The next execute function.
+            sql: SQL statement.
+            params: Query parameters.
+            many: True for executemany().
+            context: Execution context.
+        Returns:
+            object: Result of the query.
+        """
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - started
+            self.queries += 1
+
+
+def count_query(execute, sql, params, many, context):
+    """
+    Execute wrapper accounting the query to the current request, if any.
+    Installed permanently on every connection rather than per request, so
+    queries are counted in whichever thread runs them: under ASGI, sync
+    views run in a worker thread with its own connections, and the request
+    metrics follow them there through the context variable.
+    Args:
+        execute: The next execute function.
+        sql: SQL statement.
+        params: Query parameters.
+        many: True for executemany().
+        context: Execution context.
+    Returns:
+        object: Result of the query.
+    """
+    metrics = request_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+def install_query_counter(connection):
+    """
+    Add `count_query()` to the execute wrappers of a connection (once).
+    It goes first, so wrappers added and removed by `execute_wrapper()`
+    blocks stay in order.
+    Args:
+        connection: Database connection wrapper.
+    """
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, count_query)
+
+
+@contextlib.contextmanager
+def serializer_timer():
+    """
+    Add the time spent in the block to the current request's serializer time.
+    Does nothing outside of measured requests.
+    """
+    metrics = request_metrics.get()
+    if metrics is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serializer_seconds += time.perf_counter() - started
+
+
+class Histogram:
+    """
+    Prometheus histogram with fixed buckets.
+    Attributes:
+        buckets: Upper bounds of the buckets (without +Inf).
+        counts: Observations per bucket (not cumulative), the last one is +Inf.
+        sum: Sum of all observations.
+    """
+
+    __slots__ = ('buckets', 'counts', 'sum')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+
+    def observe(self, value):
+        """
+        Args:
+            value: Observed value.
+        """
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def samples(self, name, labels):
+        """
+        Yield the exposition lines of the histogram.
+        Args:
+            name: Metric name.
+            labels: Rendered label pairs (without braces).
+        Yields:
+            str: Lines of the Prometheus text format.
+        """
+        cumulative = 0
+        for bound, count in zip((*self.buckets, '+Inf'), self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+        yield f'{name}_sum{{{labels}}} {self.sum}'
+        yield f'{name}_count{{{labels}}} {cumulative}'
+
+
+class MetricsRegistry:
+    """
+    Process-local store of the per-endpoint metrics.
+    Attributes:
+        histograms: Metric name -> (help text, buckets).
+        counters: Metric name -> help text.
+    """
+
+    histograms = {
+        'ticketeer_request_duration_seconds': (
+            'Request latency.', (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)),
+        'ticketeer_request_db_queries': (
+            'Database queries per request.', (0, 1, 2, 3, 5, 10, 20, 50, 100)),
+        'ticketeer_request_db_duration_seconds': (
+            'Time per request spent in database queries.', (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)),
+        'ticketeer_request_serializer_duration_seconds': (
+            'Time per request spent building serializer data.', (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)),
+        'ticketeer_response_size_bytes': (
+            'Size of non-streaming response bodies.', (100, 1000, 10_000, 100_000, 1_000_000, 10_000_000)),
+    }
+    counters = {
+        'ticketeer_requests_total': 'Finished requests.',
+        'ticketeer_budget_exceeded_total': 'Requests over their query or latency budget.',
+    }
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.series = {}
+
+    def record(self, route, method, status, metrics, duration, size, over_budget):
+        """
+        Add one finished request.
+        Args:
+            route: URL name of the view.
+            method: HTTP method.
+            status: HTTP status code.
+            metrics: RequestMetrics of the request.
+            duration: Latency in seconds.
+            size: Body size in bytes, None for streaming responses.
+            over_budget: True if the request exceeded a budget.
+        """
+        key = (route, method)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = {
+                    'histograms': {name: Histogram(buckets) for name, (text, buckets) in self.histograms.items()},
+                    'statuses': {},
+                    'over_budget': 0,
+                }
+            histograms = series['histograms']
+            histograms['ticketeer_request_duration_seconds'].observe(duration)
+            histograms['ticketeer_request_db_queries'].observe(metrics.queries)
+            histograms['ticketeer_request_db_duration_seconds'].observe(metrics.db_seconds)
+            histograms['ticketeer_request_serializer_duration_seconds'].observe(metrics.serializer_seconds)
+            if size is not None:
+                histograms['ticketeer_response_size_bytes'].observe(size)
+            series['statuses'][status] = series['statuses'].get(status, 0) + 1
+            series['over_budget'] += over_budget
+
+    def render(self):
+        """
+        Render all metrics in the Prometheus text exposition format.
+        Returns:
+            str: The exposition document.
+        """
+        with self.lock:
+            lines = []
+            for name, (text, buckets) in self.histograms.items():
+                lines += [f'# HELP {name} {text}', f'# TYPE {name} histogram']
+                for (route, method), series in sorted(self.series.items()):
+                    lines += series['histograms'][name].samples(name, f'route="{route}",method="{method}"')
+            lines += ['# HELP ticketeer_requests_total ' + self.counters['ticketeer_requests_total'],
+                      '# TYPE ticketeer_requests_total counter']
+            for (route, method), series in sorted(self.series.items()):
+                for status, count in sorted(series['statuses'].items()):
+                    lines.append(f'ticketeer_requests_total{{route="{route}",method="{method}",status="{status}"}} '
+                                 f'{count}')
+            lines += ['# HELP ticketeer_budget_exceeded_total ' + self.counters['ticketeer_budget_exceeded_total'],
+                      '# TYPE ticketeer_budget_exceeded_total counter']
+            for (route, method), series in sorted(self.series.items()):
+                lines.append(f'ticketeer_budget_exceeded_total{{route="{route}",method="{method}"}} '
+                             f'{series["over_budget"]}')
+        return '\n'.join(lines) + '\n'
+
+    def clear(self):
+        """
+        Drop all recorded series.
+        """
+        with self.lock:
+            self.series.clear()
+
+
+registry = MetricsRegistry()
+
+
+class MetricsMiddleware:
+    """
+    Measure every request and record it in the metrics registry.
+    Should be the first middleware so the latency covers the whole stack.
+    Budgets come from TICKETEER_QUERY_BUDGET (queries) and
+    TICKETEER_LATENCY_BUDGET (seconds); routes listed in
+    TICKETEER_BUDGET_EXEMPT_ROUTES (e.g. file imports) are never flagged.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        """
+        Args:
+            get_response: The next middleware or view.
+        """
+        self.get_response = get_response
+        self.query_budget = getattr(settings, 'TICKETEER_QUERY_BUDGET', None)
+        self.latency_budget = getattr(settings, 'TICKETEER_LATENCY_BUDGET', None)
+        self.exempt_routes = set(getattr(settings, 'TICKETEER_BUDGET_EXEMPT_ROUTES', ()))
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        """
+        Measure a request.
+        Args:
+            request: Django HTTP request object.
+        Returns:
+            HttpResponse: The response.
+        """
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        for alias in connections:
+            install_query_counter(connections[alias])
+        metrics = RequestMetrics()
+        token = request_metrics.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            request_metrics.reset(token)
+        self.finish(request, response, metrics)
+        return response
+
+    async def __acall__(self, request):
+        """
+        Async variant of `__call__()`.
+        """
+        metrics = RequestMetrics()
+        token = request_metrics.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            request_metrics.reset(token)
+        self.finish(request, response, metrics)
+        return response
+
+    def finish(self, request, response, metrics):
+        """
+        Record the measurements and warn about requests over budget.
+        Args:
+            request: Django HTTP request object.
+            response: The response.
+            metrics: RequestMetrics of the request.
+        """
+        duration = time.perf_counter() - metrics.started
+        match = request.resolver_match
+        route = (match.url_name or match.view_name) if match else 'unmatched'
+        size = None if response.streaming else len(response.content)
+
+        over_budget = False
+        if route not in self.exempt_routes:
+            over_queries = self.query_budget is not None and metrics.queries > self.query_budget
+            over_latency = self.latency_budget is not None and duration > self.latency_budget
+            over_budget = over_queries or over_latency
+            if over_budget:
+                logger.warning(
+                    '%s %s (%s) over budget: %.1f ms, %d queries (budgets: %s s, %s queries)',
+                    request.method, request.path, route, duration * 1000, metrics.queries,
+                    self.latency_budget, self.query_budget)
+        registry.record(route, request.method, response.status_code, metrics, duration, size, over_budget)
+
+
+def metrics_allowed(request):
+    """
+    Check whether a request may read the metrics.
+    With TICKETEER_METRICS_TOKEN set, scrapers have to send it as bearer
+    token. Without one, only direct requests from TICKETEER_METRICS_NETWORKS
+    (loopback by default) are served; requests relayed by a proxy are
+    refused, as the proxy's address says nothing about the client.
+    Args:
+        request: Django HTTP request object.
+    Returns:
+        bool: True if the metrics may be served.
+    """
+    token = getattr(settings, 'TICKETEER_METRICS_TOKEN', None)
+    if token:
+        return constant_time_compare(request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}')
+    if 'HTTP_X_FORWARDED_FOR' in request.META or 'HTTP_FORWARDED' in request.META:
+        return False
+    try:
+        address = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+    except ValueError:
+        return False
+    networks = getattr(settings, 'TICKETEER_METRICS_NETWORKS', ['127.0.0.0/8', '::1/128'])
+    return any(address in ipaddress.ip_network(network) for network in networks)
+
+
+def metrics_view(request):
+    """
+    Serve the metrics in Prometheus text format to allowed scrapers (see `metrics_allowed`).
+    Args:
+        request: Django HTTP request object.
+    Returns:
+        HttpResponse: The exposition document, or 403.
+    """
+    if not metrics_allowed(request):
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,43 @@
+# Generated by Django 5.0.6 on 2026-10-18 17:19
+
+import django.core.validators
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ticketeer', '0006_remove_ticketeertask_done'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ticketeertask',
+            name='content',
+            field=models.TextField(max_length=500, validators=[django.core.validators.MinLengthValidator(10)]),
+        ),
+        migrations.AlterField(
+            model_name='ticketeertask',
+            name='subtitle',
+            field=models.CharField(max_length=200, validators=[django.core.validators.MaxLengthValidator(10)]),
+        ),
+        migrations.AlterField(
+            model_name='ticketeertask',
+            name='title',
+            field=models.CharField(max_length=100, validators=[django.core.validators.MinLengthValidator(3)]),
+        ),
+        migrations.AddIndex(
+            model_name='ticketeertask',
+            index=models.Index(fields=['author', 'status', 'date'], name='task_author_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticketeertask',
+            index=models.Index(fields=['author', 'prio'], name='task_author_prio_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticketeertask',
+            index=models.Index(fields=['author', 'date'], name='task_author_date_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.6 on 2026-10-18 17:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ticketeer', '0007_ticketeertask_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticketeertask',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
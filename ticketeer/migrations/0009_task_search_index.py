@@ -0,0 +1,24 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    from ticketeer.search import SQLiteFTSSearchBackend
+    if schema_editor.connection.vendor == 'sqlite':
+        SQLiteFTSSearchBackend.install(schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):
+    from ticketeer.search import SQLiteFTSSearchBackend
+    if schema_editor.connection.vendor == 'sqlite':
+        SQLiteFTSSearchBackend.uninstall(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ticketeer', '0008_ticketeertask_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 18:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ticketeer', '0009_task_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticketeertask',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.0.6 on 2026-10-18 18:28
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ticketeer', '0010_ticketeertask_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketeerTaskTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='ticketeertask',
+            index=models.Index(fields=['author', 'updated_at'], name='task_author_updated_idx'),
+        ),
+        migrations.AddField(
+            model_name='ticketeertasktombstone',
+            name='author',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='ticketeertasktombstone',
+            index=models.Index(fields=['author', 'deleted_at'], name='tombstone_author_deleted_idx'),
+        ),
+    ]
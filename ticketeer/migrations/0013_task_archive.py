@@ -0,0 +1,37 @@
+# Generated by Django 5.0.6 on 2026-10-18 18:45
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ticketeer', '0012_jobs'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketeerTaskArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=100)),
+                ('subtitle', models.CharField(max_length=200)),
+                ('content', models.TextField(max_length=500)),
+                ('date', models.DateField()),
+                ('prio', models.CharField(choices=[('low', 'Low'), ('medium', 'Medium'), ('urgent', 'Urgent')], max_length=10)),
+                ('status', models.CharField(choices=[('urgent', 'Urgent'), ('todo', 'To Do'), ('inProgress', 'In Progress'), ('done', 'Done')], max_length=10)),
+                ('doTime', models.IntegerField()),
+                ('updated_at', models.DateTimeField()),
+                ('version', models.PositiveIntegerField()),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_tasks', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['author', 'date', 'id'], name='archive_author_date_idx')],
+            },
+        ),
+    ]
@@ -1,6 +1,9 @@
 import datetime
-from django.db import models
-from kanban_backend import settings
+from django.db import models, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
 from django.core.validators import MinLengthValidator, MaxLengthValidator
 
 class TicketeerTask(models.Model):
@@ -15,9 +18,13 @@ class TicketeerTask(models.Model):
         prio: Priority of the task, chosen from predefined choices ('low', 'medium', 'urgent').
         status: Current status of the task, chosen from predefined choices ('urgent', 'todo', 'inProgress', 'done').
         doTime: Estimated time required to complete the task, stored in minutes (default is 0).
+        updated_at: Timestamp of the last change, used for HTTP validators (ETag / Last-Modified).
+        version: Counter of changes, used for optimistic concurrency control (see `save_changes()`).
 
     Methods:
         __str__: String representation of the task, displaying its ID and title.
+        save_changes: Write changed fields if nobody else changed the task meanwhile.
+        delete_tasks: Delete tasks and leave tombstones for the delta sync.
     """
 
     PRIORITY_CHOICES = [
@@ -44,6 +51,19 @@ class TicketeerTask(models.Model):
     prio = models.CharField(max_length=10, choices=PRIORITY_CHOICES, default='low')
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='todo')
     doTime = models.IntegerField(default=0)  # This field stores time in minutes
+    updated_at = models.DateTimeField(auto_now=True)
+    version = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        # Every query is scoped to one author, the board groups by status and
+        # sorts by date, the cursor pagination walks (date, id).
+        indexes = [
+            models.Index(fields=['author', 'status', 'date'], name='task_author_status_date_idx'),
+            models.Index(fields=['author', 'prio'], name='task_author_prio_idx'),
+            models.Index(fields=['author', 'date'], name='task_author_date_idx'),
+            # Delta sync: tasks of an author changed since a point in time.
+            models.Index(fields=['author', 'updated_at'], name='task_author_updated_idx'),
+        ]
 
     def __str__(self):
         """
@@ -52,3 +72,412 @@ class TicketeerTask(models.Model):
             str: String containing the task ID and title.
         """
         return f'({self.id}) {self.title}'
+
+    def save(self, *args, **kwargs):
+        """
+        Save the task; saving an existing task counts as a new version.
+        Unlike `save_changes()` this overwrites concurrent changes.
+        """
+        if not self._state.adding:
+            self.version += 1
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'version'}
+        super().save(*args, **kwargs)
+
+    def conditional_update(self, fields, version):
+        """
+        Build the queryset and values of a compare-and-swap write.
+        Args:
+            fields: Names of the changed fields.
+            version: Version the change is based on.
+        Returns:
+            tuple: (queryset matching the task only at that version, UPDATE values)
+        """
+        values = {name: getattr(self, name) for name in fields}
+        values.update(updated_at=timezone.now(), version=F('version') + 1)
+        return type(self)._base_manager.filter(pk=self.pk, version=version), values
+
+    def save_changes(self, fields, version=None):
+        """
+        Write changed fields with one conditional UPDATE (optimistic locking).
+        The row is only written if it is still at `version`; no lock is held
+        between reading the task and writing it, and a concurrent change is
+        never overwritten.
+        Args:
+            fields: Names of the changed fields, their values are taken from the instance.
+            version: Version the change is based on (default: the loaded version).
+        Returns:
+            bool: False if the task was changed or deleted since that version; nothing was written then.
+        """
+        version = self.version if version is None else version
+        queryset, values = self.conditional_update(fields, version)
+        if not queryset.update(**values):
+            return False
+        self.updated_at, self.version = values['updated_at'], version + 1
+        return True
+
+    async def asave_changes(self, fields, version=None):
+        """
+        Async variant of `save_changes()`.
+        """
+        version = self.version if version is None else version
+        queryset, values = self.conditional_update(fields, version)
+        if not await queryset.aupdate(**values):
+            return False
+        self.updated_at, self.version = values['updated_at'], version + 1
+        return True
+
+    @classmethod
+    def delete_tasks(cls, author_id, ids, expected=None, **conditions):
+        """
+        Delete tasks of an author and leave tombstones for the delta sync, in one transaction.
+        Only tasks that still match are deleted and tombstoned: the matching
+        rows are locked first, so a task that was changed or deleted
+        meanwhile gets no tombstone.
+        Args:
+            author_id: Primary key of the task author.
+            ids: Primary keys of the tasks.
+            expected: Optional mapping of task IDs to the versions their deletes are based on.
+            **conditions: Additional filters, e.g. `version=3` for a conditional delete.
+        Returns:
+            int: Number of deleted tasks.
+        """
+        with transaction.atomic():
+            rows = (cls.objects.select_for_update()
+                    .filter(author_id=author_id, id__in=ids, **conditions).values_list('id', 'version'))
+            matching = [pk for pk, version in rows if expected is None or expected.get(pk) == version]
+            if matching:
+                cls.objects.filter(id__in=matching).delete()
+                TicketeerTaskTombstone.record(author_id, matching)
+        return len(matching)
+
+
+class TicketeerTaskTombstone(models.Model):
+    """
+    Marker of a deleted task, telling sync clients to drop their copy (see /tasks/sync/).
+    Tombstones are kept for TICKETEER_SYNC_TOMBSTONE_DAYS; clients whose last
+    sync is older get the whole board again.
+    Attributes:
+        author: The author of the deleted task.
+        task_id: Primary key of the deleted task.
+        deleted_at: Time of the deletion.
+    """
+
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    task_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['author', 'deleted_at'], name='tombstone_author_deleted_idx'),
+        ]
+
+    def __str__(self):
+        """
+        String representation of the tombstone.
+        Returns:
+            str: String containing the ID of the deleted task.
+        """
+        return f'(deleted {self.task_id})'
+
+    @classmethod
+    def record(cls, author_id, task_ids):
+        """
+        Add tombstones for deleted tasks and drop the author's expired ones.
+        Args:
+            author_id: Primary key of the task author.
+            task_ids: Primary keys of the deleted tasks.
+        """
+        now = timezone.now()
+        cls.objects.bulk_create(cls(author_id=author_id, task_id=pk, deleted_at=now) for pk in task_ids)
+        retention = datetime.timedelta(days=getattr(settings, 'TICKETEER_SYNC_TOMBSTONE_DAYS', 30))
+        cls.objects.filter(author_id=author_id, deleted_at__lt=now - retention).delete()
+
+
+class TicketeerTaskArchive(models.Model):
+    """
+    Done task moved out of TicketeerTask by `manage.py archive_tasks`.
+    Keeps the hot task table, and with it every board query, small: old
+    done tasks are only read with `?include_archived=1`. Rows mirror the
+    TicketeerTask columns under the task's original ID, so archived tasks
+    keep their identity (and position in the (date, id) cursor order).
+    Archived tasks are read-only and not part of the search index.
+    Attributes:
+        author: ForeignKey to the user who created the task.
+        title, subtitle, content, date, prio, status, doTime, updated_at, version:
+            The task's values at the time it was archived.
+        archived_at: Time the task was moved to the archive.
+
+    Methods:
+        archive: Move done tasks into the archive.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='archived_tasks'
+    )
+    title = models.CharField(max_length=100)
+    subtitle = models.CharField(max_length=200)
+    content = models.TextField(max_length=500)
+    date = models.DateField()
+    prio = models.CharField(max_length=10, choices=TicketeerTask.PRIORITY_CHOICES)
+    status = models.CharField(max_length=10, choices=TicketeerTask.STATUS_CHOICES)
+    doTime = models.IntegerField()
+    updated_at = models.DateTimeField()
+    version = models.PositiveIntegerField()
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # Archived tasks are only read per author, in cursor order.
+            models.Index(fields=['author', 'date', 'id'], name='archive_author_date_idx'),
+        ]
+
+    def __str__(self):
+        """
+        String representation of the archived task.
+        Returns:
+            str: String containing the task ID and title.
+        """
+        return f'({self.id}) {self.title} [archived]'
+
+    @classmethod
+    def archive(cls, ids, cutoff):
+        """
+        Move done tasks last changed before `cutoff` into the archive, in one transaction.
+        Tasks that are no longer done or were changed since are left alone,
+        so a concurrent edit is never lost; running it again for the same
+        IDs moves nothing. Moved tasks leave the board, so they get
+        tombstones for the delta sync in the same transaction.
+        Args:
+            ids: Primary keys of candidate tasks.
+            cutoff: Only tasks with `updated_at` before this time are moved.
+        Returns:
+            dict: Author ID -> IDs of the moved tasks.
+        """
+        names = [field.attname for field in TicketeerTask._meta.concrete_fields]
+        with transaction.atomic():
+            tasks = TicketeerTask.objects.filter(pk__in=ids, status='done', updated_at__lt=cutoff)
+            rows = list(tasks.values_list(*names))
+            if not rows:
+                return {}
+            now = timezone.now()
+            cls.objects.bulk_create(
+                [cls(**dict(zip(names, row)), archived_at=now) for row in rows], ignore_conflicts=True)
+            moved = [row[0] for row in rows]
+            if tasks.filter(pk__in=moved).delete()[0] < len(moved):
+                # Changed between the read and the delete: keep the live version only.
+                kept = set(TicketeerTask.objects.filter(pk__in=moved).values_list('id', flat=True))
+                cls.objects.filter(pk__in=kept).delete()
+                rows = [row for row in rows if row[0] not in kept]
+            author_index = names.index('author_id')
+            moved_by_author = {}
+            for row in rows:
+                moved_by_author.setdefault(row[author_index], []).append(row[0])
+            for author_id, moved in moved_by_author.items():
+                TicketeerTaskTombstone.record(author_id, moved)
+        return moved_by_author
+
+
+def job_storage():
+    """
+    Storage of the job input and output files.
+    Returns:
+        FileSystemStorage: Storage in TICKETEER_JOB_FILES_DIR.
+    """
+    return FileSystemStorage(location=settings.TICKETEER_JOB_FILES_DIR)
+
+
+class TicketeerJob(models.Model):
+    """
+    Background job in the database-backed queue (see `ticketeer.jobs`).
+    Views enqueue jobs, `manage.py run_jobs` claims and runs them; clients
+    poll /jobs/<id>/ for the progress.
+    Attributes:
+        author: The user who started the job; it only touches their tasks.
+        kind: What the job does ('export', 'import' or 'cleanup').
+        status: 'queued', 'running', 'done' or 'failed'.
+        params: Validated job parameters.
+        input: Uploaded file of an import.
+        output: Result file of an export.
+        progress: Items processed so far.
+        total: Number of items to process, None if unknown.
+        result: Report of a finished job.
+        error: Error message of a failed job.
+        attempts: Number of times a worker claimed the job.
+        worker: Worker ("host:pid") that claimed the job last.
+        announced: True once the web process announced the job's changes.
+        created_at: Time the job was enqueued.
+        started_at: Time a worker claimed the job last.
+        finished_at: Time the job finished or failed.
+        heartbeat_at: Last sign of life of the running job; stale jobs are retried.
+
+    Methods:
+        claim: Atomically take queued jobs for a worker.
+        release: Put running jobs back into the queue.
+        requeue_stale: Retry or fail running jobs whose worker is gone.
+        prune: Delete old finished jobs and their files.
+        report_progress: Store the progress and refresh the heartbeat.
+        finish: Mark the job as done.
+        fail: Mark the job as failed.
+    """
+
+    KIND_CHOICES = [
+        ('export', 'Export'),
+        ('import', 'Import'),
+        ('cleanup', 'Cleanup'),
+    ]
+
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='jobs'
+    )
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    params = models.JSONField(default=dict, blank=True)
+    input = models.FileField(upload_to='input/', storage=job_storage, blank=True)
+    output = models.FileField(upload_to='output/', storage=job_storage, blank=True)
+    progress = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    worker = models.CharField(max_length=100, blank=True)
+    announced = models.BooleanField(default=False)
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Workers take the oldest queued job and look for stale running ones.
+            models.Index(fields=['status', 'created_at'], name='job_status_created_idx'),
+            models.Index(fields=['author', 'created_at'], name='job_author_created_idx'),
+        ]
+
+    def __str__(self):
+        """
+        String representation of the job.
+        Returns:
+            str: String containing the job ID, kind and status.
+        """
+        return f'({self.id}) {self.kind} {self.status}'
+
+    @classmethod
+    def claim(cls, worker, limit):
+        """
+        Take up to `limit` of the oldest queued jobs for a worker.
+        Every job is taken with a conditional UPDATE, so concurrent workers
+        never claim the same job.
+        Args:
+            worker: Name of the claiming worker.
+            limit: Maximum number of jobs to take.
+        Returns:
+            list: Primary keys of the claimed jobs.
+        """
+        claimed = []
+        candidates = cls.objects.filter(status='queued').order_by('created_at', 'id').values_list('id', flat=True)
+        for pk in candidates[:limit * 2]:
+            now = timezone.now()
+            if cls.objects.filter(pk=pk, status='queued').update(
+                    status='running', worker=worker, attempts=F('attempts') + 1,
+                    started_at=now, heartbeat_at=now):
+                claimed.append(pk)
+                if len(claimed) == limit:
+                    break
+        return claimed
+
+    @classmethod
+    def release(cls, ids, error):
+        """
+        Put running jobs back into the queue, or fail those out of attempts.
+        Args:
+            ids: Primary keys of the jobs.
+            error: Error message for the failed jobs.
+        """
+        max_attempts = getattr(settings, 'TICKETEER_JOB_MAX_ATTEMPTS', 3)
+        running = cls.objects.filter(pk__in=ids, status='running')
+        running.filter(attempts__lt=max_attempts).update(status='queued', worker='', heartbeat_at=None)
+        running.filter(attempts__gte=max_attempts).update(status='failed', error=error, finished_at=timezone.now())
+
+    @classmethod
+    def requeue_stale(cls):
+        """
+        Retry running jobs without a heartbeat for TICKETEER_JOB_TIMEOUT seconds (their worker died).
+        Returns:
+            int: Number of stale jobs.
+        """
+        timeout = datetime.timedelta(seconds=getattr(settings, 'TICKETEER_JOB_TIMEOUT', 300))
+        stale = list(cls.objects.filter(status='running', heartbeat_at__lt=timezone.now() - timeout)
+                     .values_list('id', flat=True))
+        if stale:
+            cls.release(stale, 'The worker running the job was lost.')
+        return len(stale)
+
+    @classmethod
+    def prune(cls):
+        """
+        Delete jobs finished more than TICKETEER_JOB_RETENTION_DAYS ago, with their files.
+        Returns:
+            int: Number of deleted jobs.
+        """
+        retention = datetime.timedelta(days=getattr(settings, 'TICKETEER_JOB_RETENTION_DAYS', 7))
+        expired = cls.objects.filter(status__in=['done', 'failed'], finished_at__lt=timezone.now() - retention)
+        for job in expired.exclude(input='', output=''):
+            for file in (job.input, job.output):
+                if file:
+                    file.delete(save=False)
+        return expired.delete()[0]
+
+    def report_progress(self, progress, total=None, result=None):
+        """
+        Store the progress of the running job and refresh its heartbeat.
+        Args:
+            progress: Items processed so far.
+            total: Number of items to process, if known.
+            result: Partial report, if the job keeps one while running.
+        """
+        self.progress, self.heartbeat_at = progress, timezone.now()
+        if total is not None:
+            self.total = total
+        if result is not None:
+            self.result = result
+        type(self).objects.filter(pk=self.pk).update(
+            progress=self.progress, total=self.total, result=self.result, heartbeat_at=self.heartbeat_at)
+
+    def finish(self, result, progress):
+        """
+        Mark the job as done.
+        Args:
+            result: Report of the job.
+            progress: Final number of processed items.
+        """
+        self.status, self.result, self.progress, self.finished_at = 'done', result, progress, timezone.now()
+        type(self).objects.filter(pk=self.pk).update(
+            status=self.status, result=self.result, output=self.output.name or '',
+            progress=self.progress, finished_at=self.finished_at)
+
+    def fail(self, error):
+        """
+        Mark the job as failed.
+        Args:
+            error: Error message for the client.
+        """
+        self.status, self.error, self.finished_at = 'failed', error, timezone.now()
+        type(self).objects.filter(pk=self.pk).update(
+            status=self.status, error=self.error, finished_at=self.finished_at)
@@ -0,0 +1,183 @@
+import base64
+import datetime
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class TaskCursorPagination(BasePagination):
+    """
+    Keyset (cursor) pagination for task lists.
+    Pages are ordered by (date, id) and each page starts right after the last
+    row of the previous one, so deep pages cost the same as the first one.
+    Pagination is opt-in: it only kicks in when the client sends a `cursor`
+    or `page_size` query parameter, plain requests still get the full list.
+    Several querysets (tasks and archived tasks) can be paginated together:
+    each one is read from the cursor on and the pages are merged.
+    Attributes:
+        page_size: Default number of tasks per page.
+        max_page_size: Upper bound for the `page_size` query parameter.
+        ordering: Fields the keyset is built from (must end with a unique field).
+    """
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = 100
+    max_page_size = 1000
+    ordering = ('date', 'id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def is_requested(self, request):
+        """
+        Check whether the client asked for a paginated response.
+        Args:
+            request: DRF request object.
+        Returns:
+            bool: True if a cursor or page size was given.
+        """
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        Return one page of tasks or None if pagination was not requested.
+        Args:
+            queryset: Queryset of tasks to paginate, or a list of querysets to merge.
+            request: DRF request object.
+            view: The calling view.
+        Returns:
+            list | None: Tasks of the requested page.
+        """
+        if not self.is_requested(request):
+            return None
+        querysets = queryset if isinstance(queryset, list) else [queryset]
+        return self.set_page([task for queryset in querysets for task in self.get_page_queryset(queryset, request)])
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Async variant of `paginate_queryset()` for ASGI-native views.
+        Args:
+            queryset: Queryset of tasks to paginate, or a list of querysets to merge.
+            request: DRF request object.
+            view: The calling view.
+        Returns:
+            list | None: Tasks of the requested page.
+        """
+        if not self.is_requested(request):
+            return None
+        querysets = queryset if isinstance(queryset, list) else [queryset]
+        tasks = []
+        for queryset in querysets:
+            tasks += [task async for task in self.get_page_queryset(queryset, request)]
+        return self.set_page(tasks)
+
+    def get_page_queryset(self, queryset, request):
+        """
+        Build the query for the requested page (one row more than the page size).
+        Args:
+            queryset: Queryset of tasks to paginate.
+            request: DRF request object.
+        Returns:
+            QuerySet: Sliced queryset starting after the cursor position.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            date, pk = position
+            queryset = queryset.filter(Q(date__gt=date) | Q(date=date, id__gt=pk))
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, results):
+        """
+        Store the fetched rows as the current page.
+        Args:
+            results: Rows fetched by the page querysets.
+        Returns:
+            list: Tasks of the page.
+        """
+        # Rows of several querysets are merged into the keyset order.
+        results.sort(key=lambda task: (task.date, task.id))
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def get_page_size(self, request):
+        """
+        Read the page size from the query string, falling back to the default.
+        Args:
+            request: DRF request object.
+        Returns:
+            int: Page size to use.
+        """
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_next_link(self):
+        """
+        Build the URL of the next page.
+        Returns:
+            str | None: Absolute URL of the next page or None on the last page.
+        """
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.page_size_query_param, self.page_size)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(last.date, last.id))
+
+    def get_paginated_response(self, data):
+        """
+        Wrap a page of serialized tasks.
+        Args:
+            data: Serialized tasks of the current page.
+        Returns:
+            Response: JSON response with the next link and the results.
+        """
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    @staticmethod
+    def encode_cursor(date, pk):
+        """
+        Encode a (date, id) position into an opaque cursor string.
+        Args:
+            date: Date of the last task on the page.
+            pk: ID of the last task on the page.
+        Returns:
+            str: URL safe cursor.
+        """
+        raw = f'{date.isoformat()}|{pk}'.encode('ascii')
+        return base64.urlsafe_b64encode(raw).decode('ascii')
+
+    def decode_cursor(self, request):
+        """
+        Decode the cursor from the query string.
+        Args:
+            request: DRF request object.
+        Returns:
+            tuple | None: (date, id) position or None for the first page.
+        Raises:
+            NotFound: If the cursor cannot be decoded.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(encoded.encode('ascii')).decode('ascii')
+            date, pk = raw.split('|')
+            return datetime.date.fromisoformat(date), int(pk)
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
@@ -0,0 +1,155 @@
+import asyncio
+import threading
+from collections import defaultdict
+from functools import lru_cache
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class Subscription:
+    """
+    A single subscriber of a pub/sub channel.
+    Messages are queued on the event loop the subscription was created on;
+    `get()` returns None once the subscription was closed, either by the
+    consumer or because it fell too far behind.
+    Attributes:
+        channel: Name of the subscribed channel.
+        closed: True once no more messages will be delivered.
+    """
+
+    def __init__(self, channel, maxsize):
+        self.channel = channel
+        self.closed = False
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize)
+
+    def deliver(self, message):
+        """
+        Queue a message for the subscriber; must run on the subscriber's loop.
+        A subscriber whose queue is full is closed instead of blocking the publisher.
+        Args:
+            message: Encoded message text.
+        """
+        if self.closed:
+            return
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.close()
+
+    def deliver_threadsafe(self, message):
+        """
+        Queue a message from any thread.
+        Args:
+            message: Encoded message text.
+        """
+        self._loop.call_soon_threadsafe(self.deliver, message)
+
+    def close(self):
+        """
+        Stop the subscription and wake up a waiting `get()`.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait(None)
+
+    def close_threadsafe(self):
+        """
+        Close the subscription from any thread.
+        """
+        self._loop.call_soon_threadsafe(self.close)
+
+    async def get(self):
+        """
+        Wait for the next message.
+        Returns:
+            str | None: The next message or None once the subscription is closed.
+        """
+        return await self._queue.get()
+
+
+class InProcessBroker:
+    """
+    Pub/sub broker fanning messages out to subscribers of the current process.
+    Publishing is thread-safe and never blocks: it only schedules delivery on
+    each subscriber's event loop. With several worker processes every process
+    only reaches its own subscribers; a broker backed by Redis (or any other
+    shared pub/sub) can be plugged in through TICKETEER_PUBSUB_BACKEND as long
+    as it offers the same `subscribe`, `unsubscribe` and `publish` methods.
+    Attributes:
+        queue_size: Maximum number of undelivered messages per subscriber.
+    """
+
+    def __init__(self, queue_size=None):
+        self.queue_size = queue_size or getattr(settings, 'TICKETEER_PUBSUB_QUEUE_SIZE', 100)
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel):
+        """
+        Subscribe to a channel; must be called from a running event loop.
+        Args:
+            channel: Name of the channel.
+        Returns:
+            Subscription: The new subscription.
+        """
+        subscription = Subscription(channel, self.queue_size)
+        with self._lock:
+            self._subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """
+        Remove a subscription and close it.
+        Args:
+            subscription: Subscription returned by `subscribe()`.
+        """
+        with self._lock:
+            subscribers = self._subscriptions.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscriptions[subscription.channel]
+        subscription.close_threadsafe()
+
+    def publish(self, channel, message):
+        """
+        Send a message to every subscriber of a channel.
+        Args:
+            channel: Name of the channel.
+            message: Encoded message text.
+        Returns:
+            int: Number of subscribers the message was scheduled for.
+        """
+        with self._lock:
+            subscribers = tuple(self._subscriptions.get(channel, ()))
+        for subscription in subscribers:
+            subscription.deliver_threadsafe(message)
+        return len(subscribers)
+
+    def subscriber_count(self, channel=None):
+        """
+        Count the active subscriptions.
+        Args:
+            channel: Only count subscribers of this channel.
+        Returns:
+            int: Number of subscriptions.
+        """
+        with self._lock:
+            if channel is not None:
+                return len(self._subscriptions.get(channel, ()))
+            return sum(len(subscribers) for subscribers in self._subscriptions.values())
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    """
+    Get the process-wide broker configured by TICKETEER_PUBSUB_BACKEND.
+    Returns:
+        InProcessBroker: The broker instance.
+    """
+    backend = getattr(settings, 'TICKETEER_PUBSUB_BACKEND', 'ticketeer.pubsub.InProcessBroker')
+    return import_string(backend)()
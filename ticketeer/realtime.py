@@ -0,0 +1,99 @@
+import asyncio
+from urllib.parse import parse_qs
+from .authentication import aget_token_user
+from .events import task_channel
+from .pubsub import get_broker
+
+
+class TaskEventsConsumer:
+    """
+    ASGI WebSocket application pushing task events to the connected user.
+    Clients connect to `/ws/tasks/?token=<auth token>` and receive one JSON
+    text frame per event (see `ticketeer.events.tasks_changed`). Messages
+    sent by the client are ignored. A client that cannot keep up is
+    disconnected with close code 4008 and should reload its board.
+    """
+
+    unauthorized_code = 4401
+    overflow_code = 4008
+
+    async def __call__(self, scope, receive, send):
+        """
+        Handle one WebSocket connection.
+        Args:
+            scope: ASGI connection scope.
+            receive: ASGI receive callable.
+            send: ASGI send callable.
+        """
+        message = await receive()
+        if message['type'] != 'websocket.connect':
+            return
+
+        query = parse_qs(scope.get('query_string', b'').decode())
+        user = await aget_token_user(query.get('token', [None])[0])
+        if user is None:
+            await send({'type': 'websocket.close', 'code': self.unauthorized_code})
+            return
+
+        await send({'type': 'websocket.accept'})
+        broker = get_broker()
+        subscription = broker.subscribe(task_channel(user.pk))
+        watcher = asyncio.create_task(self.wait_for_disconnect(receive, subscription))
+        try:
+            while True:
+                text = await subscription.get()
+                if text is None:
+                    break
+                await send({'type': 'websocket.send', 'text': text})
+        finally:
+            disconnected = watcher.done()
+            watcher.cancel()
+            broker.unsubscribe(subscription)
+
+        if not disconnected:
+            await send({'type': 'websocket.close', 'code': self.overflow_code})
+
+    @staticmethod
+    async def wait_for_disconnect(receive, subscription):
+        """
+        Consume client messages until the client disconnects, then end the subscription.
+        Args:
+            receive: ASGI receive callable.
+            subscription: The connection's subscription.
+        """
+        while True:
+            message = await receive()
+            if message['type'] == 'websocket.disconnect':
+                subscription.close()
+                return
+
+
+class WebSocketRouter:
+    """
+    ASGI application dispatching WebSocket connections by path.
+    Everything that is not a WebSocket connection goes to the Django application.
+    Attributes:
+        application: ASGI application for HTTP and lifespan scopes.
+        routes: Mapping of path to WebSocket ASGI application.
+    """
+
+    def __init__(self, application, routes):
+        self.application = application
+        self.routes = routes
+
+    async def __call__(self, scope, receive, send):
+        """
+        Dispatch one ASGI connection.
+        Args:
+            scope: ASGI connection scope.
+            receive: ASGI receive callable.
+            send: ASGI send callable.
+        """
+        if scope['type'] != 'websocket':
+            return await self.application(scope, receive, send)
+        consumer = self.routes.get(scope['path'])
+        if consumer is None:
+            await receive()
+            await send({'type': 'websocket.close'})
+            return
+        return await consumer(scope, receive, send)
@@ -0,0 +1,185 @@
+import functools
+from django.conf import settings
+from django.db import connections
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.utils.module_loading import import_string
+from ticketeer.models import TicketeerTask
+
+
+class IContainsSearchBackend:
+    """
+    Portable task search with `icontains` filters.
+    Works on every database but scans all tasks of the author. Matches in
+    the title rank before matches in the subtitle or content only.
+    """
+
+    def search(self, author_id, query, offset, limit):
+        """
+        Find the tasks of an author matching every word of the query.
+        Args:
+            author_id: Primary key of the task author.
+            query: Search text.
+            offset: Number of ranked results to skip.
+            limit: Maximum number of results.
+        Returns:
+            list: IDs of the matching tasks, best match first.
+        """
+        terms = query.split()
+        if not terms:
+            return []
+        queryset = TicketeerTask.objects.filter(author_id=author_id)
+        for term in terms:
+            queryset = queryset.filter(
+                Q(title__icontains=term) | Q(subtitle__icontains=term) | Q(content__icontains=term))
+        title_match = Q()
+        for term in terms:
+            title_match &= Q(title__icontains=term)
+        queryset = queryset.annotate(
+            rank=Case(When(title_match, then=Value(0)), default=Value(1), output_field=IntegerField()))
+        return list(queryset.order_by('rank', 'id').values_list('id', flat=True)[offset:offset + limit])
+
+
+class SQLiteFTSSearchBackend:
+    """
+    Task search backed by an SQLite FTS5 index, ranked by bm25.
+    The index is an external content FTS5 table over title, subtitle and
+    content of ticketeer_ticketeertask, kept in sync by triggers, so every
+    write path (save(), bulk_create(), queryset updates, raw SQL) updates it.
+    The author id is indexed as a token as well: matching it inside the FTS
+    query keeps other authors' tasks out before anything is ranked.
+    Every word of the query has to match; words are stemmed (porter), so
+    "deploy" also finds "deployed" and "deployment". Title matches weigh most.
+    Attributes:
+        table: Name of the FTS5 table.
+        source: Name of the indexed task table.
+        triggers: Trigger names and bodies keeping the index in sync.
+        rank: bm25 ranking with the weights of title, subtitle, content and author id.
+    """
+
+    table = 'ticketeer_task_fts'
+    source = 'ticketeer_ticketeertask'
+    triggers = {
+        'ticketeer_task_fts_insert': (
+            'AFTER INSERT ON {source} BEGIN '
+            'INSERT INTO {table}(rowid, title, subtitle, content, author_id) '
+            'VALUES (new.id, new.title, new.subtitle, new.content, new.author_id); END'
+        ),
+        'ticketeer_task_fts_delete': (
+            'AFTER DELETE ON {source} BEGIN '
+            "INSERT INTO {table}({table}, rowid, title, subtitle, content, author_id) "
+            "VALUES ('delete', old.id, old.title, old.subtitle, old.content, old.author_id); END"
+        ),
+        # Status moves and other updates leaving the text alone skip the index.
+        'ticketeer_task_fts_update': (
+            'AFTER UPDATE ON {source} WHEN old.title IS NOT new.title OR old.subtitle IS NOT new.subtitle '
+            'OR old.content IS NOT new.content OR old.author_id IS NOT new.author_id BEGIN '
+            "INSERT INTO {table}({table}, rowid, title, subtitle, content, author_id) "
+            "VALUES ('delete', old.id, old.title, old.subtitle, old.content, old.author_id); "
+            'INSERT INTO {table}(rowid, title, subtitle, content, author_id) '
+            'VALUES (new.id, new.title, new.subtitle, new.content, new.author_id); END'
+        ),
+    }
+    rank = f'bm25({table}, 10.0, 5.0, 1.0, 0.0)'
+
+    def __init__(self, using='default'):
+        """
+        Args:
+            using: Alias of the database holding the tasks.
+        """
+        self.using = using
+
+    @classmethod
+    def install(cls, connection, create_table=True):
+        """
+        Create the FTS5 table and its triggers where they are missing.
+        Django rebuilds SQLite tables for many schema changes, which drops
+        their triggers; the index is rebuilt from the tasks whenever
+        anything had to be (re)created.
+        Args:
+            connection: SQLite database connection.
+            create_table: False to only repair an existing index (do nothing if there is none).
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE name = %s OR (type = 'trigger' AND tbl_name = %s)",
+                [cls.table, cls.source])
+            existing = {name for name, in cursor.fetchall()}
+            missing = [name for name in (cls.table, *cls.triggers) if name not in existing]
+            if not missing or (cls.table in missing and not create_table):
+                return
+            if cls.table in missing:
+                cursor.execute(
+                    f'CREATE VIRTUAL TABLE {cls.table} USING fts5(title, subtitle, content, '
+                    f"author_id, content='{cls.source}', content_rowid='id', "
+                    f"tokenize='porter unicode61 remove_diacritics 2')")
+            for name, body in cls.triggers.items():
+                if name in missing:
+                    cursor.execute(f'CREATE TRIGGER {name} ' + body.format(table=cls.table, source=cls.source))
+            cursor.execute(f"INSERT INTO {cls.table}({cls.table}) VALUES ('rebuild')")
+
+    @classmethod
+    def uninstall(cls, connection):
+        """
+        Drop the FTS5 table and its triggers.
+        Args:
+            connection: SQLite database connection.
+        """
+        with connection.cursor() as cursor:
+            for name in cls.triggers:
+                cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+            cursor.execute(f'DROP TABLE IF EXISTS {cls.table}')
+
+    @staticmethod
+    def match_expression(author_id, query):
+        """
+        Turn free text into an FTS5 query over the tasks of one author.
+        Every word is quoted, which keeps FTS5 operators and punctuation in
+        user input from causing syntax errors.
+        Args:
+            author_id: Primary key of the task author.
+            query: Search text.
+        Returns:
+            str: FTS5 MATCH expression ('' if the text has no words).
+        """
+        terms = ['"{}"'.format(term.replace('"', '""')) for term in query.split()]
+        if not terms:
+            return ''
+        return f'author_id : "{int(author_id)}" AND {{title subtitle content}} : ({" ".join(terms)})'
+
+    def search(self, author_id, query, offset, limit):
+        """
+        Find the tasks of an author matching every word of the query.
+        Args:
+            author_id: Primary key of the task author.
+            query: Search text.
+            offset: Number of ranked results to skip.
+            limit: Maximum number of results.
+        Returns:
+            list: IDs of the matching tasks, best match first.
+        """
+        expression = self.match_expression(author_id, query)
+        if not expression:
+            return []
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s '
+                f'ORDER BY {self.rank}, rowid LIMIT %s OFFSET %s',
+                [expression, limit, offset])
+            return [pk for pk, in cursor.fetchall()]
+
+
+@functools.lru_cache(maxsize=None)
+def get_search_backend():
+    """
+    Get the search backend configured by TICKETEER_SEARCH_BACKEND.
+    Without that setting, SQLite databases use the FTS5 index and all
+    other databases the portable `icontains` search.
+    Returns:
+        SQLiteFTSSearchBackend | IContainsSearchBackend: The backend instance.
+    """
+    backend = getattr(settings, 'TICKETEER_SEARCH_BACKEND', None)
+    if backend:
+        return import_string(backend)()
+    if connections['default'].vendor == 'sqlite':
+        return SQLiteFTSSearchBackend()
+    return IContainsSearchBackend()
@@ -1,7 +1,22 @@
 # serializers.py
-from ticketeer.models import TicketeerTask
+import csv
+import datetime
+import io
+import itertools
+import json
+import os
+from ticketeer.models import TicketeerJob, TicketeerTask
 from rest_framework import serializers
+from rest_framework import ISO_8601
+from rest_framework.settings import api_settings
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.core import signing
+from django.db import connections, router, transaction
+from django.urls import reverse
+from django.utils import timezone
+from .concurrency import PreconditionRequired, VersionConflict
+from .metrics import serializer_timer
 
 class RegisterSerializer(serializers.ModelSerializer):
 
@@ -35,18 +50,522 @@ class RegisterSerializer(serializers.ModelSerializer):
         return user
     
     
+class TaskListSerializer(serializers.ListSerializer):
+    """
+    List serializer used for `TaskSerializer(many=True)`.
+    Adds the time spent building `.data` to the request metrics.
+    """
+
+    @property
+    def data(self):
+        with serializer_timer():
+            return super().data
+
+
 class TaskSerializer(serializers.ModelSerializer):
     """
     Serializer for Task objects.
     Serializes Task model instances to JSON representation.
+    On GET requests the output can be narrowed with a `?fields=` query
+    parameter (comma separated field names), e.g. `?fields=id,title,status`.
+    Also serializes TicketeerTaskArchive rows, which have the same fields.
     Attributes:
         author: The author of the task. Automatically populated and read-only.
     """
 
+    fields_query_param = 'fields'
+    archived_query_param = 'include_archived'
+
     class Meta:
         model = TicketeerTask
         fields = '__all__'
-        read_only_fields = ('author',)
+        read_only_fields = ('author', 'version')
+        list_serializer_class = TaskListSerializer
+
+    def __init__(self, *args, **kwargs):
+        """
+        Drop all fields that were not requested via `?fields=`.
+        Args:
+            *args: Positional arguments for the ModelSerializer.
+            **kwargs: Keyword arguments for the ModelSerializer.
+        """
+        super().__init__(*args, **kwargs)
+        requested = self.requested_fields(self.context.get('request'))
+        if requested:
+            for name in set(self.fields) - requested:
+                self.fields.pop(name)
+
+    @classmethod
+    def requested_fields(cls, request):
+        """
+        Parse the `?fields=` projection of a read request.
+        Unknown field names are ignored.
+        Args:
+            request: DRF request object (may be None).
+        Returns:
+            set | None: Requested field names or None if no projection applies.
+        """
+        if request is None or request.method != 'GET':
+            return None
+        return cls.parse_fields(request.query_params.get(cls.fields_query_param))
+
+    @classmethod
+    def includes_archived(cls, request):
+        """
+        Check whether a list request opted in to archived tasks with `?include_archived=`.
+        Args:
+            request: DRF request object.
+        Returns:
+            bool: True for a true value such as '1', 'true' or 'yes'.
+        """
+        raw = request.query_params.get(cls.archived_query_param, '')
+        return raw.lower() in serializers.BooleanField.TRUE_VALUES
+
+    @classmethod
+    def parse_fields(cls, raw):
+        """
+        Parse a comma separated list of task field names.
+        Unknown field names are ignored.
+        Args:
+            raw: The list, e.g. 'id,title,status' (may be None).
+        Returns:
+            set | None: Known field names or None if none were given.
+        """
+        if not raw:
+            return None
+        known = {field.name for field in TicketeerTask._meta.concrete_fields}
+        requested = {name.strip() for name in raw.split(',')} & known
+        return requested or None
+
+    @property
+    def data(self):
+        with serializer_timer():
+            return super().data
+
+
+class TaskRowEncoder:
+    """
+    Fast read-only JSON encoding of tasks, bypassing TaskSerializer.
+    Reads plain `values_list()` tuples instead of model instances and turns
+    them into exactly the bytes DRF's JSONRenderer produces for
+    `TaskSerializer(tasks, many=True).data`: same keys, same key order, same
+    value formats. The column list and the per-column converters are worked
+    out once from TaskSerializer's fields, only date / datetime columns need
+    a conversion per value.
+    Attributes:
+        chunk_size: Rows encoded per JSON chunk.
+        keys: Output keys in TaskSerializer order.
+        columns: Model columns to pass to `values_list()`, matching `keys`.
+    """
+
+    chunk_size = 1000
+    encoder = json.JSONEncoder(ensure_ascii=False, allow_nan=False, separators=(',', ':'))
+    passthrough = (serializers.CharField, serializers.ChoiceField, serializers.IntegerField,
+                   serializers.PrimaryKeyRelatedField)
+
+    def __init__(self, field_names=None):
+        """
+        Precompile the column-to-key mapping.
+        Args:
+            field_names: Optional subset of TaskSerializer fields to output.
+        """
+        fields = TaskSerializer().fields
+        self.keys = [name for name in fields if field_names is None or name in field_names]
+        self.columns = [TicketeerTask._meta.get_field(fields[name].source).attname for name in self.keys]
+        self.converters = [self.make_converter(fields[name]) for name in self.keys]
+
+    def make_converter(self, field):
+        """
+        Pick the cheapest function producing the field's representation of a column value.
+        Args:
+            field: TaskSerializer field.
+        Returns:
+            callable | None: Converter, or None if the database value is used as is.
+        """
+        if isinstance(field, self.passthrough):
+            return None
+        if isinstance(field, serializers.DateField):
+            if getattr(field, 'format', api_settings.DATE_FORMAT) == ISO_8601:
+                return datetime.date.isoformat
+        elif isinstance(field, serializers.DateTimeField):
+            if getattr(field, 'format', api_settings.DATETIME_FORMAT) != ISO_8601:
+                return field.to_representation
+            # DateTimeField.to_representation looks up the current time zone per value.
+            field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+            if field_timezone is not None:
+                def convert(value):
+                    if value.tzinfo is None:
+                        return field.to_representation(value)
+                    text = value.astimezone(field_timezone).isoformat()
+                    return text[:-6] + 'Z' if text.endswith('+00:00') else text
+                return convert
+        return field.to_representation
+
+    def rows_to_dicts(self, rows):
+        """
+        Turn `values_list()` tuples into dicts with serializer keys and formats.
+        Args:
+            rows: Iterable of tuples ordered like `columns`.
+        Returns:
+            list: One dict per row.
+        """
+        keys = self.keys
+        convert = [(index, converter) for index, converter in enumerate(self.converters) if converter]
+        result = []
+        for row in rows:
+            if convert:
+                row = list(row)
+                for index, converter in convert:
+                    if row[index] is not None:
+                        row[index] = converter(row[index])
+            result.append(dict(zip(keys, row)))
+        return result
+
+    def tasks_to_dicts(self, tasks):
+        """
+        Like `rows_to_dicts()`, for tasks already loaded as model instances.
+        Args:
+            tasks: Iterable of TicketeerTask instances.
+        Returns:
+            list: One dict per task, equal to `TaskSerializer(tasks, many=True).data`.
+        """
+        columns = self.columns
+        return self.rows_to_dicts([getattr(task, column) for column in columns] for task in tasks)
+
+    def iter_json(self, rows):
+        """
+        Stream a JSON array of tasks in chunks.
+        Args:
+            rows: Iterable of tuples ordered like `columns`.
+        Yields:
+            bytes: Consecutive pieces of the JSON document.
+        """
+        yield b'['
+        first = True
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == self.chunk_size:
+                yield self.encode_chunk(chunk, first)
+                first = False
+                chunk = []
+        if chunk:
+            yield self.encode_chunk(chunk, first)
+        yield b']'
+
+    def iter_ndjson(self, rows):
+        """
+        Stream tasks as newline delimited JSON, one object per line.
+        Args:
+            rows: Iterable of tuples ordered like `columns`.
+        Yields:
+            bytes: Chunks of complete lines.
+        """
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == self.chunk_size:
+                yield self.encode_lines(chunk)
+                chunk = []
+        if chunk:
+            yield self.encode_lines(chunk)
+
+    def encode_lines(self, rows):
+        """
+        Encode rows as JSON lines.
+        Args:
+            rows: List of tuples ordered like `columns`.
+        Returns:
+            bytes: One JSON object per line, each line ending with a newline.
+        """
+        lines = [self.encoder.encode(item) for item in self.rows_to_dicts(rows)]
+        lines.append('')
+        return '\n'.join(lines).encode()
+
+    def encode_chunk(self, rows, first):
+        """
+        Encode rows as the inside of a JSON array.
+        Args:
+            rows: List of tuples ordered like `columns`.
+            first: False if the chunk continues an array that already has items.
+        Returns:
+            bytes: Comma separated JSON objects.
+        """
+        text = self.encoder.encode(self.rows_to_dicts(rows))[1:-1]
+        # Same escaping as DRF's JSONRenderer.
+        text = text.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029')
+        return text.encode() if first else b',' + text.encode()
+
+    def render(self, *querysets):
+        """
+        Render task querysets as one JSON document.
+        Args:
+            *querysets: Querysets of tasks (or archived tasks), concatenated in order.
+        Returns:
+            bytes: The JSON array.
+        """
+        rows = itertools.chain.from_iterable(queryset.values_list(*self.columns) for queryset in querysets)
+        with serializer_timer():
+            return b''.join(self.iter_json(rows))
+
+
+class TaskBulkSerializer(serializers.ListSerializer):
+    """
+    Serializer for bulk task operations.
+    Validates a list of operations against the rules of TaskSerializer and
+    applies them with bulk queries, one UPDATE statement per set of changed
+    fields.
+    Each item names its operation in `op`:
+        {"op": "create", "title": ..., ...}
+        {"op": "update", "id": 1, "version": 3, "status": "done", ...}
+        {"op": "delete", "id": 1, "version": 3}
+    Errors are reported per item, in the order of the request.
+    Updates and deletes are conditional on the task version, like the
+    single-task writes (see `expected_version()`): the optional `version`
+    the client loaded, else the version read here, so items without a
+    version overwrite changes made before the request (last writer wins).
+    If a task is not at that version (or changes before the write) nothing
+    is applied and VersionConflict (409) lists the stale items. With
+    TICKETEER_REQUIRE_PRECONDITION, items without a version are refused
+    with PreconditionRequired (428).
+    Attributes:
+        operations: Supported operation names.
+        batch_size: Rows per INSERT statement.
+    """
+
+    operations = ('create', 'update', 'delete')
+    batch_size = 500
+    # Validates the `id` and `version` of every item; one instance for all of them.
+    positive_integer = serializers.IntegerField(min_value=1)
+    default_error_messages = {
+        **serializers.ListSerializer.default_error_messages,
+        'not_a_dict': 'Expected an operation object but got "{input_type}".',
+        'invalid_op': 'Unknown operation "{op}", expected one of: create, update, delete.',
+        'id_required': 'This field is required for update and delete operations.',
+        'duplicate': 'Task {id} is used by more than one operation.',
+        'not_found': 'Task {id} not found.',
+        'conflict': VersionConflict.default_detail,
+        'precondition_required': PreconditionRequired.default_detail,
+    }
+
+    def __init__(self, *args, **kwargs):
+        """
+        Use TaskSerializer as child and cap the number of operations per request.
+        Args:
+            *args: Positional arguments for the ListSerializer.
+            **kwargs: Keyword arguments for the ListSerializer.
+        """
+        kwargs.setdefault('child', TaskSerializer())
+        kwargs.setdefault('max_length', 20000)
+        super().__init__(*args, **kwargs)
+
+    def to_internal_value(self, data):
+        """
+        Validate every operation and look up the tasks to update or delete.
+        Args:
+            data: List of operation objects.
+        Returns:
+            list: Validated operations as dicts with `op`, `id`, `attrs` and `task`.
+        Raises:
+            ValidationError: With one error entry per item if any item is invalid.
+            PreconditionRequired: Items name no version while TICKETEER_REQUIRE_PRECONDITION is set.
+            VersionConflict: Items name a version their task is no longer at.
+        """
+        if not isinstance(data, list):
+            message = self.error_messages['not_a_list'].format(input_type=type(data).__name__)
+        elif not data:
+            message = self.error_messages['empty']
+        elif self.max_length is not None and len(data) > self.max_length:
+            message = self.error_messages['max_length'].format(max_length=self.max_length)
+        else:
+            message = None
+        if message:
+            raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [message]})
+
+        creator = TaskSerializer(context=self.context)
+        updater = TaskSerializer(context=self.context, partial=True)
+        operations, errors = [], []
+        for item in data:
+            try:
+                operations.append(self.validate_operation(item, creator, updater))
+                errors.append({})
+            except serializers.ValidationError as exc:
+                operations.append(None)
+                errors.append(exc.detail)
+
+        self.resolve_tasks(operations, errors)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        if getattr(settings, 'TICKETEER_REQUIRE_PRECONDITION', False):
+            missing = [
+                {'version': [self.error_messages['precondition_required']]}
+                if operation['op'] != 'create' and operation['version'] is None else {}
+                for operation in operations
+            ]
+            if any(missing):
+                raise PreconditionRequired(missing)
+        conflicts = [
+            {'version': [self.error_messages['conflict']]}
+            if operation['version'] not in (None, getattr(operation.get('task'), 'version', None)) else {}
+            for operation in operations
+        ]
+        if any(conflicts):
+            raise VersionConflict(conflicts)
+        return operations
+
+    def validate_operation(self, item, creator, updater):
+        """
+        Validate a single operation object.
+        Args:
+            item: Operation object from the request.
+            creator: TaskSerializer validating full task data.
+            updater: Partial TaskSerializer validating changed fields.
+        Returns:
+            dict: The validated operation with `op`, `id`, `version` and `attrs`.
+        Raises:
+            ValidationError: If the operation is invalid.
+        """
+        if not isinstance(item, dict):
+            message = self.error_messages['not_a_dict'].format(input_type=type(item).__name__)
+            raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [message]})
+        payload = dict(item)
+        op = payload.pop('op', None)
+        pk = payload.pop('id', None)
+        if op not in self.operations:
+            raise serializers.ValidationError({'op': [self.error_messages['invalid_op'].format(op=op)]})
+
+        if op == 'create':
+            return {'op': op, 'id': None, 'version': None, 'attrs': creator.run_validation(payload)}
+        if pk is None:
+            raise serializers.ValidationError({'id': [self.error_messages['id_required']]})
+        pk = self.positive_integer.run_validation(pk)
+        version = payload.pop('version', None)
+        if version is not None:
+            try:
+                version = self.positive_integer.run_validation(version)
+            except serializers.ValidationError as exc:
+                raise serializers.ValidationError({'version': exc.detail})
+        attrs = updater.run_validation(payload) if op == 'update' else {}
+        return {'op': op, 'id': pk, 'version': version, 'attrs': attrs}
+
+    def resolve_tasks(self, operations, errors):
+        """
+        Fetch the tasks referenced by update and delete operations in one query.
+        Only tasks of the requesting user are found.
+        Args:
+            operations: Validated operations (None for invalid items).
+            errors: Per-item error list, extended in place.
+        """
+        seen = set()
+        for index, operation in enumerate(operations):
+            if operation and operation['id'] is not None:
+                if operation['id'] in seen:
+                    errors[index] = {'id': [self.error_messages['duplicate'].format(id=operation['id'])]}
+                seen.add(operation['id'])
+
+        tasks = TicketeerTask.objects.filter(author=self.context['request'].user).in_bulk(seen)
+        for index, operation in enumerate(operations):
+            if operation and operation['id'] is not None:
+                operation['task'] = tasks.get(operation['id'])
+                if operation['task'] is None and not errors[index]:
+                    errors[index] = {'id': [self.error_messages['not_found'].format(id=operation['id'])]}
+
+    def create(self, validated_data):
+        """
+        Apply all operations inside one transaction.
+        Args:
+            validated_data: Validated operations, each extended with the `author` passed to save().
+        Returns:
+            list: One result object ({'op', 'id'}) per operation, in request order.
+            The affected tasks are kept in `changes` for change notifications.
+        Raises:
+            VersionConflict: If a task changed after it was read; the transaction is rolled back.
+        """
+        now = timezone.now()
+        created, updated, deleted = [], [], {}
+        # Updates changing the same fields share an UPDATE statement; no
+        # update writes a field it did not change.
+        groups = {}
+        for operation in validated_data:
+            if operation['op'] == 'create':
+                created.append(TicketeerTask(author=operation['author'], **operation['attrs']))
+            elif operation['op'] == 'update':
+                task = operation['task']
+                for attr, value in operation['attrs'].items():
+                    setattr(task, attr, value)
+                task.updated_at = now
+                groups.setdefault(tuple(sorted(operation['attrs'])), []).append(task)
+                updated.append(task)
+            else:
+                deleted[operation['id']] = operation['task'].version
+
+        with transaction.atomic():
+            TicketeerTask.objects.bulk_create(created, batch_size=self.batch_size)
+            written = sum(self.update_tasks(tasks, fields) for fields, tasks in groups.items())
+            if deleted:
+                written += TicketeerTask.delete_tasks(self.context['request'].user.pk, list(deleted), expected=deleted)
+            applied = written == len(updated) + len(deleted)
+            if not applied:
+                transaction.set_rollback(True)
+        if not applied:
+            raise self.conflict(validated_data)
+
+        for task in updated:
+            task.version += 1
+        self.changes = {'created': created, 'updated': updated, 'deleted': list(deleted)}
+        new_ids = iter(task.id for task in created)
+        return [
+            {'op': operation['op'], 'id': next(new_ids) if operation['op'] == 'create' else operation['id']}
+            for operation in validated_data
+        ]
+
+    def update_tasks(self, tasks, fields):
+        """
+        Write changed fields, but only to tasks still at the version they were read at.
+        Every task gets the conditional UPDATE of `TicketeerTask.save_changes()`
+        (primary key and version in the WHERE clause, the version incremented
+        by the database); they are sent as one statement with a parameter row
+        per task through `executemany()`. The SQL is built once, instead of
+        CASE expressions the ORM compiles value by value for every task.
+        Args:
+            tasks: Tasks with the new field values and `updated_at`, as read (`version` unchanged).
+            fields: Names of the changed fields.
+        Returns:
+            int: Number of updated tasks.
+        """
+        connection = connections[router.db_for_write(TicketeerTask)]
+        quote = connection.ops.quote_name
+        opts = TicketeerTask._meta
+        model_fields = [opts.get_field(name) for name in (*fields, 'updated_at')]
+        version = quote(opts.get_field('version').column)
+        sql = (f'UPDATE {quote(opts.db_table)} SET '
+               + ''.join(f'{quote(field.column)} = %s, ' for field in model_fields)
+               + f'{version} = {version} + 1 WHERE {quote(opts.pk.column)} = %s AND {version} = %s')
+        params = [
+            [*(field.get_db_prep_save(getattr(task, field.attname), connection) for field in model_fields),
+             task.pk, task.version]
+            for task in tasks
+        ]
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, params)
+            return cursor.rowcount
+
+    def conflict(self, operations):
+        """
+        Build the error for operations whose task changed after it was read.
+        Runs after the writes were rolled back, so it compares against the other writers' versions.
+        Args:
+            operations: Validated operations.
+        Returns:
+            VersionConflict: With a `version` error for every stale item.
+        """
+        tasks = [operation['task'] for operation in operations if operation['op'] != 'create']
+        current = dict(TicketeerTask.objects.filter(pk__in=[task.pk for task in tasks]).values_list('id', 'version'))
+        return VersionConflict([
+            {'version': [self.error_messages['conflict']]}
+            if operation['op'] != 'create' and current.get(operation['id']) != operation['task'].version else {}
+            for operation in operations
+        ])
 
 
 class TaskStatusSerializer(serializers.ModelSerializer):
@@ -59,3 +578,329 @@ class TaskStatusSerializer(serializers.ModelSerializer):
     class Meta:
         model = TicketeerTask
         fields = ['status']
+
+
+class TaskBatchStatusSerializer(serializers.Serializer):
+    """
+    Serializer for moving several tasks to a new status at once.
+    Attributes:
+        ids: IDs of the tasks to move.
+        status: The new status of the tasks.
+    """
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=1000)
+    status = serializers.ChoiceField(choices=TicketeerTask.STATUS_CHOICES)
+
+
+class TaskSummaryQuerySerializer(serializers.Serializer):
+    """
+    Serializer for the optional query parameters of the task summary.
+    Attributes:
+        date_from: Only count tasks dated on or after this day.
+        date_to: Only count tasks dated on or before this day.
+    """
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        """
+        Ensure the date range is not reversed.
+        Args:
+            attrs (dict): Validated query parameters.
+        Returns:
+            dict: The unchanged query parameters.
+        """
+        if 'date_from' in attrs and 'date_to' in attrs and attrs['date_from'] > attrs['date_to']:
+            raise serializers.ValidationError('date_from must not be after date_to.')
+        return attrs
+
+
+class TaskExportQuerySerializer(serializers.Serializer):
+    """
+    Serializer for the query parameters of the task export.
+    Attributes:
+        output: Export format, a JSON array or newline delimited JSON.
+    """
+    output = serializers.ChoiceField(choices=['json', 'ndjson'], default='json')
+
+
+class TaskImportSerializer(serializers.Serializer):
+    """
+    Serializer for importing tasks from an uploaded CSV or NDJSON file.
+    The file is read row by row: every row is validated with TaskSerializer
+    and valid rows are inserted in batches of `batch_size`, so neither the
+    file nor the new tasks are ever held in memory as a whole. CSV files need
+    a header row with TaskSerializer field names; empty cells fall back to the
+    model defaults. Invalid rows are skipped and reported with their line number.
+    The import runs in one transaction, unless the context holds a
+    `checkpoint` callable (import jobs): then every batch is committed in
+    its own transaction together with `checkpoint(report)`, so the progress
+    is visible while the import runs, and the rows counted in the context's
+    `resume` report are skipped. The file is decoded once up front then,
+    so an undecodable file still imports nothing.
+    Attributes:
+        file: The uploaded file.
+        input: File format, guessed from the file name if omitted.
+        batch_size: Rows per bulk_create() call.
+        max_errors: Maximum number of row errors listed in the report.
+    """
+
+    formats = {'csv': 'csv', 'ndjson': 'ndjson', 'jsonl': 'ndjson'}
+    batch_size = 500
+    max_errors = 100
+    default_error_messages = {
+        'unknown_format': 'Cannot tell the format from the file name, pass input=csv or input=ndjson.',
+        'not_utf8': 'The file is not UTF-8 encoded.',
+        'invalid_csv': 'Invalid CSV - {error}',
+        'invalid_json': 'JSON parse error - {error}',
+    }
+
+    file = serializers.FileField()
+    input = serializers.ChoiceField(choices=['csv', 'ndjson'], required=False)
+
+    def validate(self, attrs):
+        """
+        Determine the file format.
+        Args:
+            attrs (dict): Validated request data.
+        Returns:
+            dict: The request data with `input` set.
+        """
+        if 'input' not in attrs:
+            extension = os.path.splitext(attrs['file'].name)[1].lstrip('.').lower()
+            if extension not in self.formats:
+                raise serializers.ValidationError({'input': [self.error_messages['unknown_format']]})
+            attrs['input'] = self.formats[extension]
+        return attrs
+
+    def iter_rows(self, file, input):
+        """
+        Read the uploaded file lazily.
+        Args:
+            file: Uploaded file.
+            input: File format ('csv' or 'ndjson').
+        Yields:
+            tuple: Line number and the row (dict for CSV, str for NDJSON).
+        """
+        file.seek(0)
+        text = io.TextIOWrapper(file.file, encoding='utf-8-sig', newline='')
+        try:
+            if input == 'csv':
+                reader = csv.DictReader(text)
+                reader.fieldnames  # reads the header row
+                line = reader.line_num + 1
+                for row in reader:
+                    yield line, {key: value for key, value in row.items()
+                                 if key is not None and value not in ('', None)}
+                    line = reader.line_num + 1
+            else:
+                for line, raw in enumerate(text, 1):
+                    if raw.strip():
+                        yield line, raw
+        finally:
+            # Closing the wrapper would close the upload, which may be read again.
+            text.detach()
+
+    def decode_row(self, row):
+        """
+        Turn a row into task data for TaskSerializer.
+        Args:
+            row: Row from `iter_rows()`.
+        Returns:
+            object: Task data.
+        Raises:
+            ValidationError: If an NDJSON line is not valid JSON.
+        """
+        if not isinstance(row, str):
+            return row
+        try:
+            return json.loads(row)
+        except ValueError as exc:
+            message = self.error_messages['invalid_json'].format(error=exc)
+            raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [message]})
+
+    def create(self, validated_data):
+        """
+        Import all valid rows, in one transaction or in one per batch (see above).
+        Args:
+            validated_data: Validated request data, extended with the `author` passed to save().
+        Returns:
+            dict: Number of created tasks, number of invalid rows and the first `max_errors` row errors.
+        Raises:
+            ValidationError: If the file cannot be decoded; nothing is imported then.
+        """
+        checkpoint = self.context.get('checkpoint')
+        report = {'rows': 0, 'created': 0, 'error_count': 0, 'errors': [], **self.context.get('resume', {})}
+        try:
+            if checkpoint is None:
+                with transaction.atomic():
+                    self.import_rows(validated_data, report, None)
+            else:
+                for _ in self.iter_rows(validated_data['file'], validated_data['input']):
+                    pass
+                self.import_rows(validated_data, report, checkpoint)
+        except UnicodeDecodeError:
+            raise serializers.ValidationError({'file': [self.error_messages['not_utf8']]})
+        except csv.Error as exc:
+            raise serializers.ValidationError({'file': [self.error_messages['invalid_csv'].format(error=exc)]})
+        return {'created': report['created'], 'error_count': report['error_count'], 'errors': report['errors']}
+
+    def import_rows(self, validated_data, report, checkpoint):
+        """
+        Validate the rows after `report['rows']` and insert the valid ones in batches.
+        Args:
+            validated_data: Validated request data with the `author`.
+            report: Running report (rows read, created tasks, row errors), updated in place.
+            checkpoint: Callable committed with every batch, or None.
+        """
+        creator = TaskSerializer(context=self.context)
+        rows = self.iter_rows(validated_data['file'], validated_data['input'])
+        batch = []
+        for line, row in itertools.islice(rows, report['rows'], None):
+            report['rows'] += 1
+            try:
+                attrs = creator.run_validation(self.decode_row(row))
+            except serializers.ValidationError as exc:
+                report['error_count'] += 1
+                if len(report['errors']) < self.max_errors:
+                    report['errors'].append({'line': line, 'errors': exc.detail})
+                continue
+            batch.append(TicketeerTask(author=validated_data['author'], **attrs))
+            if len(batch) == self.batch_size:
+                self.write_batch(batch, report, checkpoint)
+                batch = []
+        if batch or checkpoint:
+            self.write_batch(batch, report, checkpoint)
+
+    def write_batch(self, batch, report, checkpoint):
+        """
+        Insert a batch of tasks, committed with the checkpoint if there is one.
+        Args:
+            batch: New tasks.
+            report: Running report, updated in place.
+            checkpoint: Callable committed with the batch, or None.
+        """
+        if checkpoint is None:
+            TicketeerTask.objects.bulk_create(batch)
+            report['created'] += len(batch)
+            return
+        with transaction.atomic():
+            TicketeerTask.objects.bulk_create(batch)
+            report['created'] += len(batch)
+            checkpoint(report)
+
+
+class TaskSearchQuerySerializer(serializers.Serializer):
+    """
+    Serializer for the query parameters of the task search.
+    Attributes:
+        q: Search text; every word has to match.
+        page: Number of the result page, starting at 1.
+        page_size: Number of results per page.
+    """
+    q = serializers.CharField(max_length=200)
+    page = serializers.IntegerField(min_value=1, default=1)
+    page_size = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+
+class TaskSyncQuerySerializer(serializers.Serializer):
+    """
+    Serializer for the query parameters of the delta sync.
+    Sync tokens are signed by the server and hold the user and the time the
+    sync they came from started (microseconds since the epoch); clients
+    treat them as opaque.
+    Attributes:
+        token: Token of the client's last sync, omitted for the first sync.
+        salt: Signing salt of sync tokens.
+    """
+    token = serializers.CharField(required=False)
+
+    salt = 'ticketeer.sync'
+    epoch = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+    default_error_messages = {
+        'invalid_token': 'Invalid sync token, sync without a token to start over.',
+    }
+
+    @classmethod
+    def make_token(cls, user_id, moment):
+        """
+        Issue the token of a sync.
+        Args:
+            user_id: Primary key of the syncing user.
+            moment: Time the sync started.
+        Returns:
+            str: Signed sync token.
+        """
+        return signing.dumps([user_id, (moment - cls.epoch) // datetime.timedelta(microseconds=1)], salt=cls.salt)
+
+    def validate_token(self, value):
+        """
+        Check the signature and owner of a sync token.
+        Args:
+            value: The token.
+        Returns:
+            datetime: Time the sync of the token started.
+        Raises:
+            ValidationError: If the token was not issued to the requesting user.
+        """
+        try:
+            user_id, microseconds = signing.loads(value, salt=self.salt)
+        except (signing.BadSignature, TypeError, ValueError):
+            self.fail('invalid_token')
+        if user_id != self.context['request'].user.pk:
+            self.fail('invalid_token')
+        return self.epoch + datetime.timedelta(microseconds=microseconds)
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the state of a background job.
+    Attributes:
+        download: URL of the result file of a finished export, otherwise None.
+    """
+
+    download = serializers.SerializerMethodField()
+
+    class Meta:
+        model = TicketeerJob
+        fields = ('id', 'kind', 'status', 'params', 'progress', 'total', 'result', 'error',
+                  'created_at', 'started_at', 'finished_at', 'download')
+        read_only_fields = fields
+
+    def get_download(self, job):
+        """
+        Args:
+            job: The job.
+        Returns:
+            str | None: Absolute URL of the result file.
+        """
+        if job.status != 'done' or not job.output:
+            return None
+        url = reverse('job-download', args=[job.pk])
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+
+class JobExportSerializer(TaskExportQuerySerializer):
+    """
+    Serializer for the parameters of an export job.
+    Attributes:
+        fields: Comma separated task fields to export (default: all).
+    """
+    fields = serializers.CharField(required=False)
+
+    def validate_fields(self, value):
+        """
+        Returns:
+            list | None: Sorted known field names.
+        """
+        fields = TaskSerializer.parse_fields(value)
+        return sorted(fields) if fields else None
+
+
+class JobCleanupSerializer(serializers.Serializer):
+    """
+    Serializer for the parameters of a cleanup job, which deletes done tasks.
+    Attributes:
+        before: Only delete tasks dated before this day (default: all done tasks).
+    """
+    before = serializers.DateField(required=False)
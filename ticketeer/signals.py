@@ -0,0 +1,61 @@
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+from .cache import token_cache
+from .metrics import install_query_counter
+from .search import SQLiteFTSSearchBackend
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_user_tokens(sender, instance, **kwargs):
+    """
+    Drop the cached tokens of a user whenever the user changes (e.g. is deactivated).
+    Args:
+        sender: The user model.
+        instance: The saved user.
+        **kwargs: Additional signal arguments.
+    """
+    keys = list(Token.objects.filter(user=instance).values_list('key', flat=True))
+    if keys:
+        token_cache.invalidate(*keys)
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def invalidate_token(sender, instance, **kwargs):
+    """
+    Drop a cached token when it is (re)issued or deleted.
+    Args:
+        sender: The token model.
+        instance: The saved or deleted token.
+        **kwargs: Additional signal arguments.
+    """
+    token_cache.invalidate(instance.key)
+
+
+@receiver(post_migrate)
+def repair_search_index(sender, using, **kwargs):
+    """
+    Restore the search index triggers after migrations rebuilt the task table.
+    Args:
+        sender: App config of the migrated app.
+        using: Alias of the migrated database.
+        **kwargs: Additional signal arguments.
+    """
+    if sender.name == 'ticketeer' and connections[using].vendor == 'sqlite':
+        SQLiteFTSSearchBackend.install(connections[using], create_table=False)
+
+
+@receiver(connection_created)
+def count_request_queries(sender, connection, **kwargs):
+    """
+    Account the queries of every new database connection to the current request's metrics.
+    Args:
+        sender: Class of the connection wrapper.
+        connection: The new connection wrapper.
+        **kwargs: Additional signal arguments.
+    """
+    install_query_counter(connection)
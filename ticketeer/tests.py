@@ -1,3 +1,1839 @@
-from django.test import TestCase
+import asyncio
+import datetime
+import io
+import itertools
+import json
+import os
+import pathlib
+import shutil
+import tempfile
+import threading
+import time
+import tracemalloc
+from unittest import mock
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import transaction
+from django.db import connection
+from django.db.models import F, QuerySet
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APITestCase, APITransactionTestCase
+from kanban_backend.db.router import ReplicaRouter, ReplicaStickinessMiddleware, replica_state
+from ticketeer import async_views, views
+from ticketeer.cache import AsyncSingleFlight, SingleFlight, board_cache, token_cache
+from ticketeer.events import task_channel, tasks_changed
+from ticketeer.metrics import RequestMetrics, registry
+from ticketeer.models import TicketeerJob, TicketeerTask, TicketeerTaskArchive, TicketeerTaskTombstone
+from ticketeer.pubsub import InProcessBroker, get_broker
+from ticketeer.realtime import TaskEventsConsumer
+from ticketeer.search import SQLiteFTSSearchBackend, get_search_backend
+from ticketeer.serializers import TaskImportSerializer, TaskRowEncoder, TaskSerializer, TaskSyncQuerySerializer
+from ticketeer.throttling import LoginRateThrottle, TokenBucketThrottle
 
-# Create your tests here.
+
+class TicketeerAPITestCase(APITestCase):
+    """
+    Base class of the API tests: empty caches and an authenticated user 'alice'.
+    """
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.user = self.create_user('alice')
+        self.client.force_authenticate(self.user)
+
+    def create_user(self, username):
+        return User.objects.create_user(username, f'{username}@example.com', 'secret-password')
+
+
+class TaskListPaginationTests(TicketeerAPITestCase):
+    """
+    Tests for the keyset pagination and the `?fields=` projection of the task list.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('task-list-create')
+        # Several tasks share a date, so pages have to break ties by id.
+        self.tasks = TicketeerTask.objects.bulk_create(
+            TicketeerTask(author=self.user, title=f'Task {index}', subtitle='pages', content='Walked page by page',
+                          date=datetime.date(2024, 1, 1 + index // 3))
+            for index in range(10))
+        TicketeerTask.objects.create(author=self.create_user('bob'), title='Foreign', subtitle='pages',
+                                     content='Never listed for alice')
+
+    def test_unpaginated_by_default(self):
+        self.assertEqual(len(self.client.get(self.url).json()), 10)
+
+    def test_cursor_walks_every_task_once_in_order(self):
+        url, pages = f'{self.url}?page_size=4', []
+        while url:
+            page = self.client.get(url).data
+            pages.append([task['id'] for task in page['results']])
+            url = page['next']
+        self.assertEqual([len(page) for page in pages], [4, 4, 2])
+        expected = [task.pk for task in sorted(self.tasks, key=lambda task: (task.date, task.pk))]
+        self.assertEqual(list(itertools.chain(*pages)), expected)
+
+    def test_new_tasks_do_not_shift_later_pages(self):
+        first = self.client.get(self.url, {'page_size': 5}).data
+        TicketeerTask.objects.create(author=self.user, title='Early', subtitle='pages',
+                                     content='Sorted before the cursor', date=datetime.date(2023, 1, 1))
+        second = self.client.get(first['next']).data
+        self.assertEqual([task['id'] for task in second['results']], [task.pk for task in self.tasks[5:]])
+
+    def test_invalid_cursor(self):
+        for cursor in ('not-base64!', 'MjAyNC0wMS0wMQ==', 'eHx5'):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(self.url, {'cursor': cursor})
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual(response.data['detail'], 'Invalid cursor')
+
+    def test_page_size_is_capped(self):
+        with mock.patch.object(views.TaskCursorPagination, 'max_page_size', 3):
+            self.assertEqual(len(self.client.get(self.url, {'page_size': 50}).data['results']), 3)
+
+    def test_fields_projection(self):
+        data = self.client.get(self.url, {'fields': 'id, title,unknown'}).json()
+        self.assertEqual(set(data[0]), {'id', 'title'})
+        page = self.client.get(self.url, {'fields': 'status', 'page_size': 2}).data
+        self.assertEqual(set(page['results'][0]), {'status'})
+        self.assertIsNotNone(page['next'])
+        # Unknown names only: no projection.
+        self.assertEqual(set(self.client.get(self.url, {'fields': 'nope'}).json()[0]), set(TaskSerializer().fields))
+
+    def test_projection_loads_only_the_needed_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url, {'fields': 'title', 'page_size': 2})
+        select = next(query['sql'] for query in queries if 'LIMIT 3' in query['sql'])
+        self.assertIn('"title"', select)
+        self.assertNotIn('"content"', select)
+
+    def test_fields_do_not_apply_to_writes(self):
+        response = self.client.post(f'{self.url}?fields=id', {
+            'title': 'Written', 'subtitle': 'pages', 'content': 'Full representation'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(set(response.data), set(TaskSerializer().fields))
+
+
+class TaskBoardTests(TicketeerAPITestCase):
+    """
+    Tests for the kanban board endpoint.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('task-board')
+        self.late = TicketeerTask.objects.create(author=self.user, title='Late todo', subtitle='board',
+                                                 content='Due last', status='todo', date=datetime.date(2024, 3, 1))
+        self.early = TicketeerTask.objects.create(author=self.user, title='Early todo', subtitle='board',
+                                                  content='Due first', status='todo', date=datetime.date(2024, 1, 1))
+        self.tie = TicketeerTask.objects.create(author=self.user, title='Tied todo', subtitle='board',
+                                                content='Same day as the first', status='todo',
+                                                date=datetime.date(2024, 1, 1))
+        self.done = TicketeerTask.objects.create(author=self.user, title='Finished', subtitle='board',
+                                                 content='Already done', status='done')
+        TicketeerTask.objects.create(author=self.create_user('bob'), title='Foreign', subtitle='board',
+                                     content='Never on alice\'s board', status='todo')
+
+    def test_groups_by_status_in_date_order(self):
+        board = self.client.get(self.url).data
+        self.assertEqual(list(board), ['urgent', 'todo', 'inProgress', 'done'])
+        self.assertEqual(board['urgent'], [])
+        self.assertEqual([task['id'] for task in board['todo']], [self.early.pk, self.tie.pk, self.late.pk])
+        self.assertEqual(board['done'], [TaskSerializer(self.done).data])
+
+    def test_fields_projection(self):
+        board = self.client.get(self.url, {'fields': 'title'}).data
+        self.assertEqual(board['todo'][0], {'title': 'Early todo'})
+
+    def test_one_query_served_by_the_index(self):
+        view = views.TaskBoardAPIView()
+        view.request = mock.Mock(user=self.user, method='GET', query_params={})
+        plan = view.get_queryset().explain()
+        self.assertIn('task_author_status_date_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url)
+        self.assertEqual(len([query for query in queries if 'ticketeer_ticketeertask' in query['sql']]), 1)
+
+
+class BoardCacheTests(TicketeerAPITestCase):
+    """
+    Tests for the per-author board cache and its invalidation by task writes.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.task = TicketeerTask.objects.create(author=self.user, title='Cached', subtitle='cache',
+                                                 content='Served from the cache')
+        self.reads = [reverse('task-list-create'), reverse('task-board'), reverse('task-summary')]
+
+    def read_all(self):
+        return [self.client.get(url).content for url in self.reads]
+
+    def count_task_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.read_all()
+        return len([query for query in queries if 'ticketeer_ticketeertask' in query['sql']])
+
+    def test_reads_are_cached(self):
+        self.read_all()
+        # Only the list's validators query (ETag) remains.
+        self.assertEqual(self.count_task_queries(), 1)
+
+    def test_writes_invalidate_the_author_board(self):
+        task_url = reverse('task-detail', args=[self.task.pk])
+        writes = {
+            'create': lambda: self.client.post(reverse('task-list-create'), {
+                'title': 'Created', 'subtitle': 'cache', 'content': 'Written through the API'}),
+            'create endpoint': lambda: self.client.post(reverse('create'), {
+                'title': 'Created too', 'subtitle': 'cache', 'content': 'Written through the API'}),
+            'update': lambda: self.client.patch(task_url, {'title': 'Renamed'}),
+            'status': lambda: self.client.patch(reverse('task-status-update', args=[self.task.pk]), {'status': 'done'}),
+            'batch status': lambda: self.client.patch(reverse('task-batch-status-update'), {
+                'ids': [self.task.pk], 'status': 'urgent'}, format='json'),
+            'bulk': lambda: self.client.post(reverse('task-bulk'), [
+                {'op': 'update', 'id': self.task.pk, 'doTime': 5}], format='json'),
+            'import': lambda: self.client.post(reverse('task-import'), {'file': SimpleUploadedFile(
+                'tasks.csv', b'title,subtitle,content\nImported,cache,Imported through the API\n')}),
+            'delete': lambda: self.client.delete(task_url),
+        }
+        for label, write in writes.items():
+            with self.subTest(label):
+                before = self.client.get(self.reads[0]).content
+                self.read_all()
+                self.assertLess(write().status_code, 300)
+                # The validators query plus one recomputation per read.
+                self.assertEqual(self.count_task_queries(), 1 + len(self.reads))
+                self.assertNotEqual(self.client.get(self.reads[0]).content, before)
+
+    def test_other_authors_keep_their_cache(self):
+        bob = self.create_user('bob')
+        self.client.force_authenticate(bob)
+        self.read_all()
+        self.client.force_authenticate(self.user)
+        self.client.post(reverse('task-list-create'), {'title': 'Alice only', 'subtitle': 'cache',
+                                                      'content': 'Does not touch bob'})
+        self.client.force_authenticate(bob)
+        self.assertEqual(self.count_task_queries(), 1)
+
+    def test_large_values_are_not_cached(self):
+        with self.settings(TICKETEER_BOARD_CACHE_MAX_BYTES=10):
+            self.read_all()
+            # The validators query plus one recomputation per read.
+            self.assertEqual(self.count_task_queries(), 1 + len(self.reads))
+
+    def test_parameter_order_shares_an_entry(self):
+        self.client.get(self.reads[0] + '?fields=id,title&page_size=5')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.reads[0] + '?page_size=5&fields=id,title')
+        self.assertEqual(len([query for query in queries if 'ticketeer_ticketeertask' in query['sql']]), 1)
+
+    def test_evicted_version_counter_never_revives_old_entries(self):
+        self.read_all()
+        version = board_cache.version(self.user.pk)
+        caches[settings.TICKETEER_BOARD_CACHE].delete(board_cache.version_key.format(author_id=self.user.pk))
+        self.assertNotEqual(board_cache.version(self.user.pk), version)
+
+
+class ConditionalGetTests(TicketeerAPITestCase):
+    """
+    Tests for the ETag / Last-Modified validators of the task list and detail.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.tasks = [TicketeerTask.objects.create(author=self.user, title=f'Task {index}', subtitle='etag',
+                                                   content='Validated by the client') for index in range(2)]
+        # Last-Modified has a resolution of one second; keep the writes below apart from it.
+        TicketeerTask.objects.update(updated_at=timezone.now() - datetime.timedelta(minutes=5))
+        self.list_url = reverse('task-list-create')
+        self.detail_url = reverse('task-detail', args=[self.tasks[0].pk])
+
+    def assert_revalidates(self, url, changed, **params):
+        """
+        Fetch `url`, run `changed` and check both validators after it.
+        Args:
+            changed: Callable changing the resource, or None.
+        """
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        etag, last_modified = response['ETag'], response['Last-Modified']
+        if changed:
+            changed()
+        expected = 200 if changed else 304
+        self.assertEqual(self.client.get(url, params, HTTP_IF_NONE_MATCH=etag).status_code, expected)
+        self.assertEqual(self.client.get(url, params, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, expected)
+
+    def test_unchanged_list_and_detail_answer_304(self):
+        for url in (self.list_url, self.detail_url):
+            with self.subTest(url):
+                self.assert_revalidates(url, None)
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=self.client.get(self.list_url)['ETag'])
+        self.assertEqual(response.content, b'')
+        self.assertIn('Last-Modified', response)
+
+    def test_304_skips_the_serializer(self):
+        etag = self.client.get(self.list_url)['ETag']
+        with mock.patch.object(views.TaskRowEncoder, 'render') as render, \
+                mock.patch.object(views.TaskSerializer, 'data') as data:
+            self.assertEqual(self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        render.assert_not_called()
+        data.assert_not_called()
+
+    def test_list_changes_with_every_write(self):
+        writes = {
+            'update': lambda: self.client.patch(self.detail_url, {'title': 'Edited'}),
+            'create': lambda: self.client.post(self.list_url, {
+                'title': 'Created', 'subtitle': 'etag', 'content': 'Added to the list'}),
+            'delete': lambda: self.client.delete(reverse('task-detail', args=[self.tasks[1].pk])),
+        }
+        for label, write in writes.items():
+            with self.subTest(label):
+                self.assert_revalidates(self.list_url, write)
+                TicketeerTask.objects.update(updated_at=timezone.now() - datetime.timedelta(minutes=5))
+                TicketeerTaskTombstone.objects.update(deleted_at=timezone.now() - datetime.timedelta(minutes=5))
+
+    def test_writes_of_other_processes_are_not_served_from_the_cache(self):
+        # Other workers and management commands bump their own board version only.
+        writes = {
+            'update': lambda: self.client.patch(self.detail_url, {'title': 'Edited elsewhere'}),
+            'queryset update': lambda: TicketeerTask.objects.filter(pk=self.tasks[0].pk).update(
+                title='Updated by a command', updated_at=timezone.now()),
+            'create': lambda: self.client.post(self.list_url, {
+                'title': 'Created elsewhere', 'subtitle': 'etag', 'content': 'Added to the list'}),
+            'delete': lambda: self.client.delete(reverse('task-detail', args=[self.tasks[1].pk])),
+        }
+        variants = [{}, {'page_size': 1}]
+        for label, write in writes.items():
+            with self.subTest(label):
+                before = [self.client.get(self.list_url, params) for params in variants]
+                with mock.patch.object(board_cache, 'invalidate'):
+                    write()
+                after = [self.client.get(self.list_url, params, HTTP_IF_NONE_MATCH=response['ETag'])
+                         for params, response in zip(variants, before)]
+                self.assertEqual([response.status_code for response in after], [200, 200])
+                self.assertNotEqual(after[0].content, before[0].content)
+                caches[settings.TICKETEER_BOARD_CACHE].clear()
+                for params, response in zip(variants, after):
+                    self.assertEqual(self.client.get(self.list_url, params).content, response.content)
+
+    def test_detail_changes_with_its_task(self):
+        self.assert_revalidates(self.detail_url, lambda: self.client.patch(self.detail_url, {'doTime': 5}))
+
+    def test_etag_depends_on_the_representation(self):
+        etag = self.client.get(self.list_url)['ETag']
+        self.assertNotEqual(self.client.get(self.list_url, {'fields': 'id'})['ETag'], etag)
+        response = self.client.get(self.list_url, {'fields': 'id'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_etags_are_per_user(self):
+        etag = self.client.get(self.list_url)['ETag']
+        self.client.force_authenticate(self.create_user('bob'))
+        self.assertEqual(self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_unknown_task_is_not_validated(self):
+        response = self.client.get(reverse('task-detail', args=[0]), HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn('ETag', response)
+
+
+class TaskBulkTests(TicketeerAPITestCase):
+    """
+    Tests for the bulk create / update / delete endpoint.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('task-bulk')
+        self.tasks = [TicketeerTask.objects.create(author=self.user, title=f'Task {index}', subtitle='bulk',
+                                                   content='Changed in bulk') for index in range(3)]
+
+    def bulk(self, operations):
+        return self.client.post(self.url, operations, format='json')
+
+    def new_task(self, index=0):
+        return {'op': 'create', 'title': f'New {index}', 'subtitle': 'bulk', 'content': 'Created in bulk'}
+
+    def test_mixed_operations(self):
+        first, second, third = self.tasks
+        with mock.patch('ticketeer.views.tasks_changed') as tasks_changed:
+            response = self.bulk([
+                {'op': 'update', 'id': first.pk, 'status': 'done'},
+                self.new_task(),
+                {'op': 'delete', 'id': second.pk},
+                {'op': 'update', 'id': third.pk, 'title': 'Renamed', 'doTime': 30},
+            ])
+        self.assertEqual(response.status_code, 200)
+        created = TicketeerTask.objects.get(title='New 0')
+        self.assertEqual(response.data['results'], [
+            {'op': 'update', 'id': first.pk}, {'op': 'create', 'id': created.pk},
+            {'op': 'delete', 'id': second.pk}, {'op': 'update', 'id': third.pk},
+        ])
+        first.refresh_from_db()
+        third.refresh_from_db()
+        self.assertEqual((first.status, first.title, first.version), ('done', 'Task 0', 2))
+        self.assertEqual((third.status, third.title, third.doTime, third.version), ('todo', 'Renamed', 30, 2))
+        self.assertEqual(created.author, self.user)
+        self.assertFalse(TicketeerTask.objects.filter(pk=second.pk).exists())
+        self.assertTrue(TicketeerTaskTombstone.objects.filter(task_id=second.pk).exists())
+        self.assertEqual([call.args[1] for call in tasks_changed.call_args_list], ['created', 'updated', 'deleted'])
+
+    def test_updates_only_write_their_own_fields(self):
+        first, second = self.tasks[:2]
+        resolve_tasks = views.TaskBulkSerializer.resolve_tasks
+
+        def concurrent_change(serializer, *args):
+            # Someone else moves the first task after the bulk request read it.
+            resolve_tasks(serializer, *args)
+            TicketeerTask.objects.filter(pk=first.pk).update(status='done')
+
+        with mock.patch.object(views.TaskBulkSerializer, 'resolve_tasks', concurrent_change):
+            self.assertEqual(self.bulk([
+                {'op': 'update', 'id': first.pk, 'title': 'Renamed'},
+                {'op': 'update', 'id': second.pk, 'status': 'urgent'},
+            ]).status_code, 200)
+        first.refresh_from_db()
+        self.assertEqual((first.title, first.status), ('Renamed', 'done'))
+
+    def test_item_versions_are_checked(self):
+        first, second = self.tasks[:2]
+        response = self.bulk([
+            self.new_task(),
+            {'op': 'update', 'id': first.pk, 'version': 1, 'status': 'done'},
+            {'op': 'delete', 'id': second.pk, 'version': 2},
+        ])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data[:2], [{}, {}])
+        self.assertEqual(set(response.data[2]), {'version'})
+        self.assertEqual(TicketeerTask.objects.filter(author=self.user).count(), 3)
+        self.assertEqual(TicketeerTask.objects.get(pk=first.pk).status, 'todo')
+
+        response = self.bulk([{'op': 'delete', 'id': second.pk, 'version': 'latest'}])
+        self.assertEqual((response.status_code, set(response.data[0])), (400, {'version'}))
+
+        with mock.patch('ticketeer.views.tasks_changed') as tasks_changed:
+            response = self.bulk([{'op': 'update', 'id': first.pk, 'version': 1, 'status': 'done'},
+                                  {'op': 'delete', 'id': second.pk, 'version': 1}])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(TicketeerTask.objects.get(pk=first.pk).version, 2)
+        self.assertEqual(tasks_changed.call_args_list[0].kwargs['tasks'][0]['version'], 2)
+        self.assertFalse(TicketeerTask.objects.filter(pk=second.pk).exists())
+
+    @override_settings(TICKETEER_REQUIRE_PRECONDITION=True)
+    def test_precondition_required_per_item(self):
+        first, second = self.tasks[:2]
+        response = self.bulk([
+            self.new_task(),
+            {'op': 'update', 'id': first.pk, 'version': 1, 'status': 'done'},
+            {'op': 'delete', 'id': second.pk},
+        ])
+        self.assertEqual(response.status_code, 428)
+        self.assertEqual(response.data[:2], [{}, {}])
+        self.assertEqual(set(response.data[2]), {'version'})
+        self.assertEqual(TicketeerTask.objects.get(pk=first.pk).status, 'todo')
+
+    def test_concurrent_writes_roll_back_the_request(self):
+        first, second = self.tasks[:2]
+        resolve_tasks = views.TaskBulkSerializer.resolve_tasks
+
+        def concurrent_write(serializer, *args):
+            # Someone else saves the first task after the bulk request read it.
+            resolve_tasks(serializer, *args)
+            TicketeerTask.objects.filter(pk=first.pk).update(title='Theirs', version=F('version') + 1)
+
+        for operation in ({'op': 'update', 'id': first.pk, 'status': 'done'}, {'op': 'delete', 'id': first.pk}):
+            with self.subTest(operation['op']), \
+                    mock.patch.object(views.TaskBulkSerializer, 'resolve_tasks', concurrent_write), \
+                    mock.patch('ticketeer.views.tasks_changed') as tasks_changed:
+                response = self.bulk([self.new_task(), operation, {'op': 'delete', 'id': second.pk}])
+                self.assertEqual(response.status_code, 409)
+                self.assertEqual([set(errors) for errors in response.data], [set(), {'version'}, set()])
+                tasks_changed.assert_not_called()
+                self.assertEqual(TicketeerTask.objects.filter(author=self.user).count(), 3)
+                self.assertEqual(TicketeerTask.objects.get(pk=first.pk).status, 'todo')
+                self.assertFalse(TicketeerTaskTombstone.objects.exists())
+
+    def test_per_item_errors_apply_nothing(self):
+        foreign = TicketeerTask.objects.create(author=self.create_user('bob'), title='Foreign', subtitle='bulk',
+                                               content='Not alice\'s task')
+        response = self.bulk([
+            self.new_task(),
+            {'op': 'update', 'id': self.tasks[0].pk, 'status': 'later'},
+            {'op': 'move', 'id': self.tasks[1].pk},
+            {'op': 'delete'},
+            {'op': 'delete', 'id': foreign.pk},
+            {'op': 'update', 'id': self.tasks[2].pk, 'title': 'Once'},
+            {'op': 'delete', 'id': self.tasks[2].pk},
+            'not an object',
+        ])
+        self.assertEqual(response.status_code, 400)
+        errors = response.data
+        self.assertEqual(errors[0], {})
+        self.assertEqual(set(errors[1]), {'status'})
+        self.assertEqual(set(errors[2]), {'op'})
+        self.assertEqual(set(errors[3]), {'id'})
+        self.assertIn('not found', str(errors[4]['id'][0]))
+        self.assertEqual(errors[5], {})
+        self.assertIn('more than one operation', str(errors[6]['id'][0]))
+        self.assertIn('non_field_errors', errors[7])
+        self.assertEqual(TicketeerTask.objects.filter(author=self.user).count(), 3)
+        self.assertEqual(TicketeerTask.objects.get(pk=self.tasks[2].pk).title, 'Task 2')
+
+    def test_rejects_empty_and_oversized_requests(self):
+        self.assertEqual(self.bulk([]).status_code, 400)
+        self.assertEqual(self.bulk({'op': 'create'}).status_code, 400)
+        self.assertEqual(self.bulk([self.new_task(index) for index in range(20001)]).status_code, 400)
+
+    def count_queries(self, operations):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.bulk(operations)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_large_requests_use_batched_queries(self):
+        for size in (1000, 10000):
+            with self.subTest(size=size):
+                TicketeerTask.objects.all().delete()
+                creates = self.count_queries([self.new_task(index) for index in range(size)])
+                ids = list(TicketeerTask.objects.order_by('id').values_list('id', flat=True))
+                self.assertEqual(len(ids), size)
+                updates = self.count_queries([{'op': 'update', 'id': pk, 'doTime': 1} for pk in ids])
+                deletes = self.count_queries([{'op': 'delete', 'id': pk} for pk in ids])
+                self.assertFalse(TicketeerTask.objects.exists())
+                # Queries grow with the number of batches (limited by the
+                # backend's query parameters), not with every item.
+                for queries in (creates, updates, deletes):
+                    self.assertLess(queries, size / 20)
+
+
+class TaskBatchStatusTests(TicketeerAPITestCase):
+    """
+    Tests for moving several tasks to a new status at once.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('task-batch-status-update')
+        self.todo, self.done = [
+            TicketeerTask.objects.create(author=self.user, title=f'Task {status}', subtitle='batch',
+                                         content='Dragged with others', status=status)
+            for status in ('todo', 'done')]
+        self.foreign = TicketeerTask.objects.create(author=self.create_user('bob'), title='Foreign',
+                                                    subtitle='batch', content='Not alice\'s task')
+
+    def move(self, ids, status='done'):
+        return self.client.patch(self.url, {'ids': ids, 'status': status}, format='json')
+
+    def test_moves_only_own_tasks(self):
+        with mock.patch('ticketeer.views.tasks_changed') as tasks_changed, \
+                CaptureQueriesContext(connection) as queries:
+            response = self.move([self.todo.pk, self.done.pk, self.foreign.pk, 999999])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {
+            'status': 'done', 'changed': [self.todo.pk], 'unchanged': [self.done.pk],
+            'not_found': sorted([self.foreign.pk, 999999]),
+        })
+        self.assertEqual(len([query for query in queries if query['sql'].startswith('UPDATE')]), 1)
+        tasks_changed.assert_called_once_with(self.user.pk, 'moved', ids=[self.todo.pk], status='done')
+
+        self.todo.refresh_from_db()
+        self.done.refresh_from_db()
+        self.foreign.refresh_from_db()
+        self.assertEqual((self.todo.status, self.todo.version), ('done', 2))
+        self.assertEqual((self.done.status, self.done.version), ('done', 1))
+        self.assertEqual((self.foreign.status, self.foreign.version), ('todo', 1))
+
+    def test_changed_ids_do_not_depend_on_timestamps(self):
+        # Another writer touched the done task at the very same moment.
+        now = timezone.now()
+        TicketeerTask.objects.filter(pk=self.done.pk).update(updated_at=now)
+        with mock.patch('ticketeer.views.timezone.now', return_value=now):
+            response = self.move([self.todo.pk, self.done.pk])
+        self.assertEqual((response.data['changed'], response.data['unchanged']), ([self.todo.pk], [self.done.pk]))
+
+    def test_unlocked_concurrent_change_is_a_conflict(self):
+        # A task locked for the move changed anyway (no row locks on the backend).
+        with mock.patch.object(QuerySet, 'update', return_value=0), \
+                mock.patch('ticketeer.views.tasks_changed') as tasks_changed:
+            self.assertEqual(self.move([self.todo.pk, self.done.pk]).status_code, 409)
+        tasks_changed.assert_not_called()
+
+    def test_nothing_to_move(self):
+        with mock.patch('ticketeer.views.tasks_changed') as tasks_changed:
+            response = self.move([self.done.pk, self.foreign.pk])
+        self.assertEqual((response.data['changed'], response.data['unchanged']), ([], [self.done.pk]))
+        tasks_changed.assert_not_called()
+
+    def test_validation(self):
+        self.assertEqual(self.move([]).status_code, 400)
+        self.assertEqual(self.move([self.todo.pk], status='later').status_code, 400)
+        self.assertEqual(self.move(['x']).status_code, 400)
+        self.assertEqual(self.move(list(range(1, 1002))).status_code, 400)
+
+
+class TaskSummaryTests(TicketeerAPITestCase):
+    """
+    Tests for the aggregated task summary.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('task-summary')
+        for day, status, prio, minutes in ((1, 'todo', 'low', 10), (2, 'todo', 'urgent', 20),
+                                           (3, 'done', 'low', 30), (4, 'inProgress', 'low', 40)):
+            TicketeerTask.objects.create(author=self.user, title=f'Day {day}', subtitle='summary',
+                                         content='Counted in the summary', date=datetime.date(2024, 1, day),
+                                         status=status, prio=prio, doTime=minutes)
+        TicketeerTask.objects.create(author=self.create_user('bob'), title='Foreign', subtitle='summary',
+                                     content='Not counted for alice', doTime=1000)
+
+    def summary(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_totals_per_status_and_priority(self):
+        data = self.summary()
+        self.assertEqual(data['total'], {'count': 4, 'doTime': 100})
+        self.assertEqual(data['by_status'], {
+            'urgent': {'count': 0, 'doTime': 0}, 'todo': {'count': 2, 'doTime': 30},
+            'inProgress': {'count': 1, 'doTime': 40}, 'done': {'count': 1, 'doTime': 30},
+        })
+        self.assertEqual(data['by_prio'], {
+            'low': {'count': 3, 'doTime': 80}, 'medium': {'count': 0, 'doTime': 0},
+            'urgent': {'count': 1, 'doTime': 20},
+        })
+        self.assertEqual(data['groups'], [
+            {'status': 'done', 'prio': 'low', 'count': 1, 'doTime': 30},
+            {'status': 'inProgress', 'prio': 'low', 'count': 1, 'doTime': 40},
+            {'status': 'todo', 'prio': 'low', 'count': 1, 'doTime': 10},
+            {'status': 'todo', 'prio': 'urgent', 'count': 1, 'doTime': 20},
+        ])
+
+    def test_date_range_is_inclusive(self):
+        self.assertEqual(self.summary(date_from='2024-01-02', date_to='2024-01-03')['total'],
+                         {'count': 2, 'doTime': 50})
+        self.assertEqual(self.summary(date_from='2024-01-04')['total'], {'count': 1, 'doTime': 40})
+        self.assertEqual(self.summary(date_to='2023-12-31')['total'], {'count': 0, 'doTime': 0})
+
+    def test_invalid_date_range(self):
+        self.assertEqual(self.client.get(self.url, {'date_from': '2024-02-01', 'date_to': '2024-01-01'}).status_code,
+                         400)
+        self.assertEqual(self.client.get(self.url, {'date_from': 'yesterday'}).status_code, 400)
+
+    def test_one_grouped_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.summary()
+        self.assertEqual(len(queries), 1)
+        self.assertIn('GROUP BY', queries[0]['sql'])
+
+
+class TaskEventsTests(TicketeerAPITestCase):
+    """
+    Tests for the real-time task events over WebSockets.
+    """
+
+    timeout = 2
+
+    async def connect(self, token, send=None):
+        """
+        Open a connection to the consumer.
+        Returns:
+            tuple: Client message queue, server message queue and the connection task.
+        """
+        incoming, outgoing = asyncio.Queue(), asyncio.Queue()
+        await incoming.put({'type': 'websocket.connect'})
+        scope = {'type': 'websocket', 'path': '/ws/tasks/', 'query_string': f'token={token}'.encode()}
+        connection_task = asyncio.create_task(TaskEventsConsumer()(scope, incoming.get, send or outgoing.put))
+        self.addCleanup(connection_task.cancel)
+        return incoming, outgoing, connection_task
+
+    async def next_message(self, outgoing):
+        return await asyncio.wait_for(outgoing.get(), self.timeout)
+
+    async def test_rejects_unknown_tokens(self):
+        for token in ('', 'not-a-token'):
+            with self.subTest(token=token):
+                incoming, outgoing, connection_task = await self.connect(token)
+                self.assertEqual(await self.next_message(outgoing), {'type': 'websocket.close', 'code': 4401})
+                await asyncio.wait_for(connection_task, self.timeout)
+
+    async def test_fans_out_to_the_author_sessions_only(self):
+        alice = await Token.objects.acreate(user=self.user)
+        bob = await Token.objects.acreate(user=await sync_to_async(self.create_user)('bob'))
+        sessions = [await self.connect(alice.key), await self.connect(alice.key), await self.connect(bob.key)]
+        for incoming, outgoing, connection_task in sessions:
+            self.assertEqual(await self.next_message(outgoing), {'type': 'websocket.accept'})
+
+        tasks_changed(self.user.pk, 'moved', ids=[1, 2], status='done')
+        for incoming, outgoing, connection_task in sessions[:2]:
+            message = await self.next_message(outgoing)
+            self.assertEqual(json.loads(message['text']), {'event': 'moved', 'ids': [1, 2], 'status': 'done'})
+        await asyncio.sleep(0.05)
+        self.assertTrue(sessions[2][1].empty())
+
+        channel = task_channel(self.user.pk)
+        self.assertEqual(get_broker().subscriber_count(channel), 2)
+        for incoming, outgoing, connection_task in sessions:
+            await incoming.put({'type': 'websocket.disconnect', 'code': 1000})
+            await asyncio.wait_for(connection_task, self.timeout)
+        self.assertEqual(get_broker().subscriber_count(), 0)
+
+    async def test_slow_client_is_dropped(self):
+        token = await Token.objects.acreate(user=self.user)
+        outgoing, gate = asyncio.Queue(), asyncio.Event()
+
+        async def send(message):
+            # The client stops reading after the first event.
+            if message['type'] == 'websocket.send':
+                await gate.wait()
+            await outgoing.put(message)
+
+        with mock.patch.object(get_broker(), 'queue_size', 2):
+            incoming, _, connection_task = await self.connect(token.key, send)
+            self.assertEqual(await self.next_message(outgoing), {'type': 'websocket.accept'})
+        tasks_changed(self.user.pk, 'deleted', ids=[0])
+        await asyncio.sleep(0.05)  # the consumer now hangs sending it
+        for index in range(1, 5):
+            tasks_changed(self.user.pk, 'deleted', ids=[index])
+        await asyncio.sleep(0.05)
+        gate.set()
+        self.assertEqual(json.loads((await self.next_message(outgoing))['text'])['ids'], [0])
+        self.assertEqual(await self.next_message(outgoing), {'type': 'websocket.close', 'code': 4008})
+        await asyncio.wait_for(connection_task, self.timeout)
+        self.assertEqual(get_broker().subscriber_count(), 0)
+
+
+class InProcessBrokerTests(SimpleTestCase):
+    """
+    Tests for the in-process pub/sub broker.
+    """
+
+    def test_publish_reaches_the_channel_subscribers(self):
+        broker = InProcessBroker(queue_size=10)
+
+        async def main():
+            first, second, other = broker.subscribe('a'), broker.subscribe('a'), broker.subscribe('b')
+            self.assertEqual(broker.publish('a', 'hello'), 2)
+            # Publishing from another thread, like a sync view under ASGI.
+            await asyncio.to_thread(broker.publish, 'a', 'again')
+            self.assertEqual([await first.get(), await first.get()], ['hello', 'again'])
+            self.assertEqual(await second.get(), 'hello')
+            broker.unsubscribe(first)
+            self.assertEqual(await first.get(), None)
+            self.assertEqual(broker.publish('a', 'late'), 1)
+            self.assertTrue(other._queue.empty())
+
+        asyncio.run(main())
+
+    def test_full_queue_closes_the_subscription(self):
+        broker = InProcessBroker(queue_size=2)
+
+        async def main():
+            subscription = broker.subscribe('a')
+            for index in range(3):
+                broker.publish('a', str(index))
+            await asyncio.sleep(0)
+            self.assertTrue(subscription.closed)
+            self.assertIsNone(await subscription.get())
+
+        asyncio.run(main())
+
+
+class AsyncTaskViewTests(TicketeerAPITestCase):
+    """
+    Tests that the ASGI-native task views answer like the DRF views.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.token = Token.objects.create(user=self.user)
+        self.tasks = [TicketeerTask.objects.create(author=self.user, title=f'Task {index}', subtitle='async',
+                                                   content='Served twice', status=status, doTime=index)
+                      for index, status in enumerate(['todo', 'inProgress', 'done'])]
+        # Last-Modified has a resolution of one second; keep the writes below apart from it.
+        TicketeerTask.objects.update(updated_at=timezone.now() - datetime.timedelta(minutes=5))
+
+    def fetch(self, view, url, params=None, method='get', data=None, **headers):
+        """
+        Call an ASGI-native view the way the ASGI handler does.
+        Args:
+            view: AsyncTaskView subclass.
+            url: Path of the route; paginated responses link to it.
+            params: Query parameters.
+        """
+        kwargs = {'pk': self.tasks[0].pk} if view is async_views.AsyncTaskDetailView else {}
+        headers = {'Authorization': f'Token {self.token.key}', **headers}
+        factory = AsyncRequestFactory()
+        if method == 'get':
+            request = factory.get(url, params or {}, headers=headers)
+        else:
+            request = getattr(factory, method)(url, json.dumps(data), content_type='application/json', headers=headers)
+        return async_to_sync(view.as_view())(request, **kwargs)
+
+    def test_same_responses_as_the_drf_views(self):
+        list_url, detail_url = reverse('task-list-create'), reverse('task-detail', args=[self.tasks[0].pk])
+        cases = [
+            (async_views.AsyncTaskListCreateView, list_url, {}),
+            (async_views.AsyncTaskListCreateView, list_url, {'fields': 'id,title,status'}),
+            (async_views.AsyncTaskListCreateView, list_url, {'page_size': 2}),
+            (async_views.AsyncTaskDetailView, detail_url, {}),
+        ]
+        for view, url, params in cases:
+            with self.subTest(url, **params):
+                response = self.fetch(view, url, params)  # first, so it computes the data itself
+                expected = self.client.get(url, params)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(json.loads(response.content), expected.json())
+                for header in ('ETag', 'Last-Modified'):
+                    self.assertEqual(response[header], expected[header])
+
+    def test_unchanged_resources_answer_304(self):
+        views_and_urls = [(async_views.AsyncTaskListCreateView, reverse('task-list-create')),
+                          (async_views.AsyncTaskDetailView, reverse('task-detail', args=[self.tasks[0].pk]))]
+        for view, url in views_and_urls:
+            with self.subTest(url):
+                response = self.fetch(view, url)
+                etag, last_modified = response['ETag'], response['Last-Modified']
+                not_modified = self.fetch(view, url, If_None_Match=etag)
+                self.assertEqual((not_modified.status_code, not_modified.content), (304, b''))
+                self.assertEqual(not_modified['ETag'], etag)
+                self.assertEqual(self.fetch(view, url, If_Modified_Since=last_modified).status_code, 304)
+                # An ETag of the DRF views is just as valid.
+                self.assertEqual(self.fetch(view, url, If_None_Match=self.client.get(url)['ETag']).status_code, 304)
+
+        self.client.patch(reverse('task-detail', args=[self.tasks[0].pk]), {'title': 'Edited'})
+        for view, url in views_and_urls:
+            with self.subTest(url, changed=True):
+                self.assertEqual(self.fetch(view, url, If_None_Match=etag).status_code, 200)
+
+    def test_304_skips_the_serializer(self):
+        url = reverse('task-list-create')
+        etag = self.fetch(async_views.AsyncTaskListCreateView, url)['ETag']
+        with mock.patch.object(async_views.TaskSerializer, 'data') as data:
+            self.assertEqual(self.fetch(async_views.AsyncTaskListCreateView, url, If_None_Match=etag).status_code, 304)
+        data.assert_not_called()
+
+    def test_update_returns_the_etag_of_the_new_version(self):
+        url = reverse('task-detail', args=[self.tasks[0].pk])
+        response = self.fetch(async_views.AsyncTaskDetailView, url, method='patch', data={'title': 'Edited'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], self.client.get(url)['ETag'])
+
+    def test_unknown_task_is_not_validated(self):
+        response = async_to_sync(async_views.AsyncTaskDetailView.as_view())(AsyncRequestFactory().get(
+            '/', headers={'Authorization': f'Token {self.token.key}', 'If-None-Match': '*'}), pk=0)
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn('ETag', response)
+
+
+class CachedTokenAuthenticationTests(TicketeerAPITestCase):
+    """
+    Tests for the token -> user cache of CachedTokenAuthentication.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(None)
+        self.token = Token.objects.create(user=self.user)
+        self.task = TicketeerTask.objects.create(
+            author=self.user, title='Write tests', subtitle='tests', content='Cover the token cache')
+        self.url = reverse('task-detail', args=[self.task.pk])
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_cached_token_saves_one_query_per_request(self):
+        with mock.patch.object(views.TaskRetrieveUpdateDestroyAPIView, 'authentication_classes',
+                               [TokenAuthentication]):
+            uncached = self.count_queries()
+        self.count_queries()  # fills the cache
+        self.assertEqual(self.count_queries(), uncached - 1)
+
+    def test_deactivated_user_is_rejected(self):
+        self.count_queries()
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_deleted_token_is_rejected(self):
+        self.count_queries()
+        self.token.delete()
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_tokens_revoked_by_other_processes_expire_soon(self):
+        self.count_queries()
+        # Another worker deletes the token; its invalidation never reaches this process.
+        with mock.patch.object(token_cache, 'invalidate'):
+            self.token.delete()
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        later = time.time() + settings.TICKETEER_AUTH_CACHE_LOCAL_TIMEOUT + 1
+        with mock.patch('django.core.cache.backends.locmem.time.time', return_value=later):
+            self.assertEqual(self.client.get(self.url).status_code, 403)
+
+
+class TaskRowEncoderTests(TicketeerAPITestCase):
+    """
+    Tests that the fast list path renders exactly the bytes of the serializer path.
+    """
+
+    def setUp(self):
+        super().setUp()
+        TicketeerTask.objects.create(author=self.user, title='Grüße ✓', subtitle='"quoted"', status='done',
+                                     content='Line\nbreak, \\ and \u2028', prio='high', doTime=90,
+                                     date=datetime.date(2024, 2, 29))
+        TicketeerTask.objects.create(author=self.user, title='Plain', subtitle='', content='Nothing special')
+        TicketeerTaskArchive.objects.create(id=10**6, author=self.user, title='Archived', subtitle='old',
+                                            content='Moved out of the board', date=datetime.date(2023, 1, 1),
+                                            prio='low', status='done', doTime=0, updated_at=timezone.now(), version=3)
+
+    def serializer_bytes(self, *querysets, **params):
+        request = Request(RequestFactory().get('/', params))
+        tasks = [task for queryset in querysets for task in queryset]
+        return JSONRenderer().render(TaskSerializer(tasks, many=True, context={'request': request}).data)
+
+    def test_renders_like_the_serializer(self):
+        tasks = TicketeerTask.objects.filter(author=self.user).order_by('date', 'id')
+        archived = TicketeerTaskArchive.objects.filter(author=self.user)
+        cases = [
+            ('all fields', (tasks,), {}),
+            ('projection', (tasks,), {'fields': 'id,title,updated_at,unknown'}),
+            ('with archived tasks', (tasks, archived), {}),
+            ('empty board', (tasks.none(),), {}),
+            ('empty projection', (tasks.none(),), {'fields': 'id'}),
+        ]
+        for label, querysets, params in cases:
+            with self.subTest(label):
+                fields = TaskSerializer.parse_fields(params.get('fields'))
+                self.assertEqual(TaskRowEncoder(fields).render(*querysets), self.serializer_bytes(*querysets, **params))
+
+    def test_encodes_loaded_tasks_like_the_serializer(self):
+        tasks = list(TicketeerTask.objects.filter(author=self.user))
+        self.assertEqual(TaskRowEncoder().tasks_to_dicts(tasks), TaskSerializer(tasks, many=True).data)
+
+    def test_list_endpoint_takes_the_fast_path_for_plain_json_only(self):
+        url = reverse('task-list-create')
+        with mock.patch.object(views.TaskRowEncoder, 'render', side_effect=TaskRowEncoder.render, autospec=True) as render:
+            plain = self.client.get(url, {'fields': 'id,title'}, HTTP_ACCEPT='application/json')
+            self.assertEqual(render.call_count, 1)
+            indented = self.client.get(url, {'fields': 'id,title'}, HTTP_ACCEPT='application/json; indent=4')
+        self.assertEqual(json.loads(indented.content), json.loads(plain.content))
+        self.assertIn(b'\n    ', indented.content)
+        self.assertNotEqual(indented['ETag'], plain['ETag'])
+
+
+class TaskExportTests(TicketeerAPITestCase):
+    """
+    Tests for the streaming task export.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('task-export')
+
+    def add_tasks(self, count):
+        TicketeerTask.objects.bulk_create(
+            TicketeerTask(author=self.user, title=f'Task {index}', subtitle='export',
+                          content='Exported task content') for index in range(count))
+
+    def export(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content)
+
+    def test_exports_serializer_representation(self):
+        self.add_tasks(3)
+        expected = TaskSerializer(TicketeerTask.objects.order_by('id'), many=True).data
+        self.assertEqual(json.loads(self.export()), expected)
+        lines = self.export(output='ndjson').decode().splitlines()
+        self.assertEqual([json.loads(line) for line in lines], expected)
+
+    def test_rejects_unknown_output(self):
+        response = self.client.get(self.url, {'output': 'xml'})
+        self.assertEqual(response.status_code, 400)
+
+    def export_peak(self, output):
+        tracemalloc.start()
+        try:
+            size = sum(len(chunk) for chunk in self.client.get(self.url, {'output': output}).streaming_content)
+            return size, tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def test_memory_does_not_grow_with_board_size(self):
+        self.add_tasks(2000)
+        small = {output: self.export_peak(output) for output in ('json', 'ndjson')}
+        self.add_tasks(18000)
+        for output, (small_size, small_peak) in small.items():
+            with self.subTest(output=output):
+                size, peak = self.export_peak(output)
+                self.assertGreater(size, 9 * small_size)
+                self.assertLess(peak, 1.5 * small_peak)
+
+
+class TaskImportTests(TicketeerAPITestCase):
+    """
+    Tests for the CSV / NDJSON task import.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('task-import')
+
+    def upload(self, name, content, **data):
+        return self.client.post(self.url, {'file': SimpleUploadedFile(name, content.encode()), **data})
+
+    def test_csv_import_reports_invalid_rows(self):
+        response = self.upload('board.csv', (
+            'title,subtitle,content,prio,status,doTime\n'
+            'Write docs,docs,Describe the import,urgent,done,30\n'
+            'No,docs,Title is too short,low,todo,0\n'
+            'Review,"multi\nline",Subtitle spans two lines,low,todo,0\n'
+            'Deploy,ops,Ship the import endpoint,,,\n'
+            'Plan,ops,Status is not a choice,low,later,0\n'
+        ))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['created'], 3)
+        self.assertEqual(response.data['error_count'], 2)
+        self.assertEqual([error['line'] for error in response.data['errors']], [3, 7])
+        self.assertEqual(set(response.data['errors'][1]['errors']), {'status'})
+        deploy = TicketeerTask.objects.get(title='Deploy')
+        self.assertEqual((deploy.author, deploy.prio, deploy.status), (self.user, 'low', 'todo'))
+
+    def test_ndjson_import(self):
+        response = self.upload('board.ndjson', (
+            '{"title": "Write docs", "subtitle": "docs", "content": "Describe the import"}\n'
+            '\n'
+            '{"title": "Broken"\n'
+            '["not", "an", "object"]\n'
+        ))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual([error['line'] for error in response.data['errors']], [3, 4])
+
+    def test_unknown_format(self):
+        response = self.upload('board.txt', 'title\n')
+        self.assertEqual(response.status_code, 400)
+        response = self.upload('board.txt', 'title,subtitle,content\nImport,txt,Given explicitly\n', input='csv')
+        self.assertEqual(response.data['created'], 1)
+
+    def test_batches_and_error_cap(self):
+        rows = ''.join(f'Task {index},sub,Imported task content\n' for index in range(1200))
+        rows += 'x,sub,short\n' * 150
+        with mock.patch('ticketeer.views.tasks_changed') as tasks_changed, \
+                mock.patch.object(QuerySet, 'bulk_create', autospec=True, side_effect=QuerySet.bulk_create) as bulk:
+            response = self.upload('board.csv', 'title,subtitle,content\n' + rows)
+        self.assertEqual(response.data['created'], 1200)
+        self.assertEqual(response.data['error_count'], 150)
+        self.assertEqual(len(response.data['errors']), 100)
+        self.assertEqual([len(call.args[1]) for call in bulk.call_args_list], [500, 500, 200])
+        tasks_changed.assert_called_once_with(self.user.pk, 'imported', count=1200)
+
+
+class TaskSearchTests(TicketeerAPITestCase):
+    """
+    Tests for the task search and the FTS5 index triggers.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('task-search')
+        self.deploy = TicketeerTask.objects.create(
+            author=self.user, title='Deploy release', subtitle='ops', content='Roll out the new version')
+        self.docs = TicketeerTask.objects.create(
+            author=self.user, title='Write docs', subtitle='docs', content='Explain how to deploy the app')
+        other = self.create_user('bob')
+        TicketeerTask.objects.create(author=other, title='Deploy elsewhere', subtitle='ops', content='Not yours to see')
+
+    def search(self, q, **params):
+        response = self.client.get(self.url, {'q': q, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_ranked_and_scoped_to_user(self):
+        for backend in ('ticketeer.search.SQLiteFTSSearchBackend', 'ticketeer.search.IContainsSearchBackend'):
+            with self.subTest(backend=backend), self.settings(TICKETEER_SEARCH_BACKEND=backend):
+                get_search_backend.cache_clear()
+                caches['ticketeer-board'].clear()
+                data = self.search('deploy')
+                self.assertEqual([task['id'] for task in data['results']], [self.deploy.pk, self.docs.pk])
+        get_search_backend.cache_clear()
+
+    def test_index_follows_writes(self):
+        self.assertEqual(self.search('explain')['results'][0]['id'], self.docs.pk)
+        TicketeerTask.objects.filter(pk=self.docs.pk).update(content='Describe the release process')
+        board_cache.invalidate(self.user.pk)  # raw updates bypass the API's invalidation
+        self.assertEqual(self.search('explain')['results'], [])
+        self.assertEqual(self.search('described')['results'][0]['id'], self.docs.pk)
+        self.docs.delete()
+        self.assertEqual(self.search('describe')['results'], [])
+
+    def test_pagination_and_operator_input(self):
+        data = self.search('deploy', page_size=1)
+        self.assertEqual(data['results'][0]['id'], self.deploy.pk)
+        self.assertEqual(self.client.get(data['next']).data['results'][0]['id'], self.docs.pk)
+        self.assertEqual(self.search('deploy OR "NEAR(')['results'], [])
+
+    def test_triggers_are_restored_after_migrations(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER ticketeer_task_fts_insert')
+        TicketeerTask.objects.create(author=self.user, title='Missed task', subtitle='ops', content='Created without trigger')
+        SQLiteFTSSearchBackend.install(connection, create_table=False)
+        self.assertEqual(len(self.search('missed')['results']), 1)
+
+
+class TaskVersionTests(TicketeerAPITestCase):
+    """
+    Tests for the optimistic concurrency control of task writes.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.task = TicketeerTask.objects.create(
+            author=self.user, title='Drag me', subtitle='cards', content='Moved by two clients')
+        self.url = reverse('task-detail', args=[self.task.pk])
+
+    def test_if_match(self):
+        etag = self.client.get(self.url)['ETag']
+        self.assertTrue(etag.startswith('"1.'))
+        response = self.client.patch(self.url, {'title': 'Dragged'}, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['version'], 2)
+        self.assertEqual(response['ETag'], self.client.get(self.url)['ETag'])
+
+        response = self.client.patch(self.url, {'title': 'Stale'}, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 412)
+        self.assertEqual(self.client.delete(self.url, HTTP_IF_MATCH=etag).status_code, 412)
+        self.task.refresh_from_db()
+        self.assertEqual((self.task.title, self.task.version), ('Dragged', 2))
+        self.assertEqual(self.client.delete(self.url, HTTP_IF_MATCH='*').status_code, 204)
+
+    def test_version_field(self):
+        url = reverse('task-status-update', args=[self.task.pk])
+        self.assertEqual(self.client.patch(url, {'status': 'done', 'version': 1}).status_code, 200)
+        response = self.client.patch(url, {'status': 'urgent', 'version': 1})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(self.client.patch(url, {'status': 'urgent', 'version': 'x'}).status_code, 400)
+        self.task.refresh_from_db()
+        self.assertEqual((self.task.status, self.task.version), ('done', 2))
+
+    def test_concurrent_write_is_not_lost(self):
+        stale = TicketeerTask.objects.get(pk=self.task.pk)
+        TicketeerTask.objects.get(pk=self.task.pk).save_changes(['status'])
+        with mock.patch.object(views.TaskStatusUpdateAPIView, 'get_object', return_value=stale):
+            response = self.client.patch(reverse('task-status-update', args=[self.task.pk]), {'status': 'done'})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(TicketeerTask.objects.get(pk=self.task.pk).status, 'todo')
+
+    @override_settings(TICKETEER_REQUIRE_PRECONDITION=True)
+    def test_precondition_required(self):
+        self.assertEqual(self.client.patch(self.url, {'title': 'Blind write'}).status_code, 428)
+
+    async def test_async_view_conflict(self):
+        token = await Token.objects.acreate(user=self.user)
+        view = async_views.AsyncTaskStatusView.as_view()
+
+        def patch(body):
+            return view(AsyncRequestFactory().patch(
+                '/', body, content_type='application/json', headers={'Authorization': f'Token {token.key}'}),
+                pk=self.task.pk)
+
+        self.assertEqual((await patch({'status': 'done', 'version': 1})).status_code, 200)
+        self.assertEqual((await patch({'status': 'urgent', 'version': 1})).status_code, 409)
+
+
+class TaskSyncTests(TicketeerAPITestCase):
+    """
+    Tests for the delta sync with tokens and tombstones.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.tasks = [TicketeerTask.objects.create(author=self.user, title=f'Task {index}', subtitle='sync',
+                                                   content='Synced to the phone') for index in range(3)]
+        self.url = reverse('task-sync')
+
+    def sync(self, token=None):
+        response = self.client.get(self.url, {'token': token} if token else {})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_returns_changes_since_token(self):
+        first = self.sync()
+        self.assertTrue(first['reset'])
+        self.assertEqual(len(first['tasks']), 3)
+        # Pretend the first sync ran long ago, outside of the overlap window.
+        TicketeerTask.objects.update(updated_at=timezone.now() - datetime.timedelta(minutes=5))
+
+        self.client.patch(reverse('task-detail', args=[self.tasks[0].pk]), {'title': 'Edited offline'})
+        self.client.delete(reverse('task-detail', args=[self.tasks[1].pk]))
+        created = self.client.post(reverse('task-list-create'), {
+            'title': 'New', 'subtitle': 'sync', 'content': 'Created after the sync'}).data
+
+        second = self.sync(first['token'])
+        self.assertFalse(second['reset'])
+        self.assertEqual([task['id'] for task in second['tasks']], [self.tasks[0].pk, created['id']])
+        self.assertEqual(second['tasks'][0], TaskSerializer(TicketeerTask.objects.get(pk=self.tasks[0].pk)).data)
+        self.assertEqual(second['deleted'], [self.tasks[1].pk])
+
+    def test_tombstones_only_deleted_tasks(self):
+        foreign = TicketeerTask.objects.create(author=self.create_user('bob'), title='Not yours', subtitle='sync',
+                                               content='Belongs to somebody else')
+        ids = [self.tasks[0].pk, self.tasks[1].pk, foreign.pk, 0]
+        # A conditional delete removes the task still at the expected version only.
+        self.tasks[1].title = 'Changed meanwhile'
+        self.tasks[1].version += 1
+        self.tasks[1].save()
+        self.assertEqual(TicketeerTask.delete_tasks(self.user.pk, ids, version=1), 1)
+        self.assertEqual(list(TicketeerTaskTombstone.objects.values_list('task_id', flat=True)), [self.tasks[0].pk])
+        # Deleting the same task again leaves no second tombstone.
+        self.assertEqual(TicketeerTask.delete_tasks(self.user.pk, ids), 1)
+        self.assertEqual(sorted(TicketeerTaskTombstone.objects.values_list('task_id', flat=True)),
+                         [self.tasks[0].pk, self.tasks[1].pk])
+
+    def test_rejects_foreign_and_forged_tokens(self):
+        token = self.sync()['token']
+        self.assertEqual(self.client.get(self.url, {'token': token + 'x'}).status_code, 400)
+        self.client.force_authenticate(self.create_user('bob'))
+        self.assertEqual(self.client.get(self.url, {'token': token}).status_code, 400)
+
+    @override_settings(TICKETEER_SYNC_TOMBSTONE_DAYS=1)
+    def test_expired_token_resets(self):
+        old = TaskSyncQuerySerializer.make_token(self.user.pk, timezone.now() - datetime.timedelta(days=2))
+        data = self.sync(old)
+        self.assertTrue(data['reset'])
+        self.assertEqual(len(data['tasks']), 3)
+
+
+class JobTests(TicketeerAPITestCase):
+    """
+    Tests for the background job queue and the run_jobs worker.
+    """
+
+    def setUp(self):
+        super().setUp()
+        files_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, files_dir)
+        self.enterContext(override_settings(TICKETEER_JOB_FILES_DIR=files_dir))
+        statuses = ['todo', 'done']
+        TicketeerTask.objects.bulk_create(
+            TicketeerTask(author=self.user, title=f'Task {index}', subtitle='jobs', content='Handled by a job',
+                          status=statuses[index % 2], date=datetime.date(2024, 1, 1 + index))
+            for index in range(6))
+
+    def run_jobs(self):
+        call_command('run_jobs', once=True, processes=0, stdout=io.StringIO())
+
+    def poll(self, response):
+        self.assertEqual(response.status_code, 202)
+        self.run_jobs()
+        return self.client.get(response['Location']).data
+
+    def test_export_job(self):
+        job = self.poll(self.client.post(reverse('job-export'), {'output': 'ndjson', 'fields': 'id,title'}))
+        self.assertEqual(job['status'], 'done')
+        self.assertEqual((job['progress'], job['total'], job['result']['exported']), (6, 6, 6))
+        response = self.client.get(job['download'])
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual([json.loads(line)['title'] for line in lines], [f'Task {index}' for index in range(6)])
+        self.assertEqual(set(json.loads(lines[0])), {'id', 'title'})
+
+    def test_import_job_announces_the_new_tasks(self):
+        self.assertEqual(len(self.client.get(reverse('task-list-create')).json()), 6)
+        upload = SimpleUploadedFile('tasks.csv', b'title,subtitle,content\nImported,jobs,Imported by a job\nx,,\n')
+        job = self.poll(self.client.post(reverse('job-import'), {'file': upload}, format='multipart'))
+        self.assertEqual(job['status'], 'done')
+        self.assertEqual((job['result']['created'], job['result']['error_count'], job['progress']), (1, 1, 2))
+        self.assertTrue(TicketeerJob.objects.get(pk=job['id']).announced)
+        self.assertEqual(len(self.client.get(reverse('task-list-create')).json()), 7)
+
+    def test_retried_import_job_continues_after_the_last_batch(self):
+        rows = b''.join(b'Row %d,jobs,Imported by a job\n' % index for index in range(5))
+        upload = SimpleUploadedFile('tasks.csv', b'title,subtitle,content\nx,,\n' + rows)
+        response = self.client.post(reverse('job-import'), {'file': upload}, format='multipart')
+        # A previous attempt committed the invalid row and two tasks before its worker died.
+        TicketeerTask.objects.bulk_create(
+            TicketeerTask(author=self.user, title=f'Row {index}', subtitle='jobs', content='Imported by a job')
+            for index in range(2))
+        errors = [{'line': 2, 'errors': {'title': ['Ensure this field has at least 3 characters.']}}]
+        TicketeerJob.objects.update(result={'rows': 3, 'created': 2, 'error_count': 1, 'errors': errors})
+
+        job = self.poll(response)
+        self.assertEqual(job['status'], 'done')
+        self.assertEqual(job['result'], {'created': 5, 'error_count': 1, 'errors': errors})
+        self.assertEqual(job['progress'], 6)
+        titles = TicketeerTask.objects.filter(content='Imported by a job').values_list('title', flat=True)
+        self.assertEqual(sorted(titles), [f'Row {index}' for index in range(5)])
+
+    def test_cleanup_job_deletes_old_done_tasks(self):
+        job = self.poll(self.client.post(reverse('job-cleanup'), {'before': '2024-01-05'}))
+        self.assertEqual(job['result'], {'deleted': 2})
+        self.assertEqual(TicketeerTask.objects.filter(status='done').count(), 1)
+        self.assertEqual(TicketeerTaskTombstone.objects.filter(author=self.user).count(), 2)
+
+    def test_failed_job_reports_the_error(self):
+        upload = SimpleUploadedFile('tasks.csv', b'title,subtitle,content\n\xff\xfe,jobs,broken\n')
+        job = self.poll(self.client.post(reverse('job-import'), {'file': upload}, format='multipart'))
+        self.assertEqual(job['status'], 'failed')
+        self.assertIn('not UTF-8', job['error'])
+        self.assertIsNone(job['download'])
+
+    def test_jobs_are_private(self):
+        response = self.client.post(reverse('job-export'), {})
+        self.client.force_authenticate(self.create_user('bob'))
+        self.assertEqual(self.client.get(response['Location']).status_code, 404)
+        self.assertEqual(self.client.get(reverse('job-list')).data, [])
+
+    @override_settings(TICKETEER_JOB_MAX_ATTEMPTS=2)
+    def test_claims_are_exclusive_and_stale_jobs_are_retried(self):
+        job = TicketeerJob.objects.create(author=self.user, kind='export')
+        self.assertEqual(TicketeerJob.claim('worker-1', 5), [job.pk])
+        self.assertEqual(TicketeerJob.claim('worker-2', 5), [])
+
+        TicketeerJob.objects.update(heartbeat_at=timezone.now() - datetime.timedelta(hours=1))
+        self.assertEqual(TicketeerJob.requeue_stale(), 1)
+        self.assertEqual(TicketeerJob.claim('worker-2', 5), [job.pk])
+        TicketeerJob.objects.update(heartbeat_at=timezone.now() - datetime.timedelta(hours=1))
+        TicketeerJob.requeue_stale()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('failed', 2))
+
+
+class ImportJobProgressTests(APITransactionTestCase):
+    """
+    Tests that import jobs commit their progress while they run.
+    """
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        files_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, files_dir)
+        self.enterContext(override_settings(TICKETEER_JOB_FILES_DIR=files_dir))
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'secret-password')
+        self.client.force_authenticate(self.user)
+
+    def poll_from_another_connection(self, url):
+        polled = []
+
+        def poll():
+            try:
+                polled.append(self.client.get(url).data)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=poll)
+        thread.start()
+        thread.join()
+        return polled[0]
+
+    @mock.patch.object(TaskImportSerializer, 'batch_size', 2)
+    def test_progress_is_visible_during_the_import(self):
+        rows = b''.join(b'Row %d,jobs,Imported by a job\n' % index for index in range(5))
+        upload = SimpleUploadedFile('tasks.csv', b'title,subtitle,content\n' + rows)
+        url = self.client.post(reverse('job-import'), {'file': upload}, format='multipart')['Location']
+        write_batch, polled = TaskImportSerializer.write_batch, []
+
+        def write_and_poll(serializer, *args):
+            write_batch(serializer, *args)
+            polled.append(self.poll_from_another_connection(url))
+
+        with mock.patch.object(TaskImportSerializer, 'write_batch', write_and_poll):
+            call_command('run_jobs', once=True, processes=0, stdout=io.StringIO())
+
+        self.assertEqual([(job['status'], job['progress'], job['result']['created']) for job in polled],
+                         [('running', 2, 2), ('running', 4, 4), ('running', 5, 5)])
+        self.assertEqual(self.client.get(url).data['status'], 'done')
+
+
+class TaskArchiveTests(TicketeerAPITestCase):
+    """
+    Tests for moving old done tasks into the archive and reading them back.
+    """
+
+    def setUp(self):
+        super().setUp()
+        # Tasks 0, 2 and 4 are done, 4 recently; 1 and 3 are open.
+        self.tasks = TicketeerTask.objects.bulk_create(
+            TicketeerTask(author=self.user, title=f'Task {index}', subtitle='archive', content='Finished long ago',
+                          status='done' if index % 2 == 0 else 'todo', date=datetime.date(2024, 1, 10 - index))
+            for index in range(5))
+        TicketeerTask.objects.exclude(pk=self.tasks[4].pk).update(
+            updated_at=timezone.now() - datetime.timedelta(days=100))
+
+    def archive(self, **options):
+        output = io.StringIO()
+        call_command('archive_tasks', stdout=output, **options)
+        return output.getvalue()
+
+    def ids(self, data):
+        return [task['id'] for task in data]
+
+    def test_moves_old_done_tasks_and_resumes(self):
+        output = self.archive(days=30, batch_size=1)
+        self.assertIn('Archived 2 tasks', output)
+        self.assertIn('rows/s', output)
+        self.assertEqual(sorted(TicketeerTaskArchive.objects.values_list('id', flat=True)),
+                         [self.tasks[0].pk, self.tasks[2].pk])
+        self.assertEqual(TicketeerTask.objects.count(), 3)
+        archived = TicketeerTaskArchive.objects.get(pk=self.tasks[0].pk)
+        self.assertEqual((archived.title, archived.author_id, archived.version), ('Task 0', self.user.pk, 1))
+        self.assertIn('Archived 0 tasks', self.archive(days=30))
+
+    def test_lists_archived_tasks_on_request_only(self):
+        self.client.get(reverse('task-list-create'))  # cached before the archiving
+        self.archive(days=30)
+        live = [self.tasks[1].pk, self.tasks[3].pk, self.tasks[4].pk]
+        self.assertEqual(sorted(self.ids(self.client.get(reverse('task-list-create')).json())), live)
+
+        data = self.client.get(reverse('task-list-create'), {'include_archived': '1', 'fields': 'id,status'}).json()
+        # Live tasks first, then the archived ones.
+        self.assertEqual(sorted(self.ids(data)[:3]), live)
+        self.assertEqual(sorted(self.ids(data)[3:]), [self.tasks[0].pk, self.tasks[2].pk])
+        self.assertEqual(set(data[-1]), {'id', 'status'})
+
+        url, pages = reverse('task-list-create') + '?include_archived=true&page_size=2', []
+        while url:
+            page = self.client.get(url).data
+            pages.append(self.ids(page['results']))
+            url = page['next']
+        self.assertEqual(pages, [[task.pk for task in reversed(self.tasks)][index:index + 2] for index in (0, 2, 4)])
+
+    def test_sync_drops_archived_tasks(self):
+        token = self.client.get(reverse('task-sync')).data['token']
+        self.archive(days=30)
+        archived = [self.tasks[0].pk, self.tasks[2].pk]
+
+        data = self.client.get(reverse('task-sync'), {'token': token}).data
+        self.assertFalse(data['reset'])
+        self.assertEqual(sorted(data['deleted']), archived)
+        self.assertFalse(set(self.ids(data['tasks'])) & set(archived))
+        full = self.client.get(reverse('task-sync')).data
+        self.assertEqual(sorted(self.ids(full['tasks'])), [self.tasks[1].pk, self.tasks[3].pk, self.tasks[4].pk])
+
+    async def test_async_list_includes_archived_tasks(self):
+        await sync_to_async(self.archive)(days=30)
+        token = await Token.objects.acreate(user=self.user)
+        view = async_views.AsyncTaskListCreateView.as_view()
+        response = await view(AsyncRequestFactory().get(
+            '/', {'include_archived': 'yes', 'page_size': 10}, headers={'Authorization': f'Token {token.key}'}))
+        self.assertEqual(self.ids(json.loads(response.content)['results']), [task.pk for task in reversed(self.tasks)])
+
+    def test_does_not_move_tasks_changed_meanwhile(self):
+        cutoff = timezone.now() - datetime.timedelta(days=30)
+        self.client.patch(reverse('task-status-update', args=[self.tasks[0].pk]), {'status': 'done'})
+        moved = TicketeerTaskArchive.archive([self.tasks[0].pk, self.tasks[2].pk], cutoff)
+        self.assertEqual(moved, {self.user.pk: [self.tasks[2].pk]})
+        self.assertTrue(TicketeerTask.objects.filter(pk=self.tasks[0].pk).exists())
+
+    def test_archive_mirrors_task_columns(self):
+        task_columns = {field.attname for field in TicketeerTask._meta.concrete_fields}
+        archive_columns = {field.attname for field in TicketeerTaskArchive._meta.concrete_fields}
+        self.assertEqual(archive_columns - task_columns, {'archived_at'})
+        self.assertLessEqual(task_columns, archive_columns)
+
+
+@override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {
+    'login': '3/min', 'login_username': '2/min', 'register': '1/hour'}})
+class AuthThrottleTests(TicketeerAPITestCase):
+    """
+    Tests for the token bucket throttles of login and registration.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(None)
+
+    def login(self, username, ip='10.0.0.1'):
+        return self.client.post(reverse('login'), {'username': username, 'password': 'guess'}, REMOTE_ADDR=ip)
+
+    def test_login_buckets_reject_before_hashing(self):
+        with mock.patch('rest_framework.authtoken.serializers.authenticate', return_value=None) as authenticate:
+            self.assertEqual([self.login('alice').status_code for _ in range(3)], [400, 400, 429])
+            # Other addresses cannot continue guessing this username...
+            self.assertEqual(self.login('alice', ip='10.0.0.2').status_code, 429)
+            # ...and the first address is out of tokens for any username.
+            response = self.login('bob')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(authenticate.call_count, 2)
+
+    def test_forwarded_for_only_counts_behind_configured_proxies(self):
+        def attempts():
+            return [self.client.post(reverse('login'), {'username': f'user{index}', 'password': 'guess'},
+                                     REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR=f'192.0.2.{index}').status_code
+                    for index in range(4)]
+
+        # A client rotating the header keeps its bucket...
+        self.assertEqual(attempts(), [400, 400, 400, 429])
+        caches[settings.TICKETEER_THROTTLE_CACHE].clear()
+        # ...unless a proxy in front of the app sets it.
+        with self.settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'NUM_PROXIES': 1}):
+            self.assertEqual(attempts(), [400, 400, 400, 400])
+
+    def test_bucket_refills(self):
+        clock = mock.Mock(return_value=1000.0)
+        with mock.patch.object(TokenBucketThrottle, 'timer', clock):
+            self.assertEqual([self.login('alice').status_code for _ in range(3)], [400, 400, 429])
+            clock.return_value += 30  # one token per 30 seconds
+            self.assertEqual([self.login('alice').status_code for _ in range(2)], [400, 429])
+
+    def test_concurrent_requests_never_share_a_token(self):
+        get = LocMemCache.get
+
+        def slow_get(cache, *args, **kwargs):
+            # Widen the window between reading and writing a bucket.
+            value = get(cache, *args, **kwargs)
+            time.sleep(0.005)
+            return value
+
+        barrier, allowed = threading.Barrier(8), []
+
+        def attempt():
+            request = Request(RequestFactory().post('/', REMOTE_ADDR='10.0.0.9'))
+            barrier.wait()
+            allowed.append(LoginRateThrottle().allow_request(request, None))
+
+        with mock.patch.object(LocMemCache, 'get', slow_get):
+            threads = [threading.Thread(target=attempt) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(allowed.count(True), 3)
+
+    def test_register_bucket(self):
+        data = {'password': 'secret-password', 'email': 'bob@example.com', 'first_name': 'Bob', 'last_name': 'B'}
+        self.assertEqual(self.client.post(reverse('register'), {'username': 'bob', **data}).status_code, 201)
+        self.assertEqual(self.client.post(reverse('register'), {'username': 'carol', **data}).status_code, 429)
+
+
+class SingleFlightTests(SimpleTestCase):
+    """
+    Concurrent identical computations run once and share their result.
+    """
+
+    def run_threads(self, flight, compute, count=5):
+        barrier = threading.Barrier(count)
+        results = []
+
+        def call():
+            barrier.wait()
+            try:
+                results.append(flight.do('key', compute))
+            except ValueError:
+                results.append('failed')
+
+        threads = [threading.Thread(target=call) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def slow_compute(self, calls, fail=False):
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            if fail and len(calls) == 1:
+                raise ValueError
+            return len(calls)
+        return compute
+
+    def test_threads_share_one_computation(self):
+        calls = []
+        results = self.run_threads(SingleFlight(window=1.0), self.slow_compute(calls))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [1] * 5)
+
+    def test_zero_window_disables_coalescing(self):
+        calls = []
+        self.run_threads(SingleFlight(window=0), self.slow_compute(calls))
+        self.assertEqual(len(calls), 5)
+
+    def test_waiters_compute_themselves_when_the_leader_fails(self):
+        calls = []
+        results = self.run_threads(SingleFlight(window=1.0), self.slow_compute(calls, fail=True))
+        self.assertEqual(results.count('failed'), 1)
+        self.assertEqual(len(calls), 5)
+
+    def test_finished_flights_are_not_reused(self):
+        flight = SingleFlight(window=1.0)
+        self.assertEqual(flight.do('key', lambda: 1), 1)
+        self.assertEqual(flight.do('key', lambda: 2), 2)
+        self.assertEqual(flight.flights, {})
+
+    def test_coroutines_share_one_computation(self):
+        flight = AsyncSingleFlight(window=1.0)
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return len(calls)
+
+        async def main():
+            return await asyncio.gather(*(flight.do('key', compute) for _ in range(5)))
+
+        self.assertEqual(asyncio.run(main()), [1] * 5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(flight.flights, {})
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'])
+class ReplicaRouterTests(SimpleTestCase):
+    """
+    Tests for the read replica router and the per-user stickiness after writes.
+    """
+
+    def setUp(self):
+        caches['ticketeer-auth'].clear()
+        self.addCleanup(replica_state.reset, replica_state.set(None))
+        self.router = ReplicaRouter()
+        self.alice = User(pk=1, username='alice')
+        self.bob = User(pk=2, username='bob')
+
+    def request(self, user, write=False):
+        """
+        Run a request through the middleware and return where a task read went.
+        """
+        routes = []
+
+        def view(request):
+            request.user = user  # set by the view's authentication
+            if write:
+                self.router.db_for_write(TicketeerTask)
+            routes.append(self.router.db_for_read(TicketeerTask))
+            return HttpResponse()
+
+        ReplicaStickinessMiddleware(view)(RequestFactory().get('/tasks/'))
+        return routes[0]
+
+    def test_routes_task_reads_to_replicas(self):
+        self.assertEqual(self.router.db_for_read(TicketeerTask), 'replica1')
+        self.assertIsNone(self.router.db_for_read(User))
+        self.assertFalse(self.router.allow_migrate('replica1', 'ticketeer'))
+
+    def test_user_sticks_to_primary_after_write(self):
+        self.assertEqual(self.request(self.alice), 'replica1')
+        self.assertEqual(self.request(self.alice, write=True), 'default')
+        self.assertEqual(self.request(self.alice), 'default')
+        self.assertEqual(self.request(self.bob), 'replica1')
+        caches['ticketeer-auth'].clear()  # the sticky window expired
+        self.assertEqual(self.request(self.alice), 'replica1')
+
+    def test_transactions_read_from_primary(self):
+        with mock.patch.object(connection, 'in_atomic_block', True):
+            self.assertEqual(self.router.db_for_read(TicketeerTask), 'default')
+
+
+class MetricsMiddlewareTests(TicketeerAPITestCase):
+    """
+    Tests for the request metrics and the budget warnings.
+    """
+
+    def setUp(self):
+        super().setUp()
+        registry.clear()
+        TicketeerTask.objects.create(author=self.user, title='Measure me', subtitle='metrics', content='Count the queries')
+
+    def test_exposes_per_route_metrics(self):
+        self.client.get(reverse('task-list-create'), {'page_size': 10})
+        body = self.client.get(reverse('metrics')).content.decode()
+        labels = 'route="task-list-create",method="GET"'
+        self.assertIn(f'ticketeer_request_duration_seconds_count{{{labels}}} 1', body)
+        # ETag validators and the page itself
+        self.assertIn(f'ticketeer_request_db_queries_sum{{{labels}}} 2', body)
+        self.assertIn(f'ticketeer_requests_total{{{labels},status="200"}} 1', body)
+        self.assertIn(f'ticketeer_response_size_bytes_count{{{labels}}} 1', body)
+        serializer_sum = next(line for line in body.splitlines()
+                              if line.startswith(f'ticketeer_request_serializer_duration_seconds_sum{{{labels}}}'))
+        self.assertGreater(float(serializer_sum.split()[-1]), 0)
+
+    async def test_counts_queries_of_sync_views_under_asgi(self):
+        token = await Token.objects.acreate(user=self.user)
+        task = await TicketeerTask.objects.aget()
+        await self.async_client.get(reverse('task-detail', args=[task.pk]),
+                                    headers={'Authorization': f'Token {token.key}'})
+        body = registry.render()
+        queries = next(line for line in body.splitlines()
+                       if line.startswith('ticketeer_request_db_queries_sum{route="task-detail",method="GET"}'))
+        self.assertGreater(float(queries.split()[-1]), 0)
+
+    @override_settings(TICKETEER_QUERY_BUDGET=1)
+    def test_warns_over_query_budget(self):
+        with self.assertLogs('ticketeer.metrics', 'WARNING') as logs:
+            self.client.get(reverse('task-detail', args=[TicketeerTask.objects.get().pk]))
+        self.assertIn('task-detail', logs.output[0])
+        body = self.client.get(reverse('metrics')).content.decode()
+        self.assertIn('ticketeer_budget_exceeded_total{route="task-detail",method="GET"} 1', body)
+
+    @override_settings(TICKETEER_METRICS_TOKEN='scrape-secret')
+    def test_metrics_token(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer scrape-secret')
+        self.assertEqual(response.status_code, 200)
+
+    def test_without_token_serves_local_scrapers_only(self):
+        self.assertEqual(self.client.get(reverse('metrics'), REMOTE_ADDR='::1').status_code, 200)
+        self.assertEqual(self.client.get(reverse('metrics'), REMOTE_ADDR='203.0.113.7').status_code, 403)
+        # Through a reverse proxy on the same host the remote address is local, the client is not.
+        response = self.client.get(reverse('metrics'), HTTP_X_FORWARDED_FOR='203.0.113.7')
+        self.assertEqual(response.status_code, 403)
+        with override_settings(TICKETEER_METRICS_NETWORKS=['10.0.0.0/8']):
+            self.assertEqual(self.client.get(reverse('metrics'), REMOTE_ADDR='10.1.2.3').status_code, 200)
+            self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+
+
+class EndpointBudgetTests(TicketeerAPITestCase):
+    """
+    Query count and latency budgets of every endpoint.
+    Each endpoint is called on a small and on a large board. Its number of
+    queries must not grow with the board (N+1 queries) and must not exceed
+    the count recorded in perf_baselines.json. Latencies depend on the
+    machine, so they are only checked on request: with
+    TICKETEER_CHECK_LATENCY=1 the fastest call on the large board must stay
+    within `latency_tolerance` times the recorded latency plus
+    `latency_slack` seconds. After intended changes, record new baselines
+    (on the machine the latencies are checked on) with
+        TICKETEER_RECORD_BASELINES=1 python manage.py test ticketeer.tests.EndpointBudgetTests
+    """
+
+    baselines_path = pathlib.Path(__file__).with_name('perf_baselines.json')
+    board_sizes = (5, 50)
+    rounds = 3
+    latency_tolerance = 3.0
+    latency_slack = 0.01
+
+    def setUp(self):
+        super().setUp()
+        self.board = []
+        self.counter = itertools.count()
+        self.statuses = itertools.cycle(['done', 'todo'])
+
+    def fill_board(self, size):
+        statuses = [choice for choice, label in TicketeerTask.STATUS_CHOICES]
+        tasks = TicketeerTask.objects.bulk_create(
+            TicketeerTask(author=self.user, title=f'Task {index}', subtitle='budget',
+                          content='Seeded for the query budget', status=statuses[index % len(statuses)])
+            for index in range(len(self.board), size))
+        self.board += [task.pk for task in tasks]
+
+    def new_task(self):
+        return {'title': f'New task {next(self.counter)}', 'subtitle': 'budget', 'content': 'Created by the budget test'}
+
+    def import_file(self):
+        rows = ''.join(f'Imported {index},budget,Imported by the budget test\n' for index in range(len(self.board)))
+        return SimpleUploadedFile('board.csv', ('title,subtitle,content\n' + rows).encode())
+
+    def endpoints(self):
+        """
+        Calls of every endpoint; write calls scale with the board where the endpoint takes many tasks.
+        Each value returns the client method, the URL and the keyword arguments of one call.
+        """
+        detail = lambda: reverse('task-detail', args=[self.board[0]])
+        return {
+            'login POST': lambda: ('post', reverse('login'), {
+                'data': {'username': 'alice', 'password': 'secret-password'}}),
+            'register POST': lambda: ('post', reverse('register'), {
+                'data': {'username': f'user{next(self.counter)}', 'password': 'secret-password',
+                         'email': 'user@example.com', 'first_name': 'Budget', 'last_name': 'Test'}}),
+            'metrics GET': lambda: ('get', reverse('metrics'), {}),
+            'task-list-create GET': lambda: ('get', reverse('task-list-create'), {}),
+            'task-list-create GET page': lambda: ('get', reverse('task-list-create'), {'data': {'page_size': 20}}),
+            'task-list-create GET archived': lambda: ('get', reverse('task-list-create'), {
+                'data': {'include_archived': 1}}),
+            'task-list-create GET archived page': lambda: ('get', reverse('task-list-create'), {
+                'data': {'include_archived': 1, 'page_size': 20}}),
+            'task-list-create POST': lambda: ('post', reverse('task-list-create'), {'data': self.new_task()}),
+            'task-board GET': lambda: ('get', reverse('task-board'), {}),
+            'task-summary GET': lambda: ('get', reverse('task-summary'), {}),
+            'task-search GET': lambda: ('get', reverse('task-search'), {'data': {'q': 'seeded budget'}}),
+            'task-sync GET': lambda: ('get', reverse('task-sync'), {}),
+            'task-sync GET delta': lambda: ('get', reverse('task-sync'), {'data': {
+                'token': TaskSyncQuerySerializer.make_token(self.user.pk, timezone.now() - datetime.timedelta(minutes=1))}}),
+            'task-export GET': lambda: ('get', reverse('task-export'), {}),
+            'task-import POST': lambda: ('post', reverse('task-import'), {
+                'data': {'file': self.import_file()}, 'format': 'multipart'}),
+            'task-bulk POST': lambda: ('post', reverse('task-bulk'), {'data': [
+                {'op': 'update', 'id': pk, 'doTime': next(self.counter)} for pk in self.board]}),
+            'task-batch-status-update PATCH': lambda: ('patch', reverse('task-batch-status-update'), {
+                'data': {'ids': self.board, 'status': next(self.statuses)}}),
+            'create POST': lambda: ('post', reverse('create'), {'data': self.new_task()}),
+            'task-detail GET': lambda: ('get', detail(), {}),
+            'task-detail PATCH': lambda: ('patch', detail(), {'data': {'doTime': next(self.counter)}}),
+            'task-status-update PATCH': lambda: ('patch', reverse('task-status-update', args=[self.board[0]]), {
+                'data': {'status': next(self.statuses)}}),
+            'task-detail DELETE': lambda: ('delete', reverse('task-detail', args=[self.board.pop()]), {}),
+            'job-export POST': lambda: ('post', reverse('job-export'), {'data': {'output': 'ndjson'}}),
+            'job-cleanup POST': lambda: ('post', reverse('job-cleanup'), {'data': {'before': '2024-01-01'}}),
+            'job-list GET': lambda: ('get', reverse('job-list'), {}),
+            'job-detail GET': lambda: ('get', reverse('job-detail', args=[
+                TicketeerJob.objects.create(author=self.user, kind='export').pk]), {}),
+        }
+
+    def measure(self, label, make_call):
+        """
+        Call an endpoint with cold caches.
+        Returns:
+            tuple: Number of queries and seconds until the whole body was read.
+        """
+        for cache in caches.all():
+            cache.clear()
+        method, url, kwargs = make_call()
+        kwargs.setdefault('format', 'json')
+        metrics = RequestMetrics()
+        with connection.execute_wrapper(metrics):
+            started = time.perf_counter()
+            response = getattr(self.client, method)(url, **kwargs)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            elapsed = time.perf_counter() - started
+        self.assertLess(response.status_code, 400, f'{label}: {response.status_code}')
+        return metrics.queries, elapsed
+
+    def test_endpoints_within_budget(self):
+        queries, seconds = {}, {}
+        for size in self.board_sizes:
+            self.fill_board(size)
+            for label, make_call in self.endpoints().items():
+                runs = [self.measure(label, make_call) for _ in range(self.rounds)]
+                queries.setdefault(label, []).append(runs[-1][0])
+                seconds[label] = min(elapsed for count, elapsed in runs)
+
+        if os.environ.get('TICKETEER_RECORD_BASELINES'):
+            baselines = {label: {'queries': queries[label][-1], 'seconds': round(seconds[label], 5)}
+                         for label in queries}
+            self.baselines_path.write_text(json.dumps(baselines, indent=2) + '\n')
+            self.skipTest(f'baselines recorded in {self.baselines_path}')
+
+        baselines = json.loads(self.baselines_path.read_text())
+        check_latency = bool(os.environ.get('TICKETEER_CHECK_LATENCY'))
+        for label, counts in queries.items():
+            with self.subTest(label):
+                self.assertEqual(len(set(counts)), 1, f'{label}: queries per board size {self.board_sizes}: {counts}')
+                self.assertIn(label, baselines, 'no baseline, record one with TICKETEER_RECORD_BASELINES=1')
+                self.assertLessEqual(counts[-1], baselines[label]['queries'], f'{label}: more queries than the baseline')
+                if check_latency:
+                    limit = baselines[label]['seconds'] * self.latency_tolerance + self.latency_slack
+                    self.assertLessEqual(seconds[label], limit, f'{label}: slower than {limit:.4f} s')
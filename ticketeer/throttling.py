@@ -0,0 +1,154 @@
+import hashlib
+import math
+import time
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Token bucket rate limit kept in a Django cache.
+    A rate of "N/period" is a bucket of N tokens refilled at N per period:
+    bursts of up to N requests pass, after that one request per period/N.
+    Rates come from REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] by `scope`
+    (None disables the throttle). The buckets live in the
+    TICKETEER_THROTTLE_CACHE alias; the limits only hold across server
+    processes if that cache is shared by them (Redis via KANBAN_REDIS_URL),
+    with the default local memory cache every process has its own buckets.
+    A bucket is read and written under a lock taken with the cache's atomic
+    `add()`, so concurrent requests never share a token.
+    Throttles run before the view's handler, so rejected requests never
+    reach the password hasher.
+    Attributes:
+        lock_timeout: Seconds after which the lock of a crashed request expires.
+        lock_attempts: Attempts to take a bucket's lock before the request is throttled.
+        lock_delay: Seconds between two attempts.
+    """
+
+    cache_format = 'ticketeer:throttle:%(scope)s:%(ident)s'
+    lock_timeout = 1
+    lock_attempts = 50
+    lock_delay = 0.002
+
+    @property
+    def THROTTLE_RATES(self):
+        """
+        Returns:
+            dict: Current rates per scope (DRF reads them once at import).
+        """
+        return api_settings.DEFAULT_THROTTLE_RATES
+
+    @property
+    def cache(self):
+        """
+        Returns:
+            BaseCache: The configured Django cache backend.
+        """
+        return caches[getattr(settings, 'TICKETEER_THROTTLE_CACHE', 'default')]
+
+    def allow_request(self, request, view):
+        """
+        Take a token from the request's bucket.
+        Args:
+            request: DRF request object.
+            view: The view being throttled.
+        Returns:
+            bool: False if the bucket is empty.
+        """
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        lock = f'{self.key}:lock'
+        for _ in range(self.lock_attempts):
+            if self.cache.add(lock, True, self.lock_timeout):
+                try:
+                    return self.take_token()
+                finally:
+                    self.cache.delete(lock)
+            time.sleep(self.lock_delay)
+        # Far more concurrent requests on one bucket than a legitimate client sends.
+        self.tokens = 0
+        return self.throttle_failure()
+
+    def take_token(self):
+        """
+        Refill the bucket for the time passed and take a token; the caller holds the bucket's lock.
+        Returns:
+            bool: False if the bucket is empty.
+        """
+        self.now = self.timer()
+        refill = self.num_requests / self.duration
+        tokens, updated = self.cache.get(self.key, (self.num_requests, self.now))
+        self.tokens = min(self.num_requests, tokens + (self.now - updated) * refill)
+        if self.tokens < 1:
+            return self.throttle_failure()
+        # An untouched bucket is full again after `duration`, the entry may expire then.
+        self.cache.set(self.key, (self.tokens - 1, self.now), math.ceil(self.duration))
+        return self.throttle_success()
+
+    def throttle_success(self):
+        """
+        Returns:
+            bool: True.
+        """
+        return True
+
+    def wait(self):
+        """
+        Returns:
+            float: Seconds until the bucket holds a token again (for Retry-After).
+        """
+        return (1 - self.tokens) * self.duration / self.num_requests
+
+
+class LoginRateThrottle(TokenBucketThrottle):
+    """
+    Login attempts per client IP address.
+    """
+
+    scope = 'login'
+
+    def get_cache_key(self, request, view):
+        """
+        Args:
+            request: DRF request object.
+            view: The view being throttled.
+        Returns:
+            str: Cache key of the client's bucket.
+        """
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class LoginUsernameRateThrottle(TokenBucketThrottle):
+    """
+    Login attempts per username, from any number of addresses.
+    """
+
+    scope = 'login_username'
+
+    def get_cache_key(self, request, view):
+        """
+        Args:
+            request: DRF request object.
+            view: The view being throttled.
+        Returns:
+            str | None: Cache key of the username's bucket, None if the request names no username.
+        """
+        username = request.data.get('username') if hasattr(request.data, 'get') else None
+        if not isinstance(username, str) or not username:
+            return None
+        digest = hashlib.sha256(username.lower().encode()).hexdigest()
+        return self.cache_format % {'scope': self.scope, 'ident': digest}
+
+
+class RegisterRateThrottle(LoginRateThrottle):
+    """
+    Registrations per client IP address.
+    """
+
+    scope = 'register'
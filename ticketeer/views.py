@@ -1,13 +1,37 @@
-from ticketeer.models import TicketeerTask
+from ticketeer.models import TicketeerJob, TicketeerTask, TicketeerTaskArchive, TicketeerTaskTombstone
+import datetime
+from django.conf import settings
+from django.db import transaction
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.db.models import Count, F, Sum
+from django.utils import timezone
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.authtoken.models import Token
 from rest_framework.response import Response
 from rest_framework.authentication import TokenAuthentication
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import generics, status
-from .serializers import RegisterSerializer, TaskSerializer, TaskStatusSerializer
+from rest_framework.utils.urls import replace_query_param
+from .serializers import (
+    RegisterSerializer, TaskSerializer, TaskStatusSerializer, TaskBulkSerializer, TaskBatchStatusSerializer,
+    TaskSummaryQuerySerializer, TaskRowEncoder, TaskExportQuerySerializer, TaskImportSerializer,
+    TaskSearchQuerySerializer, TaskSyncQuerySerializer, JobSerializer, JobExportSerializer, JobCleanupSerializer,
+)
+from .pagination import TaskCursorPagination
+from .cache import board_cache, token_cache
+from .conditional import (
+    conditional_response, detail_query, detail_validators, list_aggregates, list_validators, make_etag,
+    set_validators,
+)
+from .concurrency import VersionConflict, expected_version, save_versioned, write_conflict
+from .events import tasks_changed
+from .jobs import announce, enqueue
+from .search import get_search_backend
+from .throttling import LoginRateThrottle, LoginUsernameRateThrottle, RegisterRateThrottle
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import NotFound, PermissionDenied
 
 
 class LoginView(ObtainAuthToken):
@@ -15,8 +39,12 @@ class LoginView(ObtainAuthToken):
     Custom login view to authenticate users and generate tokens.
     Inherits:
         ObtainAuthToken: Base class to obtain authentication tokens.
+    Attributes:
+        throttle_classes: Token buckets per client IP and per username, checked before the password.
     """
 
+    throttle_classes = [LoginRateThrottle, LoginUsernameRateThrottle]
+
     def post(self, request, *args, **kwargs):
         """
         Handle POST requests to authenticate users.
@@ -32,6 +60,7 @@ class LoginView(ObtainAuthToken):
         serializer.is_valid(raise_exception=True)
         user = serializer.validated_data['user']
         token, created = Token.objects.get_or_create(user=user)
+        token_cache.invalidate(token.key)
         return Response({
             'token': token.key,
             'user_id': user.pk,
@@ -45,10 +74,12 @@ class RegisterView(generics.CreateAPIView):
     Attributes:
         serializer_class: Serializer class for user registration.
         permission_classes: Permissions required for accessing this view (none for registration).
+        throttle_classes: Token bucket per client IP, checked before the password is hashed.
     """
 
     serializer_class = RegisterSerializer
     permission_classes = []  # No authentication necessary for registration
+    throttle_classes = [RegisterRateThrottle]
 
     def create(self, request, *args, **kwargs):
         """
@@ -64,24 +95,220 @@ class RegisterView(generics.CreateAPIView):
         return Response({'message': 'Registration successful'}, status=response.status_code)
 
 
-class TaskListCreateAPIView(generics.ListCreateAPIView):
+class ConditionalGetMixin:
+    """
+    Mixin answering GET requests with strong ETags and Last-Modified headers.
+    The validators come from `get_validators()`, which views override with
+    a query cheaper than building the response; a matching If-None-Match /
+    If-Modified-Since is answered with 304 before the serializer runs.
+    """
+
+    def get_validators(self, request, *args, **kwargs):
+        """
+        Compute the validators of the requested resource.
+        The default has none, so every GET gets the regular response.
+        Args:
+            request: HTTP request object.
+            *args: Additional arguments.
+            **kwargs: Additional keyword arguments.
+        Returns:
+            tuple: (version parts, last modified datetime) or (None, None) to skip validation,
+            e.g. if the resource does not exist.
+        """
+        return None, None
+
+    def get(self, request, *args, **kwargs):
+        """
+        Handle GET requests with conditional request support.
+        Args:
+            request: HTTP request object.
+            *args: Additional arguments.
+            **kwargs: Additional keyword arguments.
+        Returns:
+            Response: 304 if the client copy is still valid, otherwise the regular response.
+        """
+        parts, last_modified = self.get_validators(request, *args, **kwargs)
+        if parts is None:
+            return super().get(request, *args, **kwargs)
+
+        # Cached bodies are keyed by the validators too (see BoardCacheMixin),
+        # so a body is never sent with the validators of other data.
+        self.cache_stamp = parts
+        etag = self.make_etag(request, parts)
+        response = conditional_response(request, etag, last_modified)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        return set_validators(response, etag, last_modified)
+
+    def make_etag(self, request, parts):
+        """
+        Build the strong ETag of a representation.
+        Args:
+            request: HTTP request object.
+            parts: Version parts from `get_validators()`.
+        Returns:
+            str: Quoted ETag.
+        """
+        return make_etag(parts, request.query_params.urlencode(), request.accepted_media_type)
+
+
+class BoardCacheMixin:
+    """
+    Mixin serving list responses from the per-author board cache.
+    The cached data is keyed by the author's board version, so any write that
+    goes through `tasks_changed()` makes the next request recompute it. Views
+    that validate their data against the database set `cache_stamp`, which
+    is part of the key as well: writes of other processes (web workers, job
+    workers, management commands) only bump their own version counter.
+    Attributes:
+        cache_variant: Name under which the view's responses are cached.
+        cache_stamp: Database state of the requested data, None if unknown.
+    """
+
+    cache_variant = None
+    cache_stamp = None
+
+    def list(self, request, *args, **kwargs):
+        """
+        Return the cached list data or build it with the regular list implementation.
+        Args:
+            request: HTTP request object.
+            *args: Additional arguments.
+            **kwargs: Additional keyword arguments.
+        Returns:
+            Response: JSON response with the (possibly cached) data.
+        """
+        data = board_cache.get_or_set(
+            request.user.pk,
+            self.cache_variant,
+            request.query_params.urlencode(),
+            lambda: self.get_list_data(request, *args, **kwargs),
+            stamp=self.cache_stamp,
+        )
+        return Response(data)
+
+    def get_list_data(self, request, *args, **kwargs):
+        """
+        Build the uncached list data.
+        Args:
+            request: HTTP request object.
+            *args: Additional arguments.
+            **kwargs: Additional keyword arguments.
+        Returns:
+            list | dict: Serialized response data.
+        """
+        return super().list(request, *args, **kwargs).data
+
+
+class TaskListCreateAPIView(ConditionalGetMixin, BoardCacheMixin, generics.ListCreateAPIView):
     """
     View for listing and creating tasks.
+    Lists only read the hot task table; `?include_archived=1` adds the
+    archived tasks (see TicketeerTaskArchive) after the live ones, or merged
+    into the (date, id) order when paginated.
     Attributes:
         serializer_class: Serializer class for tasks.
         permission_classes: Permissions required for accessing this view (authenticated users only).
+        pagination_class: Opt-in keyset pagination ordered by (date, id).
+        cache_variant: Name of the list responses in the board cache.
     """
 
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = TaskCursorPagination
+    cache_variant = 'list'
 
     def get_queryset(self):
         """
         Get the queryset of tasks for the authenticated user.
+        If the client asked for a `?fields=` projection only those columns
+        (plus the ones needed for the cursor) are loaded from the database.
         Returns:
             QuerySet: Filtered queryset of tasks.
         """
-        return TicketeerTask.objects.filter(author=self.request.user)
+        return self.project(TicketeerTask.objects.filter(author=self.request.user))
+
+    def get_querysets(self):
+        """
+        Get the querysets a list request reads.
+        Returns:
+            list: The tasks, and the archived tasks if the request asked for them.
+        """
+        querysets = [self.get_queryset()]
+        if TaskSerializer.includes_archived(self.request):
+            querysets.append(self.project(TicketeerTaskArchive.objects.filter(author=self.request.user)))
+        return querysets
+
+    def project(self, queryset):
+        """
+        Limit a queryset to the columns of the requested `?fields=` projection.
+        Args:
+            queryset: Queryset of tasks or archived tasks.
+        Returns:
+            QuerySet: The queryset, loading only the needed columns.
+        """
+        fields = TaskSerializer.requested_fields(self.request)
+        if fields:
+            queryset = queryset.only(*fields.union(TaskCursorPagination.ordering))
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        """
+        Handle GET requests for the task list.
+        Unpaginated JSON responses are built by TaskRowEncoder straight from
+        database tuples and cached as rendered bytes; other requests use the
+        regular serializer path. So do requests for JSON with media type
+        parameters (e.g. `Accept: application/json; indent=4`), which only
+        JSONRenderer honours.
+        Args:
+            request: HTTP request object.
+            *args: Additional arguments.
+            **kwargs: Additional keyword arguments.
+        Returns:
+            HttpResponse: JSON list of tasks.
+        """
+        if (self.paginator.is_requested(request) or request.accepted_renderer.format != 'json'
+                or request.accepted_media_type != request.accepted_renderer.media_type):
+            return super().list(request, *args, **kwargs)
+        body = board_cache.get_or_set(
+            request.user.pk,
+            'list.json',
+            request.query_params.urlencode(),
+            lambda: TaskRowEncoder(TaskSerializer.requested_fields(request)).render(*self.get_querysets()),
+            stamp=self.cache_stamp,
+        )
+        return HttpResponse(body, content_type='application/json')
+
+    def get_list_data(self, request, *args, **kwargs):
+        """
+        Build the uncached list data, paginated or for non-JSON renderers.
+        Args:
+            request: HTTP request object.
+            *args: Additional arguments.
+            **kwargs: Additional keyword arguments.
+        Returns:
+            list | dict: Serialized tasks, wrapped with a next link when paginated.
+        """
+        querysets = self.get_querysets()
+        if len(querysets) == 1:
+            return super().get_list_data(request, *args, **kwargs)
+        page = self.paginate_queryset(querysets)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data).data
+        return self.get_serializer([task for queryset in querysets for task in queryset], many=True).data
+
+    def get_validators(self, request, *args, **kwargs):
+        """
+        Derive the list validators from one aggregate query and the board version.
+        Args:
+            request: HTTP request object.
+            *args: Additional arguments.
+            **kwargs: Additional keyword arguments.
+        Returns:
+            tuple: (version parts, last modified datetime).
+        """
+        queryset, aggregates = list_aggregates(request.user.pk)
+        return list_validators(request.user.pk, queryset.aggregate(**aggregates))
 
     def perform_create(self, serializer):
         """
@@ -90,9 +317,347 @@ class TaskListCreateAPIView(generics.ListCreateAPIView):
             serializer: Serializer instance for the task being created.
         """
         serializer.save(author=self.request.user)
+        tasks_changed(self.request.user.pk, 'created', tasks=[serializer.data])
+
+
+class TaskBoardAPIView(BoardCacheMixin, generics.ListAPIView):
+    """
+    View for the kanban board: all tasks of the user grouped by status.
+    The tasks are fetched with a single query ordered by (status, date, id),
+    which the (author, status, date) index serves without a sort step.
+    Attributes:
+        serializer_class: Serializer class for tasks.
+        permission_classes: Permissions required for accessing this view (authenticated users only).
+        cache_variant: Name of the board responses in the board cache.
+    """
+
+    serializer_class = TaskSerializer
+    permission_classes = [IsAuthenticated]
+    ordering = ('status', 'date', 'id')
+    cache_variant = 'board'
+
+    def get_queryset(self):
+        """
+        Get the board queryset of the authenticated user in index order.
+        Returns:
+            QuerySet: Ordered queryset of tasks.
+        """
+        queryset = TicketeerTask.objects.filter(author=self.request.user).order_by(*self.ordering)
+        fields = TaskSerializer.requested_fields(self.request)
+        if fields:
+            queryset = queryset.only(*fields.union(self.ordering))
+        return queryset
+
+    def get_list_data(self, request, *args, **kwargs):
+        """
+        Build the board for GET requests.
+        Args:
+            request: HTTP request object.
+            *args: Additional arguments.
+            **kwargs: Additional keyword arguments.
+        Returns:
+            dict: Mapping of every status to its list of serialized tasks.
+        """
+        board = {value: [] for value, label in TicketeerTask.STATUS_CHOICES}
+        tasks = list(self.get_queryset())
+        for task, data in zip(tasks, self.get_serializer(tasks, many=True).data):
+            board.setdefault(task.status, []).append(data)
+        return board
+
+
+class TaskSummaryAPIView(generics.GenericAPIView):
+    """
+    View for the dashboard summary: task counts and total doTime per status and priority.
+    The numbers come from one GROUP BY query and are kept in the board cache,
+    so task writes invalidate them together with the board.
+    Attributes:
+        serializer_class: Serializer class for the optional date range parameters.
+        permission_classes: Permissions required for accessing this view (authenticated users only).
+    """
+
+    serializer_class = TaskSummaryQuerySerializer
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        """
+        Handle GET requests for the summary.
+        Args:
+            request: HTTP request object (optional `date_from` / `date_to` query parameters).
+            *args: Additional arguments.
+            **kwargs: Additional keyword arguments.
+        Returns:
+            Response: JSON object with totals, per-status, per-priority and per-group numbers.
+        """
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = board_cache.get_or_set(
+            request.user.pk,
+            'summary',
+            request.query_params.urlencode(),
+            lambda: self.get_summary(**serializer.validated_data),
+        )
+        return Response(data)
+
+    def get_summary(self, date_from=None, date_to=None):
+        """
+        Aggregate the user's tasks grouped by status and priority.
+        Args:
+            date_from: Optional first day of the range.
+            date_to: Optional last day of the range.
+        Returns:
+            dict: Summary data.
+        """
+        tasks = TicketeerTask.objects.filter(author=self.request.user)
+        if date_from:
+            tasks = tasks.filter(date__gte=date_from)
+        if date_to:
+            tasks = tasks.filter(date__lte=date_to)
+        groups = list(
+            tasks.values('status', 'prio')
+            .annotate(count=Count('id'), doTime=Sum('doTime'))
+            .order_by('status', 'prio')
+        )
+
+        def empty():
+            return {'count': 0, 'doTime': 0}
+
+        total = empty()
+        by_status = {value: empty() for value, label in TicketeerTask.STATUS_CHOICES}
+        by_prio = {value: empty() for value, label in TicketeerTask.PRIORITY_CHOICES}
+        for group in groups:
+            for bucket in (total, by_status.setdefault(group['status'], empty()),
+                           by_prio.setdefault(group['prio'], empty())):
+                bucket['count'] += group['count']
+                bucket['doTime'] += group['doTime']
+        return {'total': total, 'by_status': by_status, 'by_prio': by_prio, 'groups': groups}
+
+
+class TaskSearchAPIView(generics.GenericAPIView):
+    """
+    View for searching the user's tasks by title, subtitle and content.
+    Results are ranked by the configured search backend (see
+    `ticketeer.search`) and paginated by page number; pages are kept in the
+    board cache like the other read views.
+    Attributes:
+        serializer_class: Serializer class for the query parameters.
+        permission_classes: Permissions required for accessing this view (authenticated users only).
+    """
+
+    serializer_class = TaskSearchQuerySerializer
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        """
+        Handle GET requests for the search.
+        Args:
+            request: HTTP request object (`q`, optional `page` and `page_size` query parameters).
+            *args: Additional arguments.
+            **kwargs: Additional keyword arguments.
+        Returns:
+            Response: JSON object with the next page link and the matching tasks, best match first.
+        """
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = board_cache.get_or_set(
+            request.user.pk,
+            'search',
+            request.query_params.urlencode(),
+            lambda: self.get_results(request, **serializer.validated_data),
+        )
+        return Response(data)
+
+    def get_results(self, request, q, page, page_size):
+        """
+        Run the search for one page of results.
+        Args:
+            request: HTTP request object.
+            q: Search text.
+            page: Number of the result page.
+            page_size: Number of results per page.
+        Returns:
+            dict: Next page link and serialized tasks.
+        """
+        ids = get_search_backend().search(request.user.pk, q, (page - 1) * page_size, page_size + 1)
+        tasks = TicketeerTask.objects.filter(author=request.user).in_bulk(ids[:page_size])
+        next_link = None
+        if len(ids) > page_size:
+            next_link = replace_query_param(request.build_absolute_uri(), 'page', page + 1)
+        return {
+            'next': next_link,
+            'results': TaskSerializer([tasks[pk] for pk in ids[:page_size] if pk in tasks], many=True).data,
+        }
+
+
+class TaskSyncAPIView(generics.GenericAPIView):
+    """
+    View for the delta sync of offline clients.
+    The first sync (without token) returns the whole board; later syncs
+    return only the tasks created or updated and the IDs of the tasks
+    deleted since the sync the token came from. Clients apply `tasks`, then
+    `deleted`, and keep the new token. Changes from the last
+    TICKETEER_SYNC_OVERLAP seconds before that sync are sent again, so
+    writes committing while a sync ran are never missed; applying a task
+    twice does no harm. With `reset` set the client replaces its copy.
+    Attributes:
+        serializer_class: Serializer class for the query parameters.
+        permission_classes: Permissions required for accessing this view (authenticated users only).
+    """
+
+    serializer_class = TaskSyncQuerySerializer
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        """
+        Handle GET requests for the changes since the last sync.
+        Args:
+            request: HTTP request object.
+            *args: Additional arguments.
+            **kwargs: Additional keyword arguments.
+        Returns:
+            Response: New token, reset flag, changed tasks and IDs of deleted tasks.
+        """
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        since = serializer.validated_data.get('token')
+        started = timezone.now()
+
+        tasks = TicketeerTask.objects.filter(author=request.user)
+        deleted = []
+        # Tombstones of deletions before the retention period are gone.
+        retention = datetime.timedelta(days=getattr(settings, 'TICKETEER_SYNC_TOMBSTONE_DAYS', 30))
+        reset = since is None or since < started - retention
+        if not reset:
+            since -= datetime.timedelta(seconds=getattr(settings, 'TICKETEER_SYNC_OVERLAP', 2))
+            tasks = tasks.filter(updated_at__gte=since).order_by('updated_at', 'id')
+            deleted = list(TicketeerTaskTombstone.objects.filter(author=request.user, deleted_at__gte=since)
+                           .order_by('deleted_at', 'id').values_list('task_id', flat=True))
+
+        encoder = TaskRowEncoder()
+        return Response({
+            'token': TaskSyncQuerySerializer.make_token(request.user.pk, started),
+            'reset': reset,
+            'tasks': encoder.rows_to_dicts(tasks.values_list(*encoder.columns)),
+            'deleted': deleted,
+        })
+
+
+class TaskExportAPIView(generics.GenericAPIView):
+    """
+    View streaming all tasks of the user, for backups and analytics jobs.
+    Rows are read with `QuerySet.iterator()` and encoded chunk by chunk by
+    TaskRowEncoder while the response is sent, so memory use does not grow
+    with the number of tasks. `?output=ndjson` streams one task per line
+    instead of a JSON array; `?fields=` limits the exported fields.
+    Attributes:
+        serializer_class: Serializer class for the query parameters.
+        permission_classes: Permissions required for accessing this view (authenticated users only).
+        content_types: Content type of each output format.
+    """
+
+    serializer_class = TaskExportQuerySerializer
+    permission_classes = [IsAuthenticated]
+    content_types = {
+        'json': 'application/json',
+        'ndjson': 'application/x-ndjson',
+    }
+
+    def get(self, request, *args, **kwargs):
+        """
+        Handle GET requests for the export.
+        Args:
+            request: HTTP request object (optional `output` and `fields` query parameters).
+            *args: Additional arguments.
+            **kwargs: Additional keyword arguments.
+        Returns:
+            StreamingHttpResponse: The tasks ordered by id.
+        """
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        output = serializer.validated_data['output']
+
+        encoder = TaskRowEncoder(TaskSerializer.requested_fields(request))
+        rows = TicketeerTask.objects.filter(author=request.user).order_by('id') \
+            .values_list(*encoder.columns).iterator(chunk_size=encoder.chunk_size)
+        content = encoder.iter_ndjson(rows) if output == 'ndjson' else encoder.iter_json(rows)
+
+        response = StreamingHttpResponse(content, content_type=self.content_types[output])
+        response['Content-Disposition'] = f'attachment; filename="tasks.{output}"'
+        return response
+
+
+class TaskImportAPIView(generics.GenericAPIView):
+    """
+    View for importing tasks from an uploaded CSV or NDJSON file.
+    Only multipart uploads are accepted: Django spools large uploads to a
+    temporary file, which is then read row by row.
+    Attributes:
+        serializer_class: Serializer class reading and importing the file.
+        permission_classes: Permissions required for accessing this view (authenticated users only).
+        parser_classes: Parsers for the request body (multipart form data only).
+    """
+
+    serializer_class = TaskImportSerializer
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request, *args, **kwargs):
+        """
+        Handle POST requests with a task file in the `file` form field.
+        Args:
+            request: HTTP request object (optional `input` form field: csv or ndjson).
+            *args: Additional arguments.
+            **kwargs: Additional keyword arguments.
+        Returns:
+            Response: Import report with the number of created tasks and the row errors.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        report = serializer.save(author=request.user)
+        if report['created']:
+            tasks_changed(request.user.pk, 'imported', count=report['created'])
+        return Response(report)
 
 
-class TaskRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView):
+class TaskBulkAPIView(generics.GenericAPIView):
+    """
+    View for creating, updating and deleting many tasks in one request.
+    Attributes:
+        serializer_class: Serializer class validating and applying the operations.
+        permission_classes: Permissions required for accessing this view (authenticated users only).
+    """
+
+    serializer_class = TaskBulkSerializer
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        """
+        Handle POST requests with a list of task operations.
+        Either all operations are applied or none of them.
+        Args:
+            request: HTTP request object.
+            *args: Additional arguments.
+            **kwargs: Additional keyword arguments.
+        Returns:
+            Response: Per-item results, or per-item errors with status 400.
+        """
+        serializer = self.get_serializer(data=request.data)
+        with transaction.atomic():
+            serializer.is_valid(raise_exception=True)
+            results = serializer.save(author=request.user)
+
+        changes = serializer.changes
+        # Same payload as TaskSerializer(many=True).data, at a fraction of the cost for large requests.
+        encoder = TaskRowEncoder()
+        if changes['created']:
+            tasks_changed(request.user.pk, 'created', tasks=encoder.tasks_to_dicts(changes['created']))
+        if changes['updated']:
+            tasks_changed(request.user.pk, 'updated', tasks=encoder.tasks_to_dicts(changes['updated']))
+        if changes['deleted']:
+            tasks_changed(request.user.pk, 'deleted', ids=changes['deleted'])
+        return Response({'results': results})
+
+
+class TaskRetrieveUpdateDestroyAPIView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     View for retrieving, updating, and deleting tasks.
     Attributes:
@@ -110,18 +675,59 @@ class TaskRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView):
             QuerySet: Filtered queryset of tasks.
         """
         return TicketeerTask.objects.filter(author=self.request.user)
-    
+
+    def get_validators(self, request, *args, **kwargs):
+        """
+        Derive the task validators from its `version` and `updated_at` columns only.
+        Args:
+            request: HTTP request object.
+            *args: Additional arguments.
+            **kwargs: Additional keyword arguments (contains the task pk).
+        Returns:
+            tuple: (version parts, last modified datetime) or (None, None) for unknown tasks.
+        """
+        return detail_validators(kwargs['pk'], detail_query(request.user.pk, kwargs['pk']).first())
+
+    def make_etag(self, request, parts):
+        """
+        Lead the ETag with the task version ("<version>.<digest>"), so
+        If-Match headers on writes name the version they are based on.
+        Args:
+            request: HTTP request object.
+            parts: Version parts from `get_validators()`, ending with the task version.
+        Returns:
+            str: Quoted ETag.
+        """
+        return make_etag(parts, request.query_params.urlencode(), request.accepted_media_type, version=parts[-1])
+
+    def update(self, request, *args, **kwargs):
+        """
+        Handle PUT / PATCH requests; the response carries the ETag of the new version.
+        Args:
+            request: HTTP request object.
+            *args: Additional arguments.
+            **kwargs: Additional keyword arguments (contains the task pk).
+        Returns:
+            Response: JSON representation of the updated task.
+        """
+        response = super().update(request, *args, **kwargs)
+        response['ETag'] = self.make_etag(request, ('detail', kwargs['pk'], response.data['version']))
+        return response
+
     def perform_update(self, serializer):
         """
-        Perform update operation on a task instance.
+        Write the changed fields with one conditional UPDATE.
         Args:
             serializer: Serializer instance for the task being updated.
         Raises:
             PermissionDenied: If the current user is not the author of the task.
+            APIException: 409 / 412 if the task was changed since the version the request is based on.
         """
-        instance = serializer.save()
-        if instance.author != self.request.user:
+        instance = serializer.instance
+        if instance.author_id != self.request.user.pk:
             raise PermissionDenied("You do not have permission to edit this task")
+        save_versioned(self.request, self.request.data, instance, serializer.validated_data)
+        tasks_changed(instance.author_id, 'updated', tasks=[serializer.data])
 
     def perform_destroy(self, instance):
         """
@@ -130,10 +736,14 @@ class TaskRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView):
             instance: Task instance to be deleted.
         Raises:
             PermissionDenied: If the current user is not the author of the task.
+            APIException: 409 / 412 if the task was changed since the version the request is based on.
         """
-        if instance.author != self.request.user:
+        if instance.author_id != self.request.user.pk:
             raise PermissionDenied("You do not have permission to delete this task")
-        instance.delete()
+        version = expected_version(self.request, self.request.data, instance.version)
+        if not TicketeerTask.delete_tasks(instance.author_id, [instance.pk], version=version):
+            raise write_conflict(self.request)
+        tasks_changed(instance.author_id, 'deleted', ids=[instance.pk])
 
 
 class TaskStatusUpdateAPIView(generics.UpdateAPIView):
@@ -161,15 +771,259 @@ class TaskStatusUpdateAPIView(generics.UpdateAPIView):
             Response: JSON response indicating success or failure of status update.
         """
         instance = self.get_object()
-        if instance.author != self.request.user:
+        if instance.author_id != self.request.user.pk:
             raise PermissionDenied("You do not have permission to update this task")
 
         serializer = self.get_serializer(instance, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        save_versioned(request, request.data, instance, serializer.validated_data)
+        tasks_changed(instance.author_id, 'moved', ids=[instance.pk], status=instance.status)
         return Response(serializer.data)
     
 
+class TaskBatchStatusUpdateAPIView(generics.GenericAPIView):
+    """
+    View for moving many tasks to a new status in one request (drag and drop of several cards).
+    Attributes:
+        serializer_class: Serializer class validating the task IDs and the new status.
+        permission_classes: Permissions required for accessing this view (authenticated users only).
+    """
+
+    serializer_class = TaskBatchStatusSerializer
+    permission_classes = [IsAuthenticated]
+
+    def patch(self, request, *args, **kwargs):
+        """
+        Handle PATCH requests to move tasks to a new status.
+        The user's tasks are read and locked first, then the ones not yet in
+        the new status are changed with a single UPDATE in the same
+        transaction, so the IDs in the response and the change event are
+        exactly the rows the UPDATE wrote.
+        Args:
+            request: HTTP request object.
+            *args: Additional arguments.
+            **kwargs: Additional keyword arguments.
+        Returns:
+            Response: JSON response listing the changed, unchanged and unknown task IDs.
+        Raises:
+            VersionConflict: If a locked task changed anyway (backends without row locks); nothing is written then.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = set(serializer.validated_data['ids'])
+        new_status = serializer.validated_data['status']
+
+        with transaction.atomic():
+            found = dict(TicketeerTask.objects.select_for_update()
+                         .filter(author=request.user, id__in=ids).values_list('id', 'status'))
+            changed = sorted(pk for pk, status in found.items() if status != new_status)
+            moved = TicketeerTask.objects.filter(id__in=changed).exclude(status=new_status).update(
+                status=new_status, updated_at=timezone.now(), version=F('version') + 1) if changed else 0
+            if moved != len(changed):
+                transaction.set_rollback(True)
+        if moved != len(changed):
+            raise VersionConflict()
+        if changed:
+            tasks_changed(request.user.pk, 'moved', ids=changed, status=new_status)
+
+        return Response({
+            'status': new_status,
+            'changed': changed,
+            'unchanged': sorted(found.keys() - set(changed)),
+            'not_found': sorted(ids - found.keys()),
+        })
+
+
+class JobEnqueueAPIView(generics.GenericAPIView):
+    """
+    Base view queueing a background job for the user (see ticketeer.jobs).
+    Answers 202 with the queued job; its URL is in the Location header.
+    Attributes:
+        kind: Kind of the queued jobs.
+        permission_classes: Permissions required for accessing this view (authenticated users only).
+    """
+
+    kind = None
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        """
+        Handle POST requests with the job parameters.
+        Args:
+            request: HTTP request object.
+            *args: Additional arguments.
+            **kwargs: Additional keyword arguments.
+        Returns:
+            Response: The queued job with status 202.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job = enqueue(request.user, self.kind, *self.get_job_params(serializer.validated_data))
+        data = JobSerializer(job, context=self.get_serializer_context()).data
+        return Response(data, status=status.HTTP_202_ACCEPTED, headers={'Location': reverse('job-detail', args=[job.pk])})
+
+    def get_job_params(self, validated_data):
+        """
+        Turn the validated request data into the job's parameters.
+        Args:
+            validated_data: Validated request data.
+        Returns:
+            tuple: JSON serializable job parameters and the job's input file (or None).
+        """
+        return validated_data, None
+
+
+class ExportJobAPIView(JobEnqueueAPIView):
+    """
+    View queueing an export of all tasks of the user into a downloadable file.
+    Attributes:
+        serializer_class: Serializer class for the export parameters (`output`, `fields`).
+    """
+
+    kind = 'export'
+    serializer_class = JobExportSerializer
+
+    def get_job_params(self, validated_data):
+        """
+        Store the output format and the exported fields.
+        Args:
+            validated_data: Validated export parameters.
+        Returns:
+            tuple: Job parameters (`output`, `fields`) and None, as exports have no input file.
+        """
+        return {'output': validated_data['output'], 'fields': validated_data.get('fields')}, None
+
+
+class ImportJobAPIView(JobEnqueueAPIView):
+    """
+    View queueing an import of tasks from an uploaded CSV or NDJSON file.
+    Attributes:
+        serializer_class: Serializer class validating the upload.
+        parser_classes: Parsers for the request body (multipart form data only).
+    """
+
+    kind = 'import'
+    serializer_class = TaskImportSerializer
+    parser_classes = [MultiPartParser]
+
+    def get_job_params(self, validated_data):
+        """
+        Store the file format; the upload becomes the job's input file.
+        Args:
+            validated_data: Validated upload (`file`, `input`).
+        Returns:
+            tuple: Job parameters (`input`) and the uploaded file.
+        """
+        return {'input': validated_data['input']}, validated_data['file']
+
+
+class CleanupJobAPIView(JobEnqueueAPIView):
+    """
+    View queueing the deletion of the user's done tasks.
+    Attributes:
+        serializer_class: Serializer class for the cleanup parameters (`before`).
+    """
+
+    kind = 'cleanup'
+    serializer_class = JobCleanupSerializer
+
+    def get_job_params(self, validated_data):
+        """
+        Store the cutoff date as ISO string.
+        Args:
+            validated_data: Validated cleanup parameters.
+        Returns:
+            tuple: Job parameters (`before`, None for all done tasks) and None, as cleanups have no input file.
+        """
+        before = validated_data.get('before')
+        return {'before': before.isoformat() if before else None}, None
+
+
+class JobListAPIView(generics.ListAPIView):
+    """
+    View listing the user's latest background jobs.
+    Attributes:
+        serializer_class: Serializer class for jobs.
+        permission_classes: Permissions required for accessing this view (authenticated users only).
+        limit: Number of listed jobs.
+    """
+
+    serializer_class = JobSerializer
+    permission_classes = [IsAuthenticated]
+    limit = 50
+
+    def get_queryset(self):
+        """
+        Returns:
+            QuerySet: The user's latest jobs, newest first.
+        """
+        return TicketeerJob.objects.filter(author=self.request.user).order_by('-created_at', '-id')[:self.limit]
+
+
+class JobDetailAPIView(generics.RetrieveAPIView):
+    """
+    View for polling the state and progress of a background job.
+    Attributes:
+        serializer_class: Serializer class for jobs.
+        permission_classes: Permissions required for accessing this view (authenticated users only).
+    """
+
+    serializer_class = JobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        """
+        Returns:
+            QuerySet: The user's jobs.
+        """
+        return TicketeerJob.objects.filter(author=self.request.user)
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Return the job; the first poll of a finished job announces its task changes.
+        The worker announces them too, but its cache invalidation and events
+        only reach this process through a shared cache and broker.
+        Args:
+            request: HTTP request object.
+            *args: Additional arguments.
+            **kwargs: Additional keyword arguments.
+        Returns:
+            Response: The job.
+        """
+        job = self.get_object()
+        if job.status == 'done' and not job.announced and \
+                TicketeerJob.objects.filter(pk=job.pk, announced=False).update(announced=True):
+            announce(job)
+        return Response(self.get_serializer(job).data)
+
+
+class JobDownloadAPIView(JobDetailAPIView):
+    """
+    View downloading the result file of a finished export job.
+    """
+
+    content_types = TaskExportAPIView.content_types
+
+    def get(self, request, *args, **kwargs):
+        """
+        Handle GET requests for the result file.
+        Args:
+            request: HTTP request object.
+            *args: Additional arguments.
+            **kwargs: Additional keyword arguments.
+        Returns:
+            FileResponse: The exported tasks.
+        Raises:
+            NotFound: The job has no result file (yet).
+        """
+        job = self.get_object()
+        if job.status != 'done' or not job.output:
+            raise NotFound('The job has no result file.')
+        output = job.params.get('output', 'json')
+        return FileResponse(job.output.open('rb'), as_attachment=True, filename=f'tasks.{output}',
+                            content_type=self.content_types[output])
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def create_task(request):
@@ -183,5 +1037,6 @@ def create_task(request):
     serializer = TaskSerializer(data=request.data)
     if serializer.is_valid():
         serializer.save(author=request.user)
+        tasks_changed(request.user.pk, 'created', tasks=[serializer.data])
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
@@ -0,0 +1,29 @@
+"""
+Entry points of the pool processes of `manage.py run_jobs`.
+Spawned processes unpickle these functions before Django is set up, so this
+module must not import models at the top.
+"""
+
+
+def setup_process():
+    """
+    Initialize Django in a freshly spawned pool process.
+    """
+    import django
+    django.setup()
+
+
+def run_in_process(job_id):
+    """
+    Run a job in a pool process and return its database connections.
+    Args:
+        job_id: Primary key of the job.
+    Returns:
+        str: Final status of the job.
+    """
+    from django.db import connections
+    from ticketeer.jobs import run_job
+    try:
+        return run_job(job_id)
+    finally:
+        connections.close_all()